@@ -50,6 +50,14 @@ if exist dist rmdir /s /q dist
 echo Previous builds cleaned.
 echo.
 
+REM Pre-build the state data snapshot cache so the bundle starts without parsing JSON
+echo Building state data snapshots...
+python scripts\build_state_snapshots.py
+if errorlevel 1 (
+    echo WARNING: Could not build state snapshots, the app will parse JSON on first start
+)
+echo.
+
 REM Build the application
 echo Building PySide6 application (Directory Mode)...
 echo This will take a few minutes...
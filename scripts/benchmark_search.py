@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark Search - Times queries against data/states/ for each search category
+
+Loads every state once, then runs each query in each category with the
+search cache disabled through the in-memory inverted index, the SQLite FTS5
+index (search_backend='sqlite') and the document scan (use_index=False),
+and prints the mean time per search.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from gui.utils.json_search_engine import JSONSearchEngine
+
+QUERIES = ['veteran', 'university', 'blue', 'state', 'o', 'purple heart', '46']
+
+
+def time_searches(engine: JSONSearchEngine, category: str, repeat: int) -> float:
+    """Mean seconds per search over QUERIES"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            engine.search_cache.clear()
+            engine.search(query, category=category)
+    return (time.perf_counter() - start) / (repeat * len(QUERIES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="runs of each query (default 5)")
+    args = parser.parse_args()
+
+    engines = {
+        'index': JSONSearchEngine(str(PROJECT_ROOT / "data" / "states")),
+        'sqlite': JSONSearchEngine(str(PROJECT_ROOT / "data" / "states"), search_backend='sqlite'),
+        'scan': JSONSearchEngine(str(PROJECT_ROOT / "data" / "states"), use_index=False),
+    }
+    for engine in engines.values():
+        engine.incremental_search = False
+        for future in engine.warm_up():
+            future.result()
+
+    categories = ['all'] + list(engines['index'].field_mappings)
+    print(f"{'category':<16}" + ''.join(f"{name:>12}" for name in engines))
+    for category in categories:
+        timings = [time_searches(engine, category, args.repeat) for engine in engines.values()]
+        print(f"{category:<16}" + ''.join(f"{seconds * 1000:>10.2f}ms" for seconds in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Build State Snapshots - Pre-builds the binary snapshot cache of data/states/
+
+Run before packaging so the PyInstaller bundle ships data/states_snapshot/
+and the application starts without parsing the state JSON files.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from gui.utils.json_search_engine import JSONSearchEngine
+
+
+def main():
+    engine = JSONSearchEngine(str(PROJECT_ROOT / "data" / "states"))
+    
+    start = time.perf_counter()
+    built = engine.build_snapshots()
+    elapsed = time.perf_counter() - start
+    
+    print(f"✅ Built {len(built)} snapshots in {elapsed:.1f}s ({engine.snapshots.directory})")
+    if built:
+        print(f"   {', '.join(built)}")
+
+
+if __name__ == "__main__":
+    main()
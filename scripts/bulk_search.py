@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Bulk Search - Runs every query of a newline-delimited file against data/states/
+
+Blank lines are skipped. The queries are searched together with
+JSONSearchEngine.search_many(), and the number of matches of each query is
+printed; --json writes the full results, keyed by query.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from gui.utils.json_search_engine import JSONSearchEngine
+
+
+def read_queries(file_path: str) -> list:
+    """Non-blank lines of a file, without their line endings"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return [line.rstrip('\r\n') for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('queries', help="file with one query per line")
+    parser.add_argument('--category', default='all', help="search category (default all)")
+    parser.add_argument('--state', help="search only this state code")
+    parser.add_argument('--json', metavar='PATH', help="write the results as JSON to PATH")
+    parser.add_argument('--data-dir', default=str(PROJECT_ROOT / "data" / "states"),
+                        help="state data directory (default data/states)")
+    args = parser.parse_args()
+
+    queries = read_queries(args.queries)
+    engine = JSONSearchEngine(args.data_dir)
+    engine.incremental_search = False
+    results = engine.search_many(queries, category=args.category,
+                                 state_filter=args.state.upper() if args.state else None)
+
+    width = max((len(query) for query in results), default=0)
+    for query, matches in results.items():
+        print(f"{query:<{width}}  {len(matches):>6}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {len(results)} queries to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
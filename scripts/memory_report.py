@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Memory Report - Memory held by data/states/ as parsed dicts and as compact records
+
+Parses every state file, then converts them with compact_state_data() (the
+form StateRepository keeps in memory) and prints the bytes traced by
+tracemalloc for both.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from gui.utils.state_records import measure_compaction
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default=str(PROJECT_ROOT / "data" / "states"),
+                        help="state data directory (default data/states)")
+    args = parser.parse_args()
+
+    files = sorted(Path(args.data_dir).glob("*.json"))
+    raw_files = [path.read_bytes() for path in files]
+    plain_bytes, compact_bytes = measure_compaction(raw_files)
+
+    mb = 1024 * 1024
+    saved = plain_bytes - compact_bytes
+    print(f"State files:  {len(files)} ({sum(len(raw) for raw in raw_files) / mb:.1f} MB on disk)")
+    print(f"As dicts:     {plain_bytes / mb:.1f} MB")
+    print(f"As records:   {compact_bytes / mb:.1f} MB")
+    print(f"Saved:        {saved / mb:.1f} MB ({saved / plain_bytes:.0%})" if plain_bytes else "Saved:        -")
+
+
+if __name__ == "__main__":
+    main()
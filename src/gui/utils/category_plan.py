@@ -0,0 +1,69 @@
+"""
+Category Plan - Search categories compiled for selecting flattened documents
+
+A category's field list (JSONSearchEngine.field_mappings) is compiled once
+into a CategoryPlan instead of being re-checked against the list for every
+document of every query: membership is decided once per distinct document
+keys tuple, the order fields are reported in is precomputed, and for each
+loaded state the plan keeps the documents it selects, so scanning a state
+only tests the query against the category's own documents.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+from .search_documents import SearchDocument
+
+
+Hit = Tuple[int, SearchDocument]
+
+
+class CategoryPlan:
+    """A search category's fields compiled for selecting and ordering documents"""
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = tuple(fields)
+        self.match_all = 'all' in self.fields
+        self.field_set = frozenset(self.fields)
+        # Direct plate fields are reported in the order of the category's field list
+        self.field_rank = {field: rank for rank, field in enumerate(self.fields)}
+        self._keys_selected: Dict[Tuple[str, ...], bool] = {}
+        # state code -> (the documents list the hits were selected from, hits)
+        self._state_hits: Dict[str, Tuple[List[SearchDocument], List[Hit]]] = {}
+
+    def __repr__(self) -> str:
+        return f"CategoryPlan({list(self.fields)})"
+
+    def selects(self, document: SearchDocument) -> bool:
+        """Check whether the category searches a document"""
+        if document.always:
+            return True
+        if self.match_all:
+            return document.in_all
+        selected = self._keys_selected.get(document.keys)
+        if selected is None:
+            selected = self._keys_selected[document.keys] = not self.field_set.isdisjoint(document.keys)
+        return selected
+
+    def select(self, documents: List[SearchDocument]) -> List[Hit]:
+        """Get the (position, document) pairs of the documents the category searches"""
+        selects = self.selects
+        return [(position, document) for position, document in enumerate(documents) if selects(document)]
+
+    def state_hits(self, state_code: str, documents: List[SearchDocument]) -> List[Hit]:
+        """select() for a loaded state's documents, kept until the state's documents change"""
+        cached = self._state_hits.get(state_code)
+        if cached is not None and cached[0] is documents:
+            return cached[1]
+        hits = self.select(documents)
+        self._state_hits[state_code] = (documents, hits)
+        return hits
+
+    def forget_state(self, state_code: str):
+        """Drop the documents kept for a state"""
+        self._state_hits.pop(state_code, None)
+
+    def order_key(self, document: SearchDocument) -> int:
+        """Rank of a document's field among the category's fields (0 when unordered)"""
+        if document.top_level and not self.match_all:
+            return self.field_rank.get(document.field, 0)
+        return 0
@@ -0,0 +1,92 @@
+"""
+Corpus Stats - Counts of the searchable data per state, field and search category
+
+A StateStats is computed from a state's flattened search documents when the
+state is stored for searching, and is kept while the state file is unchanged
+(also after the state's data is evicted from memory), so coverage of all
+jurisdictions is reported without re-walking their data.
+
+Category counts are records with a value in one of the category's fields:
+plate types, plus a state's own fields counted as one record, like the
+records a structured query matches (see search_query.py). Documents every
+category searches (character formatting, processing notes) do not count.
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from .category_plan import CategoryPlan
+from .search_documents import SearchDocument, STATE_RECORD
+
+
+# Documents a category plan selects or rejects alike
+_Signature = Tuple[Tuple[str, ...], bool]
+
+
+class StateStats:
+    """Counts of one state's searchable data"""
+
+    def __init__(self, state_code: str, documents: List[SearchDocument],
+                 stamp: Optional[Tuple[int, int]] = None):
+        self.state_code = state_code
+        self.stamp = stamp  # (mtime_ns, size) of the state file the counts came from
+        self.documents = len(documents)
+        self.field_counts: Dict[str, int] = {}
+
+        records: Set[int] = set()
+        # One representative document per signature, with the records that have such a document
+        self._record_groups: Dict[_Signature, Tuple[SearchDocument, Set[int]]] = {}
+        for document in documents:
+            self.field_counts[document.field] = self.field_counts.get(document.field, 0) + 1
+            records.add(document.record)
+            if document.always:
+                continue
+            signature = (document.keys, document.in_all)
+            group = self._record_groups.get(signature)
+            if group is None:
+                group = self._record_groups[signature] = (document, set())
+            group[1].add(document.record)
+        self.plate_types = len(records - {STATE_RECORD})
+        self._category_records: Dict[CategoryPlan, int] = {}
+
+    def __repr__(self) -> str:
+        return f"StateStats({self.state_code!r}, plate_types={self.plate_types}, documents={self.documents})"
+
+    def category_records(self, category_plan: CategoryPlan) -> int:
+        """Number of records with a value in one of the category's fields"""
+        count = self._category_records.get(category_plan)
+        if count is None:
+            records: Set[int] = set()
+            for document, group in self._record_groups.values():
+                if category_plan.selects(document):
+                    records |= group
+            count = self._category_records[category_plan] = len(records)
+        return count
+
+    def to_dict(self, category_plans: Dict[str, CategoryPlan]) -> Dict[str, object]:
+        return {
+            'plate_types': self.plate_types,
+            'documents': self.documents,
+            'categories': {category: self.category_records(plan) for category, plan in category_plans.items()},
+            'fields': dict(sorted(self.field_counts.items())),
+        }
+
+
+def combine_stats(state_stats: List[StateStats], category_plans: Dict[str, CategoryPlan]) -> Dict[str, object]:
+    """Totals over several states, with the per-state counts under 'by_state'"""
+    categories = dict.fromkeys(category_plans, 0)
+    fields: Dict[str, int] = {}
+    by_state = {}
+    for stats in state_stats:
+        state_dict = by_state[stats.state_code] = stats.to_dict(category_plans)
+        for category, count in state_dict['categories'].items():
+            categories[category] += count
+        for field, count in stats.field_counts.items():
+            fields[field] = fields.get(field, 0) + count
+    return {
+        'states': len(state_stats),
+        'plate_types': sum(stats.plate_types for stats in state_stats),
+        'documents': sum(stats.documents for stats in state_stats),
+        'categories': categories,
+        'fields': dict(sorted(fields.items())),
+        'by_state': by_state,
+    }
@@ -0,0 +1,194 @@
+"""
+FTS Index - SQLite FTS5 backend for the search index
+
+Drop-in alternative to SearchIndex (search_index.py) selected with
+JSONSearchEngine(search_backend='sqlite'). The distinct document texts are
+stored in an FTS5 table with the trigram tokenizer, which answers substring
+("contains") queries of three or more characters from its index; shorter
+queries use LIKE. The flattened documents of states and plate types are the
+same as the in-memory index's, so both backends return the same results.
+
+The database is in memory unless a file path is given.
+"""
+
+import heapq
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from .search_documents import SearchDocument, flatten_state_data
+from .search_index import allocate_ids
+
+
+# The trigram tokenizer matches substrings of at least this many characters
+FTS_MIN_QUERY_LENGTH = 3
+
+
+def fts5_available() -> bool:
+    """Whether the sqlite3 library was built with FTS5 and its trigram tokenizer"""
+    try:
+        connection = sqlite3.connect(':memory:')
+        try:
+            connection.execute("CREATE VIRTUAL TABLE probe USING fts5(text, tokenize='trigram')")
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def _phrase(query_lower: str) -> str:
+    """Quote a query as an FTS5 phrase so its characters are matched literally"""
+    return '"' + query_lower.replace('"', '""') + '"'
+
+
+def _like_pattern(query_lower: str) -> str:
+    """LIKE pattern matching the query anywhere, with the wildcards escaped"""
+    escaped = query_lower.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+class FTSSearchIndex:
+    """Search index storing the document texts in an SQLite FTS5 trigram table.
+
+    Offers the SearchIndex interface used by JSONSearchEngine. Documents with
+    identical text share one row (rowid = text id); the documents of each
+    text are kept in memory, like the states' flattened documents they
+    reference. Candidates are verified with a substring test, so matching
+    is exactly that of SearchIndex. Like SearchIndex, removing a state frees
+    its document slots and deletes the rows of texts no other document has.
+
+    Raises sqlite3.Error if FTS5 is not available.
+    """
+
+    def __init__(self, database_path: str = ':memory:'):
+        self.database_path = database_path
+        # Warm-up threads add states while the GUI thread searches
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._connection_lock = threading.Lock()
+        with self._connection_lock:
+            self._connection.execute("DROP TABLE IF EXISTS search_text")
+            self._connection.execute("CREATE VIRTUAL TABLE search_text USING fts5(text, tokenize='trigram')")
+            self._connection.commit()
+
+        self.documents: List[Optional[SearchDocument]] = []  # None in slots freed by removed states
+        self._state_documents: Dict[str, List[int]] = {}
+        self.document_count = 0
+        self._total_text_length = 0
+        self._free_doc_ids: List[int] = []  # heaps of freed ids, reused smallest first
+        self._free_text_ids: List[int] = []
+
+        self._text_ids: Dict[str, int] = {}
+        self._text_documents: List[Optional[List[int]]] = []  # None for rowids of deleted texts
+
+    def __contains__(self, state_code: str) -> bool:
+        return state_code in self._state_documents
+
+    @property
+    def indexed_states(self) -> List[str]:
+        return list(self._state_documents.keys())
+
+    def add_state(self, state_code: str, data: Dict[str, Any],
+                  documents: Optional[List[SearchDocument]] = None):
+        """Index a state's flattened documents (no-op if already indexed)"""
+        if state_code in self._state_documents:
+            return
+
+        if documents is None:
+            documents = flatten_state_data(state_code, data)
+        new_texts = []
+        doc_ids = allocate_ids(self.documents, self._free_doc_ids, len(documents))
+        for doc_id, document in zip(doc_ids, documents):
+            self.documents[doc_id] = document
+            text_id = self._text_ids.get(document.text)
+            if text_id is None:
+                text_id = self._text_ids[document.text] = allocate_ids(self._text_documents, self._free_text_ids, 1)[0]
+                self._text_documents[text_id] = []
+                new_texts.append((text_id, document.text))
+            self._text_documents[text_id].append(doc_id)
+            self._total_text_length += len(document.text)
+        self._state_documents[state_code] = doc_ids
+        self.document_count += len(doc_ids)
+
+        if new_texts:
+            with self._connection_lock:
+                self._connection.executemany("INSERT INTO search_text (rowid, text) VALUES (?, ?)", new_texts)
+                self._connection.commit()
+
+    def remove_state(self, state_code: str) -> bool:
+        """Drop a state's documents (their texts stay in the table while other states have them)"""
+        doc_ids = self._state_documents.pop(state_code, None)
+        if doc_ids is None:
+            return False
+
+        removed_by_text: Dict[str, set] = {}
+        for doc_id in doc_ids:
+            text = self.documents[doc_id].text
+            removed_by_text.setdefault(text, set()).add(doc_id)
+            self._total_text_length -= len(text)
+            self.documents[doc_id] = None
+            heapq.heappush(self._free_doc_ids, doc_id)
+        self.document_count -= len(doc_ids)
+
+        dropped_text_ids = []
+        for text, removed in removed_by_text.items():
+            text_id = self._text_ids[text]
+            remaining = [d for d in self._text_documents[text_id] if d not in removed]
+            if remaining:
+                self._text_documents[text_id] = remaining
+            else:
+                del self._text_ids[text]
+                self._text_documents[text_id] = None
+                heapq.heappush(self._free_text_ids, text_id)
+                dropped_text_ids.append((text_id,))
+        if dropped_text_ids:
+            with self._connection_lock:
+                self._connection.executemany("DELETE FROM search_text WHERE rowid = ?", dropped_text_ids)
+                self._connection.commit()
+        return True
+
+    def lookup(self, query_lower: str) -> List[int]:
+        """Return ids of all documents whose text contains query_lower, in index order"""
+        if not query_lower:
+            return []
+        if len(query_lower) >= FTS_MIN_QUERY_LENGTH:
+            sql, parameter = "SELECT rowid, text FROM search_text WHERE text MATCH ?", _phrase(query_lower)
+        else:
+            sql, parameter = "SELECT rowid, text FROM search_text WHERE text LIKE ? ESCAPE '\\'", \
+                _like_pattern(query_lower)
+        with self._connection_lock:
+            rows = self._connection.execute(sql, (parameter,)).fetchall()
+
+        doc_ids: List[int] = []
+        for text_id, text in rows:
+            if query_lower in text:
+                doc_ids.extend(self._text_documents[text_id])
+        doc_ids.sort()
+        return doc_ids
+
+    def lookup_many(self, queries_lower: Iterable[str]) -> Dict[str, List[int]]:
+        """lookup() for many queries, each distinct query looked up once"""
+        return {query_lower: self.lookup(query_lower) for query_lower in dict.fromkeys(queries_lower)}
+
+    @property
+    def average_text_length(self) -> float:
+        """Mean length of the indexed document texts (for BM25 length normalization)"""
+        return self._total_text_length / self.document_count if self.document_count else 0.0
+
+    def document_frequency(self, term: str) -> int:
+        """Number of indexed documents whose text contains term"""
+        return len(self.lookup(term))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size statistics"""
+        return {
+            'backend': 'sqlite',
+            'states': len(self._state_documents),
+            'documents': self.document_count,
+            'distinct_texts': len(self._text_ids),
+        }
+
+    def close(self):
+        """Close the database connection"""
+        with self._connection_lock:
+            self._connection.close()
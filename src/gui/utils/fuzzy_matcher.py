@@ -0,0 +1,202 @@
+"""
+Fuzzy Matcher - Typo-tolerant plate type name lookup
+
+Indexes every word of the plate type names with SymSpell-style deletes:
+each word is stored under all variants with up to max_distance characters
+deleted, so a misspelled query word finds its candidates by generating its
+own deletes and looking them up instead of comparing against the whole
+vocabulary. Candidates are verified with the optimal string alignment
+(Damerau-Levenshtein) distance, and names are ranked by how closely all
+query words match their words ("Purple Hart" -> "Purple Heart"). Adjacent
+name words are also indexed joined together, so a query that runs them
+into one word still matches ("Allstate" -> "Ball State").
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Edit distance allowed per word: short words must match more closely
+MAX_EDIT_DISTANCE = 2
+SHORT_WORD_LENGTH = 4
+
+# Deletes are generated from this many leading characters (as in SymSpell),
+# which keeps the index small for long words; candidates are verified in full
+DELETE_PREFIX_LENGTH = 7
+
+# The last query word also matches as a prefix of a name word (type-ahead)
+PREFIX_MIN_LENGTH = 3
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def split_words(text: str) -> List[str]:
+    """Lowercased words of a name or query"""
+    return _WORD_RE.findall(text.lower())
+
+
+def index_terms(name: str) -> List[str]:
+    """Words of a name plus each pair of adjacent words joined together"""
+    words = split_words(name)
+    return words + [first + second for first, second in zip(words, words[1:])]
+
+
+def _allowed_distance(word: str, max_distance: int) -> int:
+    return min(max_distance, 1 if len(word) <= SHORT_WORD_LENGTH else max_distance)
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """All variants of word with up to distance characters deleted (including word)"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        next_frontier = set()
+        for variant in frontier:
+            if len(variant) <= 1:
+                continue
+            for i in range(len(variant)):
+                next_frontier.add(variant[:i] + variant[i + 1:])
+        next_frontier -= variants
+        variants |= next_frontier
+        frontier = next_frontier
+    return variants
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or max_distance + 1 if it is larger"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+@dataclass
+class FuzzyMatch:
+    """A plate type name matching a query, with the states that issue it"""
+    name: str
+    states: List[str]
+    distance: int       # total edits over the query words
+    score: float        # 1.0 for an exact word match of every query word
+    matched_words: List[str] = field(default_factory=list)
+
+
+class FuzzyMatcher:
+    """Edit-distance index over plate type names and their owning states"""
+
+    def __init__(self, names_to_states: Dict[str, Iterable[str]], max_distance: int = MAX_EDIT_DISTANCE):
+        self.max_distance = max_distance
+        self.names: List[str] = []
+        self.name_states: List[List[str]] = []
+        self._word_names: Dict[str, Set[int]] = {}
+        # delete variant -> word prefixes, prefix -> words (words sharing a prefix share its deletes)
+        self._delete_prefixes: Dict[str, Set[str]] = {}
+        self._prefix_group: Dict[str, Set[str]] = {}
+        self._prefix_words: Dict[str, Set[str]] = {}
+
+        for name, states in names_to_states.items():
+            name_id = len(self.names)
+            self.names.append(name)
+            self.name_states.append(sorted(states))
+            for word in index_terms(name):
+                if word not in self._word_names:
+                    self._add_word(word)
+                self._word_names[word].add(name_id)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _add_word(self, word: str):
+        self._word_names[word] = set()
+        prefix = word[:DELETE_PREFIX_LENGTH]
+        group = self._prefix_group.get(prefix)
+        if group is None:
+            group = self._prefix_group[prefix] = set()
+            for variant in _deletes(prefix, _allowed_distance(word, self.max_distance)):
+                self._delete_prefixes.setdefault(variant, set()).add(prefix)
+        group.add(word)
+        self._prefix_words.setdefault(word[:PREFIX_MIN_LENGTH], set()).add(word)
+
+    def word_candidates(self, query_word: str, allow_prefix: bool = False) -> Dict[str, int]:
+        """Vocabulary words within edit distance of query_word, mapped to their distance"""
+        max_distance = _allowed_distance(query_word, self.max_distance)
+        candidates: Set[str] = set()
+        for variant in _deletes(query_word[:DELETE_PREFIX_LENGTH], max_distance):
+            for prefix in self._delete_prefixes.get(variant, ()):
+                candidates |= self._prefix_group[prefix]
+
+        matches = {}
+        for word in candidates:
+            distance = edit_distance(query_word, word, max_distance)
+            if distance <= max_distance:
+                matches[word] = distance
+
+        if allow_prefix and len(query_word) >= PREFIX_MIN_LENGTH:
+            # An unfinished last word matches the start of longer words
+            for word in self._prefix_words.get(query_word[:PREFIX_MIN_LENGTH], ()):
+                if word.startswith(query_word) and word not in matches:
+                    matches[word] = 0
+        return matches
+
+    def search(self, query: str, limit: int = 50, states: Optional[Iterable[str]] = None) -> List[FuzzyMatch]:
+        """Find names where every query word matches one of their words, best first"""
+        query_words = split_words(query)
+        if not query_words:
+            return []
+        state_filter = set(states) if states is not None else None
+
+        # name id -> per query word (distance, matched word)
+        best: Optional[Dict[int, List[Tuple[int, str]]]] = None
+        for position, query_word in enumerate(query_words):
+            allow_prefix = position == len(query_words) - 1
+            word_hits: Dict[int, Tuple[int, str]] = {}
+            for word, distance in self.word_candidates(query_word, allow_prefix).items():
+                for name_id in self._word_names[word]:
+                    hit = word_hits.get(name_id)
+                    if hit is None or distance < hit[0]:
+                        word_hits[name_id] = (distance, word)
+            if best is None:
+                best = {name_id: [hit] for name_id, hit in word_hits.items()}
+            else:
+                best = {name_id: hits + [word_hits[name_id]] for name_id, hits in best.items()
+                        if name_id in word_hits}
+            if not best:
+                return []
+
+        matches = []
+        query_length = sum(len(word) for word in query_words)
+        for name_id, hits in best.items():
+            name_states = self.name_states[name_id]
+            if state_filter is not None:
+                name_states = [state for state in name_states if state in state_filter]
+                if not name_states:
+                    continue
+            distance = sum(hit_distance for hit_distance, _ in hits)
+            matches.append(FuzzyMatch(
+                name=self.names[name_id],
+                states=name_states,
+                distance=distance,
+                score=max(0.0, 1.0 - distance / max(query_length, 1)),
+                matched_words=[word for _, word in hits],
+            ))
+
+        # Fewest edits first, then the name with the fewest extra words
+        matches.sort(key=lambda m: (m.distance, len(split_words(m.name)), m.name.lower()))
+        return matches[:limit]
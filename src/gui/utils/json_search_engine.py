@@ -2,19 +2,139 @@
 JSON Search Engine - Handles searching through license plate JSON data
 """
 
+import csv
 import json
 import re
 import os
+import sqlite3
 import sys
-from typing import Dict, List, Any, Optional
+import time
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterable, Iterator, NamedTuple
 from pathlib import Path
-from utils.logger import log_error, log_warning
+from dataclasses import dataclass
+from utils.logger import log_debug, log_error, log_warning
+from .search_documents import SearchDocument, flatten_state_data, STATE_RECORD
+from .search_index import SearchIndex
+from .fts_index import FTSSearchIndex
+from .lru_cache import LRUCache
+from .fuzzy_matcher import FuzzyMatcher
+from .search_ranking import SearchRanker, query_terms
+from .search_query import QueryPlan, QuerySyntaxError, Term, parse_query
+from .category_plan import CategoryPlan
+from .suggestion_trie import SuggestionTrie, count_values
+from .corpus_stats import StateStats, combine_stats
+from .plate_table import STATE_COLUMN, PlateTypeTable
+from .plate_identifier import PlateIdentifier, Identification, DEFAULT_CANDIDATE_LIMIT, MIN_CANDIDATE_SCORE
+from .state_repository import StateRepository, PARSED_SIZE_FACTOR, file_stamp, shared_state_repository
+
+
+# Search index backends: the in-memory inverted index or an SQLite FTS5 table
+SEARCH_BACKENDS = ('memory', 'sqlite')
+DEFAULT_SEARCH_BACKEND = 'memory'
+
+# Memory budgets for the search result and loaded state caches
+DEFAULT_SEARCH_CACHE_BYTES = 32 * 1024 * 1024
+DEFAULT_STATE_CACHE_BYTES = 256 * 1024 * 1024
+
+RESULT_ENTRY_BYTES = 400
+
+# Minimum seconds between automatic checks of state file modification times
+STALE_CHECK_INTERVAL = 2.0
+
+# Worker threads used to load and index states in the background
+WARM_UP_WORKERS = 4
+
+# Search category answered by the typo-tolerant plate type name matcher
+FUZZY_CATEGORY = 'fuzzy'
+FUZZY_RESULT_LIMIT = 50
+
+# Results returned by search_ranked() unless the caller asks for another limit
+DEFAULT_RESULT_LIMIT = 100
+
+# States search_iter() searches before any others
+STREAM_PRIORITY_STATES = ('FL',)
+
+# Index lookups are skipped for categories selecting at most this share of the documents
+CATEGORY_SCAN_RATIO = 0.25
+
+# Query scopes that name a field differently (code:46 -> code_number)
+FIELD_SCOPE_ALIASES = {'code': 'code_number'}
+
+# Fields whose values are offered as completions in the 'all' and fuzzy categories
+SUGGESTION_FIELDS = frozenset([
+    'type_name', 'slogan', 'name', 'font', 'main_font', 'logo', 'main_logo',
+    'color', 'background_color', 'text_color', 'accent_color', 'primary_colors', 'code_number',
+])
+FUZZY_SUGGESTION_FIELDS = frozenset(['type_name'])
+# Longer values (descriptions, notes) are not offered as completions
+SUGGESTION_MAX_LENGTH = 60
+DEFAULT_SUGGESTION_LIMIT = 5
+
+# Plate type name -> states list, kept next to data/states/
+PLATE_TYPE_MAPPING_FILE = 'state_plate_type_mapping.json'
+
+
+class RankedResults(NamedTuple):
+    """The most relevant results of a search, best first, and how many matched in total"""
+    results: List[Dict]
+    total_count: int
+
+
+class SearchBatch(NamedTuple):
+    """Results of one searched state, yielded by search_iter()"""
+    state_code: Optional[str]
+    results: List[Dict]
+    searched: int  # states searched so far, including this one
+    total: int     # states the search covers
+    # The reported documents behind the results, for rank_documents() (None for cached or fuzzy results)
+    documents: Optional[List[SearchDocument]] = None
+
+
+def _estimate_state_size(data: Dict[str, Any]) -> int:
+    """Approximate memory used by parsed state data that has no file (e.g. sample data)
+    
+    Sized like a loaded file: the length of its JSON text times PARSED_SIZE_FACTOR.
+    """
+    return len(json.dumps(data, default=str)) * PARSED_SIZE_FACTOR
+
+
+def _estimate_results_size(results) -> int:
+    """Approximate memory used by a cached result list"""
+    if isinstance(results, RankedResults):
+        results = results.results
+    return sys.getsizeof(results) + sum(RESULT_ENTRY_BYTES + len(str(r.get('value', ''))) for r in results)
+
+
+@dataclass
+class TypeAheadState:
+    """Matches of the previous index search, kept so an extended query can refine them"""
+    query_lower: str
+    category: str
+    state_filter: Optional[str]
+    documents: List[SearchDocument]  # matching documents in result order, before de-duplication
+    states: frozenset                # the indexed states the documents cover
+    data_version: int                # the loaded data they were looked up in
+    
+    def can_refine(self, query_lower: str, category: str, state_filter: Optional[str],
+                   states: frozenset, data_version: int) -> bool:
+        """An extended query can only match documents the previous query matched"""
+        return (self.category == category and self.state_filter == state_filter
+                and self.query_lower in query_lower
+                and states <= self.states and data_version == self.data_version)
 
 
 class JSONSearchEngine:
     """Advanced search engine for license plate JSON data"""
     
-    def __init__(self, data_directory: Optional[str] = None):
+    def __init__(self, data_directory: Optional[str] = None, use_index: bool = True,
+                 search_cache_bytes: int = DEFAULT_SEARCH_CACHE_BYTES,
+                 state_cache_bytes: int = DEFAULT_STATE_CACHE_BYTES,
+                 snapshot_directory: Optional[str] = None, use_snapshots: bool = True,
+                 search_backend: str = DEFAULT_SEARCH_BACKEND,
+                 repository: Optional[StateRepository] = None):
         # Get base application path (works for both script and PyInstaller)
         if getattr(sys, 'frozen', False):
             application_path = sys._MEIPASS  # type: ignore
@@ -26,8 +146,56 @@ class JSONSearchEngine:
         else:
             self.data_directory = os.path.join(application_path, 'data', 'states')
         
-        self.loaded_data: Dict[str, Any] = {}
-        self.search_cache: Dict[str, List[Dict]] = {}
+        # State files are read through the process-wide repository shared with the UI,
+        # which uses binary snapshots of parsed states while the JSON is unchanged
+        self.repository = repository or shared_state_repository(self.data_directory, snapshot_directory,
+                                                                use_snapshots)
+        self.snapshots = self.repository.snapshots
+        
+        # Bounded LRU caches; loaded states are invalidated when their file changes
+        self.loaded_data = LRUCache(state_cache_bytes, sizeof=_estimate_state_size,
+                                    on_evict=self._on_state_evicted)
+        self.search_cache = LRUCache(search_cache_bytes, sizeof=_estimate_results_size)
+        self._state_file_stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.stale_check_interval = STALE_CHECK_INTERVAL
+        self._last_stale_check = time.monotonic()
+        
+        # Flattened search documents per state, built once when the state is loaded
+        self.state_documents: Dict[str, List[SearchDocument]] = {}
+        self.state_names: Dict[str, str] = {}
+        
+        # Inverted index over the documents (use_index=False scans each state's documents)
+        self.use_index = use_index
+        self.index = self._create_index(search_backend)
+        self.search_backend = 'sqlite' if isinstance(self.index, FTSSearchIndex) else 'memory'
+        
+        # Guards caches and the index, which background warm-up threads also write
+        self._lock = threading.RLock()
+        self._pending_loads: Dict[str, Future] = {}
+        
+        # Typo-tolerant plate type name lookup, built on first use
+        self._fuzzy_matcher: Optional[FuzzyMatcher] = None
+        self._fuzzy_state_names: Dict[str, str] = {}
+        
+        # Autocomplete tries per suggested field set, rebuilt when the loaded data changes
+        # (guarded by their own lock so completing never waits for a search)
+        self._suggestion_tries: Dict[frozenset, Tuple[int, SuggestionTrie]] = {}
+        self._suggestion_lock = threading.Lock()
+        self._suggestion_builds: Dict[frozenset, Future] = {}
+        self._suggestion_executor: Optional[ThreadPoolExecutor] = None
+        self._data_version = 0
+        
+        # Data coverage counts per state, kept (also once evicted) until the state file changes
+        self._state_stats: Dict[str, StateStats] = {}
+        
+        # Columnar table of all plate types for attribute filters, rebuilt when the loaded data changes
+        self._plate_table: Optional[Tuple[int, PlateTypeTable]] = None
+        # Plate string -> candidate plate types, built over the current plate table
+        self._plate_identifier: Optional[PlateIdentifier] = None
+        
+        # Type-ahead: refine the previous match set when the query is extended
+        self.incremental_search = True
+        self._type_ahead: Optional[TypeAheadState] = None
         
         # State code to filename mapping - All 60 jurisdictions
         self.state_filename_map = {
@@ -75,40 +243,175 @@ class JSONSearchEngine:
                 'omit_characters', 'vertical_handling'
             ]
         }
+        # field_mappings compiled per category (recompiled by add_search_category)
+        self._category_plans: Dict[str, CategoryPlan] = {}
         
+    @staticmethod
+    def _create_index(search_backend: str):
+        """Create the search index of a backend (the in-memory index if SQLite lacks FTS5)"""
+        if search_backend not in SEARCH_BACKENDS:
+            raise ValueError(f"Unknown search backend '{search_backend}', expected one of {SEARCH_BACKENDS}")
+        if search_backend == 'sqlite':
+            try:
+                return FTSSearchIndex()
+            except sqlite3.Error as e:
+                log_warning(f"SQLite FTS5 search backend unavailable, using the in-memory index: {e}")
+        return SearchIndex()
+    
     def get_all_state_codes(self) -> List[str]:
         """Get list of all available state codes from state_filename_map"""
         return list(self.state_filename_map.keys())
     
+    def _get_state_file(self, state_code: str) -> Path:
+        """Get the JSON file path for a state"""
+        return self.repository.state_file(state_code)
+    
+    def _get_file_stamp(self, state_code: str) -> Optional[Tuple[int, int]]:
+        """Get (mtime_ns, size) of a state's file, or None if it does not exist"""
+        return file_stamp(self._get_state_file(state_code))
+    
     def load_state_data(self, state_code: str) -> Dict[str, Any]:
         """Load JSON data for a specific state"""
-        if state_code in self.loaded_data:
-            return self.loaded_data[state_code]
-            
+        self._check_stale_states()
+        with self._lock:
+            data = self.loaded_data.get(state_code)
+            pending = self._pending_loads.get(state_code)
+        if data is not None:
+            return data
+        
+        if pending is not None:
+            # A warm-up worker is already loading this state: wait for just that one
+            try:
+                pending.result()
+            except CancelledError:
+                pass
+            with self._lock:
+                data = self.loaded_data.get(state_code)
+            if data is not None:
+                return data
+        
+        return self._read_state_file(state_code)
+    
+    def _read_state_file(self, state_code: str) -> Dict[str, Any]:
+        """Get a state's data from the repository and store it (sample data if it cannot be read)"""
         # Try to load from file using correct filename
-        filename_base = self.state_filename_map.get(state_code, state_code.lower())
-        filename = f"{filename_base}.json"
-        data_file = Path(self.data_directory) / filename
+        data_file = self._get_state_file(state_code)
+        filename = data_file.name
+        stamp = self._get_file_stamp(state_code)
         
         try:
             if data_file.exists():
-                with open(data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.loaded_data[state_code] = data
-                    print(f"✅ Loaded real data for {state_code} from {filename}")
-                    return data
+                loaded = self.repository.load(state_code)
+                if loaded.documents is None:
+                    # Parsed JSON or a data-only snapshot (written for the UI): add the documents
+                    documents = self._store_state_data(state_code, loaded.data, loaded.stamp)
+                    self.repository.save_snapshot(state_code, loaded, documents)
+                else:
+                    self._store_state_data(state_code, loaded.data, loaded.stamp, loaded.documents)
+                source = filename if loaded.digest is not None else f"snapshot of {filename}"
+                log_debug(f"Loaded data for {state_code} from {source}")
+                return loaded.data
             else:
                 log_warning(f"State file not found: {data_file}")
-                print(f"⚠️ File not found: {data_file}")
         except json.JSONDecodeError as e:
             log_error(f"JSON parse error for {state_code}", exc=e)
-            print(f"⚠️ Could not load data for {state_code}: {e}")
         except OSError as e:
             log_error(f"File read error for {state_code}", exc=e)
-            print(f"⚠️ Could not load data for {state_code}: {e}")
             
         # Return sample data structure for demonstration
-        return self._get_sample_data(state_code)
+        with self._lock:
+            sample_data = self._get_sample_data(state_code)
+            # Keep the missing/broken file's stamp so it is retried only once it changes
+            self._state_file_stamps[state_code] = stamp
+        return sample_data
+    
+    def warm_up(self, state_codes: Optional[List[str]] = None, max_workers: int = WARM_UP_WORKERS,
+                progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                finished_callback: Optional[Callable[[], None]] = None) -> List[Future]:
+        """Load and index states on background threads; returns immediately.
+        
+        Searches issued meanwhile wait only for the states they need.
+        progress_callback(loaded, total, state_code) is called from the worker threads.
+        finished_callback() is called once every load has finished, been cancelled or failed.
+        """
+        if state_codes is None:
+            state_codes = self.get_all_state_codes()
+        
+        with self._lock:
+            to_load = [code for code in state_codes
+                       if code not in self.loaded_data and code not in self._pending_loads]
+            if not to_load:
+                return []
+            
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='state-warm-up')
+            futures = []
+            completed = [0]
+            
+            def finish(state_code: str, loaded: bool) -> bool:
+                """Record a finished load; returns whether it was this warm-up's last one"""
+                with self._lock:
+                    if self._pending_loads.get(state_code) is not future_of[state_code]:
+                        return False
+                    del self._pending_loads[state_code]
+                    completed[0] += 1
+                    count = completed[0]
+                if progress_callback and loaded:
+                    progress_callback(count, len(to_load), state_code)
+                return count == len(to_load)
+            
+            def run(state_code: str):
+                # Report from the worker so it is done before the future resolves
+                last = False
+                try:
+                    self._warm_up_state(state_code)
+                finally:
+                    last = finish(state_code, loaded=True)
+                    if last:
+                        try:
+                            # Build the default autocomplete trie here rather than on the first keystroke
+                            self._get_suggestion_trie('all')
+                        finally:
+                            if finished_callback:
+                                finished_callback()
+            
+            def on_done(future: Future, state_code: str):
+                if future.cancelled() and finish(state_code, loaded=False) and finished_callback:
+                    finished_callback()
+            
+            future_of: Dict[str, Future] = {}
+            for state_code in to_load:
+                future = executor.submit(run, state_code)
+                self._pending_loads[state_code] = future_of[state_code] = future
+                futures.append(future)
+            # Callbacks are attached after registration so on_done never races the submit loop
+            for state_code, future in zip(to_load, futures):
+                future.add_done_callback(lambda f, code=state_code: on_done(f, code))
+            executor.shutdown(wait=False)
+        
+        return futures
+    
+    def _warm_up_state(self, state_code: str):
+        """Warm-up worker: load one state unless something else already did"""
+        with self._lock:
+            if state_code in self.loaded_data:
+                return
+        try:
+            self._read_state_file(state_code)
+        except Exception as e:
+            log_warning(f"Error warming up state {state_code}: {e}")
+    
+    def cancel_warm_up(self):
+        """Cancel warm-up loads that have not started yet"""
+        with self._lock:
+            pending = list(self._pending_loads.values())
+        for future in pending:
+            future.cancel()
+    
+    @property
+    def is_warming_up(self) -> bool:
+        """Whether background warm-up loads are still queued or running"""
+        with self._lock:
+            return bool(self._pending_loads)
         
     def _get_sample_data(self, state_code: str) -> Dict[str, Any]:
         """Generate sample data structure for demonstration"""
@@ -161,8 +464,116 @@ class JSONSearchEngine:
             ]
         }
         
-        self.loaded_data[state_code] = sample_data
+        self._store_state_data(state_code, sample_data)
         return sample_data
+    
+    def build_snapshots(self) -> List[str]:
+        """Write snapshots for every state file that lacks a current one; returns their codes"""
+        built = []
+        for state_code in self.get_all_state_codes():
+            data_file = self._get_state_file(state_code)
+            stamp = self._get_file_stamp(state_code)
+            if stamp is None:
+                continue
+            if self.snapshots.is_current(data_file, stamp):
+                continue
+            loaded = self.repository.load(state_code)
+            documents = loaded.documents or flatten_state_data(state_code, loaded.data)
+            if self.repository.save_snapshot(state_code, loaded, documents):
+                built.append(state_code)
+        return built
+    
+    def _store_state_data(self, state_code: str, data: Dict[str, Any],
+                          stamp: Optional[Tuple[int, int]] = None,
+                          documents: Optional[List[SearchDocument]] = None) -> List[SearchDocument]:
+        """Cache loaded state data and add it to the search index; returns its documents
+        
+        The cached data is charged its file size (from the stamp the repository
+        or snapshot recorded) times PARSED_SIZE_FACTOR, the same estimate the
+        repository uses; data without a file is sized from its JSON text.
+        """
+        if documents is None:
+            documents = flatten_state_data(state_code, data)
+        with self._lock:
+            self._state_file_stamps[state_code] = stamp
+            size = stamp[1] * PARSED_SIZE_FACTOR if stamp else None
+            self.loaded_data.put(state_code, data, size=size)
+            
+            self.state_documents[state_code] = documents
+            self.state_names[state_code] = data.get('name', state_code)
+            self._data_version += 1
+            if stamp is not None:
+                # Sample data stands in for a missing file and is not counted
+                self._state_stats[state_code] = StateStats(state_code, documents, stamp)
+            if self.use_index:
+                # Replace any entries left from an earlier load of this state
+                self.index.remove_state(state_code)
+                self.index.add_state(state_code, data, documents)
+        return documents
+    
+    def _on_state_evicted(self, state_code: str, data: Dict[str, Any]):
+        """Drop an evicted state from the index so its memory is released"""
+        self._forget_state(state_code)
+    
+    def _forget_state(self, state_code: str):
+        """Remove everything derived from a state's data"""
+        self.index.remove_state(state_code)
+        self.state_documents.pop(state_code, None)
+        self.state_names.pop(state_code, None)
+        self._state_file_stamps.pop(state_code, None)
+        for category_plan in self._category_plans.values():
+            category_plan.forget_state(state_code)
+        self._data_version += 1
+        self._type_ahead = None
+    
+    def invalidate_state(self, state_code: str):
+        """Drop a state's data, index entries and any search results that include it"""
+        self.repository.invalidate(state_code)
+        with self._lock:
+            self.loaded_data.invalidate(state_code)
+            self._forget_state(state_code)
+            self._state_stats.pop(state_code, None)
+            self._fuzzy_matcher = None
+            self.search_cache.invalidate_where(lambda key, tag: tag is None or tag == state_code)
+    
+    def reload_state(self, state_code: str) -> bool:
+        """Re-read a state whose file changed, replacing only that state's index entries and results
+        
+        A state that was not loaded is only invalidated (it is read when next
+        searched). Returns whether the state was re-read.
+        """
+        with self._lock:
+            was_loaded = state_code in self.loaded_data
+        self.invalidate_state(state_code)
+        if not was_loaded:
+            return False
+        self.load_state_data(state_code)
+        return True
+    
+    def check_for_changes(self) -> List[str]:
+        """Invalidate loaded states whose files changed on disk; returns their codes"""
+        self._last_stale_check = time.monotonic()
+        with self._lock:
+            stamps = list(self._state_file_stamps.items())
+        changed = [state_code for state_code, stamp in stamps if self._get_file_stamp(state_code) != stamp]
+        for state_code in changed:
+            log_warning(f"State file changed on disk, reloading: {state_code}")
+            self.invalidate_state(state_code)
+        return changed
+    
+    def _check_stale_states(self):
+        """Check file modification times at most once per stale_check_interval"""
+        if time.monotonic() - self._last_stale_check >= self.stale_check_interval:
+            self.check_for_changes()
+    
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get hit/miss/eviction statistics for the caches and the index size"""
+        return {
+            'search_cache': self.search_cache.get_stats(),
+            'state_cache': self.loaded_data.get_stats(),
+            'index': self.index.get_stats(),
+            'repository': self.repository.get_stats(),
+        }
         
     def _get_state_name(self, state_code: str) -> str:
         """Get full state name from code"""
@@ -184,8 +595,17 @@ class JSONSearchEngine:
         search_key = f"{query}_{category}_{state_filter}"
         
         # Check cache first
-        if search_key in self.search_cache:
-            return self.search_cache[search_key]
+        self._check_stale_states()
+        with self._lock:
+            cached = self.search_cache.get(search_key)
+        if cached is not None:
+            return cached
+        
+        if category == FUZZY_CATEGORY:
+            results = self._search_fuzzy(query, state_filter)
+            with self._lock:
+                self.search_cache.put(search_key, results, tag=state_filter)
+            return results
         
         try:
             # Determine which states to search - all 60 jurisdictions
@@ -195,199 +615,557 @@ class JSONSearchEngine:
                 # Search all available states
                 states_to_search = self.get_all_state_codes()
             
+            # field:term, AND/OR/NOT and "phrases" (None for a plain text query)
+            plan = self._parse_query(query)
+            if plan is not None:
+                states_to_search = self._query_states(plan, states_to_search)
+            
             for state_code in states_to_search:
                 try:
                     state_data = self.load_state_data(state_code)
-                    state_results = self._search_state_data(query, category, state_code, state_data)
-                    results.extend(state_results)
+                    if not self.use_index and plan is None:
+                        state_results = self._search_state_data(query, category, state_code, state_data)
+                        results.extend(state_results)
                 except Exception as e:
                     log_warning(f"Error searching state {state_code}: {e}")
                     continue
-                
-            # Cache results
-            self.search_cache[search_key] = results
+            
+            with self._lock:
+                if plan is not None:
+                    results = self._documents_to_results(self._query_documents(plan, category, states_to_search))
+                elif self.use_index:
+                    results = self._search_index(query, category, state_filter, states_to_search)
+                    
+                # Cache results (tagged with the state filter for invalidation)
+                self.search_cache.put(search_key, results, tag=state_filter)
         except Exception as e:
             log_error(f"Search error for query '{query}'", exc=e)
         
         return results
+    
+    def search_many(self, queries: Iterable[str], category: str = 'all',
+                    state_filter: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """Search for many queries at once; returns each query's search() results keyed by query
+        
+        The state files are checked and loaded and the category compiled once
+        for the whole batch, and queries differing only in case share one index
+        lookup. Structured queries, the fuzzy category and use_index=False are
+        searched query by query. Results are cached for search() as usual.
+        """
+        queries = list(dict.fromkeys(queries))
+        results_by_query: Dict[str, List[Dict]] = {query: [] for query in queries}
+        self._check_stale_states()
+        
+        pending = []
+        with self._lock:
+            for query in queries:
+                if not query or not query.strip():
+                    continue
+                cached = self.search_cache.get(f"{query}_{category}_{state_filter}")
+                if cached is not None:
+                    results_by_query[query] = cached
+                else:
+                    pending.append(query)
+        
+        batched = []
+        for query in pending:
+            if self.use_index and category != FUZZY_CATEGORY and self._parse_query(query) is None:
+                batched.append(query)
+            else:
+                results_by_query[query] = self.search(query, category, state_filter)
+        if not batched:
+            return results_by_query
+        
+        states_to_search = [state_filter] if state_filter else self.get_all_state_codes()
+        for state_code in states_to_search:
+            try:
+                self.load_state_data(state_code)
+            except Exception as e:
+                log_warning(f"Error searching state {state_code}: {e}")
+        
+        try:
+            with self._lock:
+                category_plan = self._get_category_plan(category)
+                selects = category_plan.selects
+                state_rank = {state_code: rank for rank, state_code in enumerate(states_to_search)}
+                doc_ids_by_query = self.index.lookup_many(query.lower() for query in batched)
+                for query in batched:
+                    hits = []
+                    for doc_id in doc_ids_by_query[query.lower()]:
+                        document = self.index.documents[doc_id]
+                        if document.state_code in state_rank and selects(document):
+                            hits.append((doc_id, document))
+                    results = self._documents_to_results(self._order_documents(hits, category_plan, state_rank))
+                    results_by_query[query] = results
+                    self.search_cache.put(f"{query}_{category}_{state_filter}", results, tag=state_filter)
+        except Exception as e:
+            log_error(f"Batch search error for {len(batched)} queries", exc=e)
+        
+        return results_by_query
+    
+    def search_iter(self, query: str, category: str = 'all', state_filter: Optional[str] = None,
+                    priority_states: Optional[Iterable[str]] = None,
+                    cancelled: Optional[threading.Event] = None) -> Iterator[SearchBatch]:
+        """Search state by state, yielding each state's results as soon as it is searched.
+        
+        Florida is searched first, then priority_states (e.g. the queue mode's
+        primary states), then the rest; states without matches are not yielded.
+        Each batch holds the results search() would give for that state. A search
+        iterated to the end is cached for search(); stop iterating to abandon it.
+        Setting cancelled (checked before each state, e.g. from another thread)
+        ends the iteration early, also without caching.
+        Fuzzy results are ranked across states and come as a single batch.
+        """
+        if not query or not query.strip():
+            return
+        
+        search_key = f"{query}_{category}_{state_filter}"
+        self._check_stale_states()
+        with self._lock:
+            cached = self.search_cache.get(search_key)
+        
+        if category == FUZZY_CATEGORY:
+            results = cached if cached is not None else self.search(query, category, state_filter)
+            if results:
+                yield SearchBatch(state_filter, results, 1, 1)
+            return
+        
+        plan, states_to_search = self._searched_states(query, state_filter)
+        stream_order = self._priority_order(states_to_search, priority_states)
+        
+        if cached is not None:
+            cached_by_state: Dict[str, List[Dict]] = {}
+            for result in cached:
+                cached_by_state.setdefault(result['state'], []).append(result)
+            for position, state_code in enumerate(stream_order, 1):
+                if state_code in cached_by_state:
+                    yield SearchBatch(state_code, cached_by_state[state_code], position, len(stream_order))
+            return
         
-    def _search_state_data(self, query: str, category: str, state_code: str, data: Dict[str, Any]) -> List[Dict]:
-        """Search within a single state's data"""
-        results = []
         query_lower = query.lower()
+        results_by_state: Dict[str, List[Dict]] = {}
+        documents_by_state: Dict[str, List[SearchDocument]] = {}
+        for position, state_code in enumerate(stream_order, 1):
+            if cancelled is not None and cancelled.is_set():
+                return
+            try:
+                state_data = self.load_state_data(state_code)
+                with self._lock:
+                    if self.use_index:
+                        if state_code not in documents_by_state and state_code in self.index:
+                            # One lookup serves every state indexed by now; only states
+                            # indexed after it (e.g. during warm-up) need another
+                            documents_by_state = self._index_documents_by_state(
+                                query_lower, plan, category, state_filter, stream_order[position - 1:])
+                        documents = documents_by_state.pop(state_code, [])
+                    elif plan is not None:
+                        documents = self._query_documents(plan, category, [state_code])
+                    else:
+                        documents = self._scan_state_documents(query, category, state_code, state_data)
+                    documents = self._reported_documents(documents)
+                    state_results = [self._document_to_result(document) for document in documents]
+            except Exception as e:
+                log_warning(f"Error searching state {state_code}: {e}")
+                continue
+            results_by_state[state_code] = state_results
+            if state_results:
+                yield SearchBatch(state_code, state_results, position, len(stream_order), documents)
         
-        # Get fields to search based on category
-        fields_to_search = self._get_search_fields(category)
-        
-        # First, search top-level state fields (like slogan, name, etc.)
-        state_matches = self._find_matches_in_state_info(data, query_lower, fields_to_search)
-        if state_matches:
-            for match in state_matches:
-                result = {
-                    'state': state_code,
-                    'state_name': data.get('name', state_code),
-                    'field': match['field'],
-                    'value': match['value'],
-                    'match_type': 'state_info'
-                }
-                results.append(result)
+        # Searched everything: cache the results in search()'s state order
+        results = [result for state_code in states_to_search for result in results_by_state.get(state_code, ())]
+        with self._lock:
+            self.search_cache.put(search_key, results, tag=state_filter)
+    
+    def _searched_states(self, query: str, state_filter: Optional[str]) -> Tuple[Optional[QueryPlan], List[str]]:
+        """Parse a query and get the states it searches, in result order"""
+        states_to_search = [state_filter] if state_filter else self.get_all_state_codes()
+        plan = self._parse_query(query)
+        if plan is not None:
+            states_to_search = self._query_states(plan, states_to_search)
+        return plan, states_to_search
+    
+    @staticmethod
+    def _priority_order(state_codes: List[str], priority_states: Optional[Iterable[str]]) -> List[str]:
+        """Put Florida and the priority states first, keeping the order of the rest"""
+        available = set(state_codes)
+        first = [code for code in dict.fromkeys((*STREAM_PRIORITY_STATES, *(priority_states or ())))
+                 if code in available]
+        return first + [code for code in state_codes if code not in first]
+    
+    def search_ranked(self, query: str, category: str = 'all', state_filter: Optional[str] = None,
+                      limit: Optional[int] = DEFAULT_RESULT_LIMIT,
+                      boost_states: Optional[Iterable[str]] = None) -> RankedResults:
+        """Search and return the limit most relevant results, best first, with the total match count.
+        
+        Results are scored BM25-style (see search_ranking.py) and carry a 'score';
+        boost_states (e.g. the queue mode's primary states) rank higher.
+        """
+        if not query or not query.strip():
+            return RankedResults([], 0)
+        
+        boost = sorted(set(boost_states or ()))
+        search_key = self._ranked_key(query, category, state_filter, limit, boost)
+        
+        self._check_stale_states()
+        with self._lock:
+            cached = self.search_cache.get(search_key)
+        if cached is not None:
+            return cached
         
-        # Then search through plates - try both 'plate_types' and 'plates' for compatibility
-        plates = data.get('plate_types', data.get('plates', []))
-        for i, plate in enumerate(plates):
-            matches = self._find_matches_in_plate(plate, query_lower, fields_to_search)
+        ranked = RankedResults([], 0)
+        try:
+            if category == FUZZY_CATEGORY:
+                # Already ranked by edit distance
+                results = self._search_fuzzy(query, state_filter)
+                ranked = RankedResults(results[:limit] if limit is not None else results, len(results))
+            else:
+                plan, states_to_search = self._searched_states(query, state_filter)
+                documents = []
+                for state_code in states_to_search:
+                    try:
+                        state_data = self.load_state_data(state_code)
+                        if not self.use_index and plan is None:
+                            documents.extend(self._scan_state_documents(query, category, state_code, state_data))
+                    except Exception as e:
+                        log_warning(f"Error searching state {state_code}: {e}")
+                
+                with self._lock:
+                    if plan is not None:
+                        documents = self._query_documents(plan, category, states_to_search)
+                    elif self.use_index:
+                        documents = self._index_documents(query, category, state_filter, states_to_search)
+                    ranked = self._rank_documents(query, plan, self._reported_documents(documents),
+                                                  states_to_search, limit, boost)
             
-            if matches:
-                for match in matches:
-                    result = {
+            with self._lock:
+                self.search_cache.put(search_key, ranked, tag=state_filter)
+        except Exception as e:
+            log_error(f"Ranked search error for query '{query}'", exc=e)
+        
+        return ranked
+    
+    def rank_documents(self, query: str, documents: List[SearchDocument], category: str = 'all',
+                       state_filter: Optional[str] = None, limit: Optional[int] = DEFAULT_RESULT_LIMIT,
+                       boost_states: Optional[Iterable[str]] = None) -> RankedResults:
+        """Rank the documents of search_iter()'s batches, exactly as search_ranked() would.
+        
+        Lets a streamed search be ranked without searching again; the ranking
+        is cached for search_ranked().
+        """
+        boost = sorted(set(boost_states or ()))
+        plan, states_to_search = self._searched_states(query, state_filter)
+        state_rank = {state_code: rank for rank, state_code in enumerate(states_to_search)}
+        # Batches come in stream order; ties are ranked in search order
+        documents = sorted(documents, key=lambda document: state_rank.get(document.state_code, len(state_rank)))
+        with self._lock:
+            ranked = self._rank_documents(query, plan, documents, states_to_search, limit, boost)
+            self.search_cache.put(self._ranked_key(query, category, state_filter, limit, boost), ranked,
+                                  tag=state_filter)
+        return ranked
+    
+    @staticmethod
+    def _ranked_key(query: str, category: str, state_filter: Optional[str], limit: Optional[int],
+                    boost: List[str]) -> str:
+        return f"ranked_{query}_{category}_{state_filter}_{limit}_{','.join(boost)}"
+    
+    def _rank_documents(self, query: str, plan: Optional[QueryPlan], documents: List[SearchDocument],
+                        states_to_search: List[str], limit: Optional[int], boost: List[str]) -> RankedResults:
+        """Score reported documents and keep the limit best as results"""
+        # A structured query is ranked by the text of its reported terms
+        ranked_text = ' '.join(plan.text_terms()) if plan is not None else query.lower()
+        ranker = self._make_ranker(ranked_text, states_to_search, boost)
+        results = [dict(self._document_to_result(document), score=round(score, 4))
+                   for score, document in ranker.top(documents, limit)]
+        return RankedResults(results, len(documents))
+    
+    def _make_ranker(self, query_lower: str, states_to_search: List[str], boost_states: List[str]) -> SearchRanker:
+        """Build a ranker with document statistics of the index (or the searched states)"""
+        terms = set(query_terms(query_lower))
+        if self.use_index:
+            frequency = {term: self.index.document_frequency(term) for term in terms}
+            return SearchRanker(query_lower, self.index.document_count, self.index.average_text_length,
+                                frequency, boost_states)
+        
+        documents = [d for state_code in states_to_search for d in self.state_documents.get(state_code, ())]
+        frequency = {term: sum(1 for d in documents if term in d.text) for term in terms}
+        average_length = sum(len(d.text) for d in documents) / len(documents) if documents else 0.0
+        return SearchRanker(query_lower, len(documents), average_length, frequency, boost_states)
+        
+    def _search_fuzzy(self, query: str, state_filter: Optional[str] = None) -> List[Dict]:
+        """Find plate type names close to the query, best match first (one result per state)"""
+        results = []
+        try:
+            matcher = self.get_fuzzy_matcher()
+            states = [state_filter] if state_filter else None
+            for match in matcher.search(query, limit=FUZZY_RESULT_LIMIT, states=states):
+                for state_code in match.states:
+                    results.append({
                         'state': state_code,
-                        'state_name': data.get('name', state_code),
-                        'plate_type': plate.get('type_name', f"Plate {i+1}"),
-                        'field': match['field'],
-                        'value': match['value'],
-                        'match_type': 'plate_type'
-                    }
-                    results.append(result)
-                
+                        'state_name': self._get_fuzzy_state_name(state_code),
+                        'plate_type': match.name,
+                        'field': 'type_name',
+                        'value': match.name,
+                        'match_type': 'plate_type',
+                        'distance': match.distance,
+                        'score': match.score
+                    })
+        except Exception as e:
+            log_error(f"Fuzzy search error for query '{query}'", exc=e)
         return results
     
-    def _find_matches_in_state_info(self, data: Dict[str, Any], query_lower: str, fields_to_search: List[str]) -> List[Dict]:
-        """Find matches in top-level state information"""
-        matches = []
-        
-        # Search specific top-level fields - ONLY if they match the category filter
-        searchable_state_fields = {
-            'slogan': data.get('slogan', ''),
-            'name': data.get('name', ''),
-            'abbreviation': data.get('abbreviation', ''),
-            'notes': data.get('notes', ''),
-            'main_logo': data.get('main_logo', ''),
-            'main_font': data.get('main_font', ''),
-            'main_plate_text': data.get('main_plate_text', ''),
-            'main_background': data.get('main_background', ''),
-            'description': data.get('description', '')
-        }
+    def get_fuzzy_matcher(self) -> FuzzyMatcher:
+        """Get the plate type name matcher, building it on first use"""
+        with self._lock:
+            matcher = self._fuzzy_matcher
+        if matcher is None:
+            names_to_states, state_names = self._load_plate_type_vocabulary()
+            matcher = FuzzyMatcher(names_to_states)
+            with self._lock:
+                self._fuzzy_state_names = state_names
+                self._fuzzy_matcher = matcher
+        return matcher
+    
+    def _load_plate_type_vocabulary(self) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+        """Get plate type name -> states, from the mapping file or else from the state files"""
+        mapping_file = Path(self.data_directory).parent / PLATE_TYPE_MAPPING_FILE
+        try:
+            with open(mapping_file, 'r', encoding='utf-8') as f:
+                mapping = json.load(f)
+            state_names = {code: info.get('name', code)
+                           for code, info in mapping.get('state_to_plate_types', {}).items()}
+            return mapping['plate_type_to_states'], state_names
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            log_warning(f"Could not read plate type mapping {mapping_file}: {e}")
         
-        for field_name, field_value in searchable_state_fields.items():
-            # Check if this field is allowed by the category filter
-            if 'all' in fields_to_search or field_name in fields_to_search:
-                if isinstance(field_value, str) and query_lower in field_value.lower():
-                    matches.append({
-                        'field': field_name,
-                        'value': field_value,
-                        'match_type': 'exact'
-                    })
+        names_to_states: Dict[str, List[str]] = {}
+        state_names = {}
+        for state_code in self.get_all_state_codes():
+            if self._get_file_stamp(state_code) is None:
+                continue  # no sample data in the vocabulary
+            data = self.load_state_data(state_code)
+            state_names[state_code] = data.get('name', state_code)
+            for plate in data.get('plate_types', data.get('plates', [])):
+                name = plate.get('type_name') or plate.get('plate_type') if isinstance(plate, Mapping) else None
+                if name:
+                    states = names_to_states.setdefault(name, [])
+                    if state_code not in states:
+                        states.append(state_code)
+        return names_to_states, state_names
+    
+    def _get_fuzzy_state_name(self, state_code: str) -> str:
+        return (self.state_names.get(state_code) or self._fuzzy_state_names.get(state_code)
+                or self._get_state_name(state_code))
+    
+    @staticmethod
+    def _parse_query(query: str) -> Optional[QueryPlan]:
+        """Parse query syntax (see search_query.py); None for a plain text query"""
+        try:
+            return parse_query(query)
+        except QuerySyntaxError as e:
+            log_warning(f"Searching '{query}' as plain text: {e}")
+            return None
+    
+    def _state_matches_scope(self, state_code: str, text: str) -> bool:
+        """Whether a state: scope names a state: its code, its name or the leading words of it
         
-        # Search boolean handling rule fields
-        if 'uses_zero_for_o' in fields_to_search or 'all' in fields_to_search:
-            if 'uses_zero_for_o' in data:
-                bool_val = data['uses_zero_for_o']
-                searchable_text = f"uses zero for o: {bool_val}" if bool_val else "allows letter o"
-                if query_lower in searchable_text.lower():
-                    matches.append({
-                        'field': 'uses_zero_for_o',
-                        'value': f"Uses '0' instead of 'O': {bool_val}",
-                        'match_type': 'boolean'
-                    })
+        A scope that is a state code only names that state, so state:IN is not
+        every state with "in" in its name; 'new' names the New ... states.
+        """
+        if text.upper() in self.state_filename_map:
+            return state_code.lower() == text
+        name = self.state_names.get(state_code) or self.state_filename_map.get(state_code, '').replace('_', ' ')
+        name = ' '.join(name.lower().split())
+        text = ' '.join(text.split())
+        return bool(text) and (name == text or name.startswith(text + ' '))
+    
+    def _query_states(self, plan: QueryPlan, states_to_search: List[str]) -> List[str]:
+        """Skip states a query's state: scopes rule out"""
+        scopes = plan.state_scopes()
+        return [state_code for state_code in states_to_search
+                if all(self._state_matches_scope(state_code, text) for text in scopes)]
+    
+    def _term_selector(self, term: Term, category_plan: CategoryPlan) -> Callable[[SearchDocument], bool]:
+        """Which documents a query term may match: its scope's, or else the category's"""
+        if term.field is None:
+            return category_plan.selects
+        scope = FIELD_SCOPE_ALIASES.get(term.field, term.field)
+        scope_suffix = '.' + scope
+        category_fields = set(self.field_mappings.get(term.field, ()))
         
-        if 'allows_letter_o' in fields_to_search or 'all' in fields_to_search:
-            if 'allows_letter_o' in data:
-                bool_val = data['allows_letter_o']
-                searchable_text = f"allows letter o: {bool_val}" if bool_val else "does not allow letter o"
-                if query_lower in searchable_text.lower():
-                    matches.append({
-                        'field': 'allows_letter_o',
-                        'value': f"Allows letter 'O': {bool_val}",
-                        'match_type': 'boolean'
-                    })
+        def selects(document: SearchDocument) -> bool:
+            return (scope in document.keys or document.field == scope or document.field.endswith(scope_suffix)
+                    or any(key in category_fields for key in document.keys))
+        return selects
+    
+    def _query_documents(self, plan: QueryPlan, category: str, states_to_search: List[str]) -> List[SearchDocument]:
+        """Evaluate a parsed query over the searched states' documents, in result order"""
+        category_plan = self._get_category_plan(category)
+        state_rank = {state_code: rank for rank, state_code in enumerate(states_to_search)}
         
-        if 'zero_is_slashed' in fields_to_search or 'all' in fields_to_search:
-            if 'zero_is_slashed' in data:
-                bool_val = data['zero_is_slashed']
-                searchable_text = f"zero is slashed: {bool_val}"
-                if query_lower in searchable_text.lower():
-                    matches.append({
-                        'field': 'zero_is_slashed',
-                        'value': f"Zero is slashed: {bool_val}",
-                        'match_type': 'boolean'
-                    })
+        if self.use_index:
+            def term_hits(term: Term) -> List[Tuple[int, SearchDocument]]:
+                selects = self._term_selector(term, category_plan)
+                hits = []
+                for doc_id in self.index.lookup(term.text):
+                    document = self.index.documents[doc_id]
+                    if document.state_code in state_rank and selects(document):
+                        hits.append((doc_id, document))
+                return hits
+        else:
+            searched = [document for state_code in states_to_search
+                        for document in self.state_documents.get(state_code, ())]
+            
+            def term_hits(term: Term) -> List[Tuple[int, SearchDocument]]:
+                selects = self._term_selector(term, category_plan)
+                return [(position, document) for position, document in enumerate(searched)
+                        if term.text in document.text and selects(document)]
         
-        # Search character_formatting fields
-        if 'character_formatting' in data:
-            char_fmt = data['character_formatting']
-            if isinstance(char_fmt, dict):
-                for fmt_field, fmt_value in char_fmt.items():
-                    if isinstance(fmt_value, str) and query_lower in fmt_value.lower():
-                        matches.append({
-                            'field': f'character_formatting.{fmt_field}',
-                            'value': fmt_value,
-                            'match_type': 'nested'
-                        })
-                    elif isinstance(fmt_value, bool):
-                        searchable_text = f"{fmt_field}: {fmt_value}"
-                        if query_lower in searchable_text.lower():
-                            matches.append({
-                                'field': f'character_formatting.{fmt_field}',
-                                'value': f"{fmt_field.replace('_', ' ').title()}: {fmt_value}",
-                                'match_type': 'boolean'
-                            })
-        
-        # Search processing_metadata and nested fields
-        if 'processing_metadata' in data:
-            proc_meta = data['processing_metadata']
-            if isinstance(proc_meta, dict) and 'global_rules' in proc_meta:
-                global_rules = proc_meta['global_rules']
-                if isinstance(global_rules, dict):
-                    # Search string fields in global_rules
-                    for rule_field in ['character_restrictions', 'vertical_handling', 'omit_characters', 'font_changes']:
-                        if rule_field in global_rules:
-                            rule_value = global_rules[rule_field]
-                            if isinstance(rule_value, str) and query_lower in rule_value.lower():
-                                matches.append({
-                                    'field': f'processing_metadata.{rule_field}',
-                                    'value': rule_value,
-                                    'match_type': 'nested'
-                                })
-                    
-                    # Search stacked_characters include/omit lists
-                    if 'stacked_characters' in global_rules:
-                        stacked = global_rules['stacked_characters']
-                        if isinstance(stacked, dict):
-                            # Search include list
-                            if 'include' in stacked and isinstance(stacked['include'], list):
-                                for item in stacked['include']:
-                                    if isinstance(item, str) and query_lower in item.lower():
-                                        matches.append({
-                                            'field': 'stacked_characters.include',
-                                            'value': f"Include: {', '.join(stacked['include'])}",
-                                            'match_type': 'array'
-                                        })
-                                        break
-                            
-                            # Search omit list
-                            if 'omit' in stacked and isinstance(stacked['omit'], list):
-                                for item in stacked['omit']:
-                                    if isinstance(item, str) and query_lower in item.lower():
-                                        matches.append({
-                                            'field': 'stacked_characters.omit',
-                                            'value': f"Omit: {', '.join(stacked['omit'])}",
-                                            'match_type': 'array'
-                                        })
-                                        break
-                            
-                            # Search other stacked_characters fields
-                            for stacked_field in ['position', 'notes']:
-                                if stacked_field in stacked:
-                                    stacked_value = stacked[stacked_field]
-                                    if isinstance(stacked_value, str) and query_lower in stacked_value.lower():
-                                        matches.append({
-                                            'field': f'stacked_characters.{stacked_field}',
-                                            'value': stacked_value,
-                                            'match_type': 'nested'
-                                        })
-        
-        return matches
+        def records_of(state_codes: Iterable[str]) -> set:
+            return {(document.state_code, document.record) for state_code in state_codes
+                    for document in self.state_documents.get(state_code, ())}
+        
+        def state_records(text: str) -> set:
+            return records_of(code for code in states_to_search if self._state_matches_scope(code, text))
+        
+        hits = plan.evaluate(term_hits, state_records, lambda: records_of(states_to_search))
+        return self._order_documents(hits, category_plan, state_rank)
+    
+    def _search_index(self, query: str, category: str, state_filter: Optional[str],
+                      states_to_search: List[str]) -> List[Dict]:
+        """Answer a query from the inverted index, in the same order as the state scan"""
+        return self._documents_to_results(self._index_documents(query, category, state_filter, states_to_search))
+    
+    def _index_documents(self, query: str, category: str, state_filter: Optional[str],
+                         states_to_search: List[str]) -> List[SearchDocument]:
+        """Get the documents matching a query from the index, in result order
+        
+        A query extending the previous one (typing on) refines its matches
+        instead of looking up the index again.
+        """
+        query_lower = query.lower()
+        indexed = frozenset(state_code for state_code in states_to_search if state_code in self.index)
+        previous = self._type_ahead
+        if self.incremental_search and previous and previous.can_refine(
+                query_lower, category, state_filter, indexed, self._data_version):
+            # Typing extended the previous query: filter its matches instead of a new lookup
+            # (re-sorted by state, as it may have been looked up in another state order)
+            state_rank = {state_code: rank for rank, state_code in enumerate(states_to_search)}
+            documents = sorted((d for d in previous.documents if query_lower in d.text and d.state_code in indexed),
+                               key=lambda document: state_rank[document.state_code])
+        else:
+            documents = self._lookup_documents(query_lower, category, states_to_search)
+        self._type_ahead = TypeAheadState(query_lower, category, state_filter, documents, indexed,
+                                          self._data_version)
+        return documents
+    
+    def _lookup_documents(self, query_lower: str, category: str, states_to_search: List[str]) -> List[SearchDocument]:
+        """Get the documents matching a query and category from the index, in result order"""
+        category_plan = self._get_category_plan(category)
+        selects = category_plan.selects
+        state_rank = {state_code: rank for rank, state_code in enumerate(states_to_search)}
+        
+        if not category_plan.match_all:
+            # A narrow category's own documents are cheaper to scan than the index postings
+            candidates = [hit for state_code in states_to_search if state_code in self.state_documents
+                          for hit in category_plan.state_hits(state_code, self.state_documents[state_code])]
+            if len(candidates) <= self.index.document_count * CATEGORY_SCAN_RATIO:
+                hits = [hit for hit in candidates if query_lower in hit[1].text]
+                return self._order_documents(hits, category_plan, state_rank)
         
+        hits = []
+        for doc_id in self.index.lookup(query_lower):
+            document = self.index.documents[doc_id]
+            if document.state_code in state_rank and selects(document):
+                hits.append((doc_id, document))
+        return self._order_documents(hits, category_plan, state_rank)
+    
+    def _index_documents_by_state(self, query_lower: str, plan: Optional[QueryPlan], category: str,
+                                  state_filter: Optional[str],
+                                  state_codes: List[str]) -> Dict[str, List[SearchDocument]]:
+        """Look up the matches of the indexed states among state_codes at once, in result order by state"""
+        indexed = [state_code for state_code in state_codes if state_code in self.index]
+        if plan is not None:
+            documents = self._query_documents(plan, category, indexed)
+        else:
+            documents = self._index_documents(query_lower, category, state_filter, indexed)
+        documents_by_state: Dict[str, List[SearchDocument]] = {state_code: [] for state_code in indexed}
+        for document in documents:
+            documents_by_state[document.state_code].append(document)
+        return documents_by_state
+    
+    @staticmethod
+    def _order_documents(hits: List[Tuple[int, SearchDocument]], category_plan: CategoryPlan,
+                         state_rank: Optional[Dict[str, int]] = None) -> List[SearchDocument]:
+        """Sort (position, document) hits into result order: state, record, then field order"""
+        order_key = category_plan.order_key
+        
+        def sort_key(hit):
+            position, document = hit
+            rank = state_rank[document.state_code] if state_rank else 0
+            return (rank, document.record, not document.top_level, order_key(document), position)
+        
+        hits.sort(key=sort_key)
+        return [document for _, document in hits]
+    
+    def _documents_to_results(self, documents: List[SearchDocument]) -> List[Dict]:
+        """Build result dicts, reporting first_only fields once per record"""
+        return [self._document_to_result(document) for document in self._reported_documents(documents)]
+    
+    @staticmethod
+    def _reported_documents(documents: List[SearchDocument]) -> List[SearchDocument]:
+        """Drop all but the first match of first_only fields per record"""
+        reported_documents = []
+        reported = set()
+        for document in documents:
+            if document.first_only:
+                group = (document.state_code, document.record, document.field)
+                if group in reported:
+                    continue
+                reported.add(group)
+            reported_documents.append(document)
+        return reported_documents
+    
+    def _document_to_result(self, document: SearchDocument) -> Dict:
+        """Build a result dict ('state_info' or 'plate_type' match)"""
+        state_name = self.state_names.get(document.state_code, document.state_code)
+        if document.record == STATE_RECORD:
+            return {
+                'state': document.state_code,
+                'state_name': state_name,
+                'field': document.field,
+                'value': document.value,
+                'match_type': 'state_info'
+            }
+        return {
+            'state': document.state_code,
+            'state_name': state_name,
+            'plate_type': document.plate_type,
+            'field': document.field,
+            'value': document.value,
+            'match_type': 'plate_type'
+        }
+        
+    def _search_state_data(self, query: str, category: str, state_code: str, data: Dict[str, Any]) -> List[Dict]:
+        """Search within a single state's flattened documents"""
+        return self._documents_to_results(self._scan_state_documents(query, category, state_code, data))
+    
+    def _scan_state_documents(self, query: str, category: str, state_code: str,
+                              data: Dict[str, Any]) -> List[SearchDocument]:
+        """Get a state's documents matching a query, in result order"""
+        category_plan = self._get_category_plan(category)
+        documents = self.state_documents.get(state_code)
+        if documents is None:
+            candidates = category_plan.select(flatten_state_data(state_code, data))
+        else:
+            # Only the category's own documents, selected once per loaded state
+            candidates = category_plan.state_hits(state_code, documents)
+        
+        query_lower = query.lower()
+        hits = [hit for hit in candidates if query_lower in hit[1].text]
+        return self._order_documents(hits, category_plan)
+    
     def _get_search_fields(self, category: str) -> List[str]:
         """Get list of fields to search based on category"""
         if category == 'all':
@@ -395,151 +1173,234 @@ class JSONSearchEngine:
             return ['all']
         else:
             return self.field_mappings.get(category, [])
+    
+    def _get_category_plan(self, category: str) -> CategoryPlan:
+        """Get a category's compiled plan, compiling it on first use"""
+        plan = self._category_plans.get(category)
+        if plan is None:
+            plan = self._category_plans[category] = CategoryPlan(self._get_search_fields(category))
+        return plan
             
-    def _find_matches_in_plate(self, plate: Dict[str, Any], query: str, fields: List[str]) -> List[Dict]:
-        """Find matches within a single plate record"""
-        matches = []
-        
-        # If searching 'all', search common plate fields directly
-        if 'all' in fields:
-            searchable_fields = ['type_name', 'pattern', 'description', 'category', 'subtype', 
-                               'processing_type', 'code_number']
-            for field in searchable_fields:
-                if field in plate:
-                    value = plate[field]
-                    if isinstance(value, str) and query in value.lower():
-                        matches.append({
-                            'field': field,
-                            'value': value,
-                            'match_type': 'exact' if query == value.lower() else 'partial'
-                        })
-        else:
-            # Search specific fields
-            for field in fields:
-                if field in plate:
-                    value = plate[field]
-                    if isinstance(value, str) and query in value.lower():
-                        matches.append({
-                            'field': field,
-                            'value': value,
-                            'match_type': 'exact' if query == value.lower() else 'partial'
-                        })
-                    elif isinstance(value, list):
-                        for item in value:
-                            if isinstance(item, str) and query in item.lower():
-                                matches.append({
-                                    'field': field,
-                                    'value': item,
-                                    'match_type': 'list_item'
-                                })
-        
-        # Search nested plate_characteristics fields - respect category filter
-        if 'plate_characteristics' in plate:
-            plate_chars = plate['plate_characteristics']
-            if isinstance(plate_chars, dict):
-                # Search direct string fields in plate_characteristics
-                for char_field in ['font', 'logo', 'plate_text']:
-                    # Only search if 'all' or if the field is in the allowed fields for this category
-                    if 'all' in fields or char_field in fields:
-                        if char_field in plate_chars:
-                            char_value = plate_chars[char_field]
-                            if isinstance(char_value, str) and query in char_value.lower():
-                                matches.append({
-                                    'field': f'plate_characteristics.{char_field}',
-                                    'value': char_value,
-                                    'match_type': 'nested'
-                                })
-                
-                # Search design_variants array - only if 'all' or 'design' category
-                if 'all' in fields or 'design' in fields or 'design_variants' in fields:
-                    if 'design_variants' in plate_chars:
-                        design_variants = plate_chars['design_variants']
-                        if isinstance(design_variants, list):
-                            for variant in design_variants:
-                                if isinstance(variant, str) and query in variant.lower():
-                                    matches.append({
-                                        'field': 'plate_characteristics.design_variants',
-                                        'value': f"Design variant: {variant}",
-                                        'match_type': 'array'
-                                    })
-                                    break  # Only report once per plate type
-                
-                # Search character_formatting nested object
-                if 'character_formatting' in plate_chars:
-                    char_fmt = plate_chars['character_formatting']
-                    if isinstance(char_fmt, dict):
-                        for fmt_field, fmt_value in char_fmt.items():
-                            if isinstance(fmt_value, str) and query in fmt_value.lower():
-                                matches.append({
-                                    'field': f'character_formatting.{fmt_field}',
-                                    'value': fmt_value,
-                                    'match_type': 'nested'
-                                })
-        
-        # Search processing_metadata at plate level
-        if 'processing_metadata' in plate:
-            proc_meta = plate['processing_metadata']
-            if isinstance(proc_meta, dict):
-                for proc_field in ['character_modifications', 'visual_identifier']:
-                    if proc_field in proc_meta:
-                        proc_value = proc_meta[proc_field]
-                        if isinstance(proc_value, str) and query in proc_value.lower():
-                            matches.append({
-                                'field': f'processing_metadata.{proc_field}',
-                                'value': proc_value,
-                                'match_type': 'nested'
-                            })
-                            
-        return matches
-        
-    def get_suggestions(self, partial_query: str, category: str = 'all') -> List[str]:
-        """Get search suggestions based on partial query and category"""
-        suggestions = []
-        
-        # Category-specific suggestions
-        if category == 'colors':
-            color_terms = ['blue', 'red', 'white', 'green', 'yellow', 'black', 'orange', 'purple', 'rainbow', 'gradient']
-            suggestions = [c for c in color_terms if partial_query.lower() in c.lower()]
-        elif category == 'fonts':
-            font_terms = ['Arial', 'Times New Roman', 'Helvetica', 'Georgia', 'Verdana', 'Impact', 'Custom']
-            suggestions = [f for f in font_terms if partial_query.lower() in f.lower()]
-        elif category == 'slogans':
-            slogan_terms = ['Sunshine State', 'The Natural State', 'Empire State', 'Golden State', 'Lone Star State']
-            suggestions = [s for s in slogan_terms if partial_query.lower() in s.lower()]
-        elif category == 'logos':
-            logo_terms = ['palm tree', 'mountain', 'star', 'eagle', 'sun', 'flag', 'seal', 'emblem']
-            suggestions = [l for l in logo_terms if partial_query.lower() in l.lower()]
+    def get_suggestions(self, partial_query: str, category: str = 'all',
+                        limit: int = DEFAULT_SUGGESTION_LIMIT, wait: bool = True,
+                        ready_callback: Optional[Callable[[], None]] = None) -> List[str]:
+        """Complete a partial query with the category's most frequent field values
+        
+        Values of the loaded states are offered, most frequent first, when they
+        or one of their words start with the partial query. With wait=False a
+        missing or outdated trie is rebuilt on a background thread instead (e.g.
+        for the GUI thread): the outdated trie, or nothing, answers meanwhile and
+        ready_callback() is called from that thread once the new one is built.
+        """
+        partial_query = partial_query.strip()
+        if not partial_query:
+            return []
+        if wait:
+            trie = self._get_suggestion_trie(category)
         else:
-            # General suggestions
-            general_terms = ['standard', 'specialty', 'vanity', 'commercial', 'motorcycle', 'trailer']
-            suggestions = [g for g in general_terms if partial_query.lower() in g.lower()]
+            trie = self._request_suggestion_trie(category, ready_callback)
+            if trie is None:
+                return []
+        return trie.complete(partial_query, limit)
+    
+    def _suggestion_fields(self, category: str) -> frozenset:
+        """The fields whose values complete queries of a category"""
+        if category == FUZZY_CATEGORY:
+            return FUZZY_SUGGESTION_FIELDS
+        category_plan = self._get_category_plan(category)
+        return SUGGESTION_FIELDS if category_plan.match_all else category_plan.field_set
+    
+    def _current_suggestion_trie(self, fields: frozenset) -> Tuple[Optional[SuggestionTrie], bool]:
+        """The cached trie for a field set (or None) and whether it is up to date"""
+        with self._suggestion_lock:
+            cached = self._suggestion_tries.get(fields)
+        if cached is None:
+            return None, False
+        # While warm-up keeps loading states, keep answering from the previous trie
+        return cached[1], cached[0] == self._data_version or bool(self._pending_loads)
+    
+    def _get_suggestion_trie(self, category: str) -> SuggestionTrie:
+        """Get a category's autocomplete trie, rebuilding it after the loaded data changed"""
+        fields = self._suggestion_fields(category)
+        trie, current = self._current_suggestion_trie(fields)
+        if trie is not None and current:
+            return trie
+        return self._build_suggestion_trie(fields)
+    
+    def _request_suggestion_trie(self, category: str,
+                                 ready_callback: Optional[Callable[[], None]] = None) -> Optional[SuggestionTrie]:
+        """Get a category's trie as it is, rebuilding it in the background if it is missing or outdated"""
+        fields = self._suggestion_fields(category)
+        trie, current = self._current_suggestion_trie(fields)
+        if current:
+            return trie
+        with self._suggestion_lock:
+            if fields not in self._suggestion_builds:
+                if self._suggestion_executor is None:
+                    self._suggestion_executor = ThreadPoolExecutor(max_workers=1,
+                                                                   thread_name_prefix='suggestion-trie')
+                future = self._suggestion_executor.submit(self._build_suggestion_trie, fields)
+                self._suggestion_builds[fields] = future
+                if ready_callback:
+                    future.add_done_callback(lambda f: ready_callback() if f.exception() is None else None)
+        return trie
+    
+    def _build_suggestion_trie(self, fields: frozenset) -> SuggestionTrie:
+        """Build and cache the autocomplete trie of a field set from the loaded states"""
+        try:
+            with self._lock:
+                version = self._data_version
+                documents = [document for state_documents in self.state_documents.values()
+                             for document in state_documents]
             
-        return suggestions[:5]  # Return top 5
-        
+            values = count_values(
+                document.value for document in documents
+                # Only values that search for themselves (not "Zero is slashed: True" style labels)
+                if not fields.isdisjoint(document.keys) and len(document.value) <= SUGGESTION_MAX_LENGTH
+                and document.value.lower() == document.text
+            )
+            trie = SuggestionTrie(values)
+            with self._suggestion_lock:
+                cached = self._suggestion_tries.get(fields)
+                if cached is None or cached[0] <= version:
+                    self._suggestion_tries[fields] = (version, trie)
+            return trie
+        finally:
+            with self._suggestion_lock:
+                self._suggestion_builds.pop(fields, None)
+    
     def add_search_category(self, category: str, fields: List[str]):
         """Add new search category (for easy expansion)"""
-        self.field_mappings[category] = fields
-        print(f"➕ Added search category '{category}' with fields: {fields}")
+        with self._lock:
+            self.field_mappings[category] = fields
+            self._category_plans[category] = CategoryPlan(fields)
+            # Results cached for the category used its old fields
+            self.search_cache.clear()
+            self._type_ahead = None
+        log_debug(f"Added search category '{category}' with fields: {fields}")
         
     def clear_cache(self):
-        """Clear search cache"""
-        self.search_cache.clear()
-        print("🔄 Search cache cleared")
+        """Clear search cache (loaded data and the search index are kept)"""
+        with self._lock:
+            self.search_cache.clear()
+            self._type_ahead = None
+        log_debug("Search cache cleared")
         
     def get_category_stats(self, state_filter: Optional[str] = None) -> Dict[str, int]:
-        """Get statistics about available data in each category"""
-        stats = {}
-        states_to_check = [state_filter] if state_filter else ['FL', 'CA', 'TX', 'NY', 'PA']
+        """Get the number of records (plate types, and each state's own fields) with data in each category"""
+        return self.get_corpus_stats(state_filter)['categories']
+    
+    def get_corpus_stats(self, state_filter: Optional[str] = None) -> Dict[str, Any]:
+        """Get plate type, document, per-field and per-category counts of the state data
         
-        for category in self.field_mappings.keys():
-            count = 0
-            for state_code in states_to_check:
-                state_data = self.load_state_data(state_code)
-                plates = state_data.get('plates', [])
-                for plate in plates:
-                    fields = self._get_search_fields(category)
-                    if any(field in plate for field in fields):
-                        count += 1
-            stats[category] = count
-            
-        return stats
\ No newline at end of file
+        Covers every state with a data file (or only state_filter), totalled and
+        under 'by_state'; states whose file is missing or unreadable are listed
+        under 'missing_states'. The counts are taken when a state is loaded, so
+        only states not loaded yet (or changed on disk since) are loaded here.
+        """
+        state_codes = [state_filter] if state_filter else self.get_all_state_codes()
+        state_stats = []
+        missing_states = []
+        for state_code in state_codes:
+            stats = self._get_state_stats(state_code)
+            if stats is None:
+                missing_states.append(state_code)
+            else:
+                state_stats.append(stats)
+        
+        category_plans = {category: self._get_category_plan(category) for category in self.field_mappings}
+        corpus_stats = combine_stats(state_stats, category_plans)
+        corpus_stats['missing_states'] = missing_states
+        return corpus_stats
+    
+    def _get_state_stats(self, state_code: str) -> Optional[StateStats]:
+        """Get a state's counts, loading the state if they are missing or out of date"""
+        stamp = self._get_file_stamp(state_code)
+        if stamp is None:
+            return None
+        with self._lock:
+            stats = self._state_stats.get(state_code)
+        if stats is not None and stats.stamp == stamp:
+            return stats
+        
+        if stats is not None:
+            # The file changed since it was counted
+            self.invalidate_state(state_code)
+        self.load_state_data(state_code)
+        with self._lock:
+            return self._state_stats.get(state_code)
+    
+    def get_plate_table(self) -> PlateTypeTable:
+        """Get a columnar table of the plate types of every state with a data file
+        
+        States not loaded yet are loaded. The table is built once and reused
+        until a state is loaded, reloaded or dropped.
+        """
+        states = {}
+        for state_code in self.get_all_state_codes():
+            if self._get_file_stamp(state_code) is not None:
+                states[state_code] = self.load_state_data(state_code)
+        
+        with self._lock:
+            version = self._data_version
+            cached = self._plate_table
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        table = PlateTypeTable.from_states(states)
+        with self._lock:
+            self._plate_table = (version, table)
+        return table
+    
+    def filter_plate_types(self, **conditions) -> List[Tuple[str, Mapping[str, Any]]]:
+        """Get (state code, plate type) of every plate type matching all conditions
+        
+        Conditions are PlateTypeTable.filter() ones: column=value,
+        column=[values] or column=predicate, e.g.
+        filter_plate_types(character_count=7, has_stickers=True, state=['FL', 'GA']).
+        """
+        table = self.get_plate_table()
+        return table.plate_types(table.filter(**conditions))
+    
+    def get_plate_identifier(self) -> PlateIdentifier:
+        """Get the plate string identifier over get_plate_table() (rebuilt with the table)"""
+        table = self.get_plate_table()
+        with self._lock:
+            identifier = self._plate_identifier
+        if identifier is not None and identifier.table is table:
+            return identifier
+        
+        state_codes = table.column(STATE_COLUMN).categories[1:]
+        identifier = PlateIdentifier(table, {state_code: self.load_state_data(state_code)
+                                             for state_code in state_codes})
+        with self._lock:
+            self._plate_identifier = identifier
+        return identifier
+    
+    def identify_plate(self, read: str, limit: Optional[int] = DEFAULT_CANDIDATE_LIMIT,
+                       state_filter: Optional[str] = None,
+                       min_score: float = MIN_CANDIDATE_SCORE) -> Identification:
+        """Rank the states and plate types a read plate string could be
+        
+        Candidates are scored like score_plate_match() (pattern, character
+        count and the state's O/0 rules), best first.
+        """
+        return self.get_plate_identifier().identify(read, limit, min_score, state_filter)
+    
+    def export_corpus_stats(self, file_path: str, state_filter: Optional[str] = None) -> Dict[str, Any]:
+        """Write get_corpus_stats() to a JSON file, or one row per state to a .csv file"""
+        corpus_stats = self.get_corpus_stats(state_filter)
+        if str(file_path).lower().endswith('.csv'):
+            categories = list(corpus_stats['categories'])
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['state', 'plate_types', 'documents'] + categories)
+                for state_code, state_stats in corpus_stats['by_state'].items():
+                    writer.writerow([state_code, state_stats['plate_types'], state_stats['documents']]
+                                    + [state_stats['categories'][category] for category in categories])
+                writer.writerow(['TOTAL', corpus_stats['plate_types'], corpus_stats['documents']]
+                                + [corpus_stats['categories'][category] for category in categories])
+        else:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(corpus_stats, f, indent=2, ensure_ascii=False)
+        return corpus_stats
@@ -0,0 +1,77 @@
+"""
+Lazy State Data - State data whose large sections are loaded on first access
+
+Most views of a state (State Info, Character Rules) only read a dozen
+top-level keys, while plate_types holds hundreds of entries (991 for MD).
+LazyStateData keeps the small top-level fields in memory and loads the
+deferred sections from their source the first time they are read.
+"""
+
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+# Top-level keys that are loaded only when something reads them
+DEFERRED_KEYS = ('plate_types',)
+
+
+def split_state_data(data: Dict[str, Any]) -> tuple:
+    """Split state data into (header dict, {deferred key: value}, key order)"""
+    header = {key: value for key, value in data.items() if key not in DEFERRED_KEYS}
+    deferred = {key: data[key] for key in DEFERRED_KEYS if key in data}
+    return header, deferred, list(data.keys())
+
+
+class LazyStateData(Mapping):
+    """Read-only mapping over a state's data with some sections loaded on demand.
+
+    ``loaders`` maps each deferred key to a callable returning its value; a
+    loader runs at most once and is dropped afterwards so whatever it holds
+    (file offsets, raw bytes) is released. Iteration follows ``key_order``.
+    """
+
+    def __init__(self, header: Dict[str, Any], loaders: Dict[str, Callable[[], Any]],
+                 key_order: Optional[List[str]] = None):
+        self._values = dict(header)
+        self._loaders = dict(loaders)
+        self._key_order = key_order or list(header) + [key for key in loaders if key not in header]
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            if key not in self._loaders:
+                raise
+        return self._load(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values or key in self._loaders
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._key_order)
+
+    def __len__(self) -> int:
+        return len(self._key_order)
+
+    def __repr__(self) -> str:
+        return f"LazyStateData(loaded={list(self._values)}, deferred={list(self._loaders)})"
+
+    def _load(self, key: str) -> Any:
+        with self._lock:
+            # Another thread may have loaded it while we waited
+            if key in self._values:
+                return self._values[key]
+            value = self._loaders[key]()
+            self._values[key] = value
+            del self._loaders[key]
+        return value
+
+    def is_loaded(self, key: str) -> bool:
+        """Whether a key's value is in memory (False for deferred keys not read yet)"""
+        return key in self._values
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Load everything and return a plain dict in the original key order"""
+        return {key: self[key] for key in self._key_order}
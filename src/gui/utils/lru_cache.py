@@ -0,0 +1,148 @@
+"""
+LRU Cache - Size-bounded least-recently-used cache with statistics
+
+Used by JSONSearchEngine for search results and loaded state data so that
+neither grows for the whole life of the process.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+
+class LRUCache:
+    """Dict-like LRU cache bounded by an approximate memory budget.
+
+    Each entry's size is estimated with ``sizeof`` when it is stored; the
+    least recently used entries are evicted until the total fits the
+    budget. Entries can carry a tag (e.g. a state code) so related entries
+    can be invalidated together.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int],
+                 max_entries: Optional[int] = None,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._on_evict = on_evict
+
+        # key -> (value, size, tag)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Membership test (does not count as a hit or refresh recency)"""
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._entries.keys()))
+
+    def __getitem__(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            raise KeyError(key)
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self.put(key, value)
+
+    def __delitem__(self, key: Hashable):
+        if key not in self._entries:
+            raise KeyError(key)
+        self._remove(key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value, counting a hit or miss and marking it most recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, tag: Any = None, size: Optional[int] = None):
+        """Store a value, evicting least recently used entries to stay within budget"""
+        if key in self._entries:
+            self._remove(key)
+
+        if size is None:
+            size = self._sizeof(value)
+        self._entries[key] = (value, size, tag)
+        self.current_bytes += size
+        self._enforce_limits(keep=key)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry without counting it as an eviction"""
+        if key not in self._entries:
+            return default
+        return self._remove(key)
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop an entry whose source data changed"""
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        self.invalidations += 1
+        return True
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry for which predicate(key, tag) is true"""
+        stale = [key for key, (_, _, tag) in self._entries.items() if predicate(key, tag)]
+        for key in stale:
+            self._remove(key)
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        """Remove all entries (statistics are kept)"""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def values(self):
+        return [value for value, _, _ in self._entries.values()]
+
+    def items(self):
+        return [(key, value) for key, (value, _, _) in self._entries.items()]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics for tuning the budget"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+    def _remove(self, key: Hashable) -> Any:
+        value, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+        return value
+
+    def _enforce_limits(self, keep: Hashable):
+        """Evict least recently used entries (never the one just stored)"""
+        while len(self._entries) > 1 and (
+            self.current_bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            value = self._remove(key)
+            self.evictions += 1
+            if self._on_evict:
+                self._on_evict(key, value)
@@ -0,0 +1,186 @@
+"""
+Plate Identifier - Candidate states and plate types for a read plate string
+
+score_plate_match() (utils/helpers.py) scores a read against one plate
+type; asking which of the ~11,500 plate types a read could be would call
+it for every one of them. A plate type's score only depends on its
+pattern, its character_count and its state's O/0 rules, and few
+combinations of those exist per state. PlateIdentifier groups the rows of
+a PlateTypeTable by state and those two fields once, so a read is scored
+once per group and the best groups are expanded into (state, plate type,
+score) candidates. The patterns a read matches are found by a lookup on
+the read's shape (PatternShapeIndex) rather than by testing each pattern.
+
+Scores are exactly score_plate_match()'s for the normalized read.
+"""
+
+import heapq
+import re
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from utils.helpers import PatternShapeIndex, normalize_plate_text
+from .plate_table import STATE_COLUMN, PlateTypeTable
+
+
+# Candidates scoring lower than this match neither the pattern nor the character count
+MIN_CANDIDATE_SCORE = 0.5
+DEFAULT_CANDIDATE_LIMIT = 25
+
+
+class PlateCandidate(NamedTuple):
+    """A plate type a read could be"""
+    state_code: str
+    type_name: Optional[str]
+    score: float
+    plate_index: int  # position in the state's plate_types
+    plate_type: Mapping[str, Any]
+
+
+class Identification(NamedTuple):
+    """Best candidates for a read, best first, and how many scored at least min_score"""
+    plate: str  # the read, normalized
+    candidates: List[PlateCandidate]
+    total_count: int
+
+
+class _Group(NamedTuple):
+    state_code: str
+    pattern: Optional[str]
+    character_count: Optional[float]
+    allows_letter_o: bool
+    uses_zero_for_o: bool
+    rows: array
+
+
+class PlateIdentifier:
+    """Scores a read against every plate type of a PlateTypeTable at once
+
+    state_data gives each state's O/0 rules (allows_letter_o and
+    uses_zero_for_o, allowed when missing, as in score_plate_match).
+    """
+
+    def __init__(self, table: PlateTypeTable, state_data: Mapping[str, Mapping[str, Any]]):
+        self.table = table
+        states = table.column(STATE_COLUMN)
+        patterns = table.column('pattern')
+        counts = table.column('character_count')
+
+        group_rows: Dict[Tuple[int, int, int], List[int]] = {}
+        for row, key in enumerate(zip(states.codes, patterns.codes, counts.codes)):
+            rows = group_rows.get(key)
+            if rows is None:
+                rows = group_rows[key] = []
+            rows.append(row)
+
+        self._groups: List[_Group] = []
+        for (state, pattern, count), rows in group_rows.items():
+            state_code = states.categories[state]
+            data = state_data.get(state_code)
+            if not isinstance(data, Mapping):
+                data = {}
+            self._groups.append(_Group(
+                state_code,
+                _usable_pattern(patterns.categories[pattern]),
+                _usable_count(counts.categories[count]),
+                bool(data.get('allows_letter_o', True)),
+                bool(data.get('uses_zero_for_o', True)),
+                array('I', rows),
+            ))
+        self.patterns = sorted({group.pattern for group in self._groups if group.pattern is not None})
+        self.pattern_index = PatternShapeIndex(self.patterns)
+
+    @classmethod
+    def from_states(cls, states: Mapping[str, Mapping[str, Any]]) -> 'PlateIdentifier':
+        """Build the table and the identifier from state code -> state data"""
+        return cls(PlateTypeTable.from_states(states), states)
+
+    def identify(self, read: str, limit: Optional[int] = DEFAULT_CANDIDATE_LIMIT,
+                 min_score: float = MIN_CANDIDATE_SCORE, state_filter: Optional[str] = None) -> Identification:
+        """Rank the plate types a read could be (limit=None returns every candidate)"""
+        plate = normalize_plate_text(read)
+        if not plate:
+            return Identification(plate, [], 0)
+
+        pattern_matches = set(self.pattern_index.matching(plate))
+        actual_count = len(re.sub(r'[^A-Z0-9]', '', plate))
+        character_scores: Dict[Tuple[bool, bool], float] = {}
+
+        by_score: Dict[float, List[array]] = {}
+        total_count = 0
+        for group in self._groups:
+            if state_filter and group.state_code != state_filter:
+                continue
+            rules = (group.allows_letter_o, group.uses_zero_for_o)
+            character_score = character_scores.get(rules)
+            if character_score is None:
+                character_score = character_scores[rules] = _character_rule_score(plate, *rules)
+            score = _score(group, pattern_matches, actual_count, character_score)
+            if score >= min_score:
+                by_score.setdefault(score, []).append(group.rows)
+                total_count += len(group.rows)
+
+        return Identification(plate, self._candidates(by_score, limit), total_count)
+
+    def _candidates(self, by_score: Dict[float, List[array]], limit: Optional[int]) -> List[PlateCandidate]:
+        """Candidates of the best scores first, in table order within a score"""
+        table = self.table
+        states = table.column(STATE_COLUMN)
+        type_names = table.column('type_name')
+        candidates: List[PlateCandidate] = []
+        for score in sorted(by_score, reverse=True):
+            for row in heapq.merge(*by_score[score]):
+                if limit is not None and len(candidates) >= limit:
+                    return candidates
+                candidates.append(PlateCandidate(states[row], type_names[row], score,
+                                                 table.plate_index[row], table.plate_at(row)))
+        return candidates
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Plate types, score groups and distinct patterns"""
+        return {
+            'plate_types': len(self.table),
+            'groups': len(self._groups),
+            'patterns': len(self.patterns),
+        }
+
+
+def _usable_pattern(pattern: Any) -> Optional[str]:
+    return pattern if isinstance(pattern, str) and pattern else None
+
+
+def _usable_count(count: Any) -> Optional[float]:
+    return count if isinstance(count, (int, float)) and count else None
+
+
+def _character_rule_score(plate: str, allows_letter_o: bool, uses_zero_for_o: bool) -> float:
+    """score_plate_match()'s character rule part, before it is capped"""
+    char_score = 0.0
+    for char in plate:
+        if char == 'O' and not allows_letter_o:
+            char_score -= 0.1
+        elif char == '0' and not uses_zero_for_o:
+            char_score -= 0.1
+        else:
+            char_score += 0.01
+    return char_score
+
+
+def _score(group: _Group, pattern_matches: Set[str], actual_count: int, char_score: float) -> float:
+    """score_plate_match() of a read for the plate types of a group (same additions, same order)"""
+    score = 0.0
+    max_score = 0.0
+    if group.pattern is not None:
+        max_score += 0.5
+        if group.pattern in pattern_matches:
+            score += 0.5
+    if group.character_count is not None:
+        max_score += 0.2
+        if actual_count == group.character_count:
+            score += 0.2
+        elif abs(actual_count - group.character_count) <= 1:
+            score += 0.1
+    max_score += 0.3
+    score += max(0, min(0.3, char_score))
+    return min(1.0, max(0.0, score / max_score))
@@ -0,0 +1,336 @@
+"""
+Plate Table - Columnar table of the plate types of all states, for filtering
+
+Filters such as "character_count 7, dot_processing_type conditional, with
+stickers" would otherwise loop over every plate type of every state. The
+table keeps one column per field instead (struct of arrays): each row is
+one plate type, and each column stores an array of small integer codes
+into its list of distinct values (dictionary encoding).
+
+A filter on a column gives a Mask, which holds one bit per row in a Python
+int. The rows of each distinct value are turned into a mask once, so a
+condition costs one mask per matching value, and &, | and ~ combine masks
+across all rows at once:
+
+    table = PlateTypeTable.from_states(states)
+    mask = table.filter(character_count=7, dot_processing_type='conditional', has_stickers=True)
+    mask &= ~table.eq('state', 'FL')
+    for state_code, plate in table.plate_types(mask):
+        ...
+
+Columns hold scalar values (str, int, float, bool); a missing key, null
+and any other value (lists, objects) read as None.
+"""
+
+import operator
+from array import array
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+# Column name -> path of the value in a plate type (processing_metadata fields are dotted)
+DEFAULT_COLUMNS: Tuple[Tuple[str, Tuple[str, ...]], ...] = tuple(
+    (name, tuple(name.split('.'))) for name in (
+        'type_name', 'category', 'subtype', 'pattern', 'character_count', 'code_number',
+        'background_color', 'text_color', 'has_stickers', 'processing_type', 'visual_identifier',
+        'requires_prefix',
+        'processing_metadata.currently_processed', 'processing_metadata.requires_prefix',
+        'processing_metadata.requires_suffix', 'processing_metadata.all_numeric_plate',
+        'processing_metadata.verify_state_abbreviation', 'processing_metadata.dot_processing_type',
+        'processing_metadata.dot_dropdown_identifier', 'processing_metadata.vehicle_type_identification',
+        'processing_metadata.csv_processing_rules',
+    )
+)
+
+# Column of each row's state code
+STATE_COLUMN = 'state'
+
+_SCALAR_TYPES = frozenset([str, int, float, bool])
+
+
+class Mask:
+    """Rows of a PlateTypeTable selected by a filter, one bit per row"""
+    __slots__ = ('bits', 'size')
+
+    def __init__(self, bits: int, size: int):
+        self.bits = bits
+        self.size = size
+
+    def _combine(self, other: 'Mask', bits: Callable[[int, int], int]) -> 'Mask':
+        if not isinstance(other, Mask):
+            return NotImplemented
+        if other.size != self.size:
+            raise ValueError(f"Masks of {self.size} and {other.size} rows cannot be combined")
+        return Mask(bits(self.bits, other.bits), self.size)
+
+    def __and__(self, other: 'Mask') -> 'Mask':
+        return self._combine(other, operator.and_)
+
+    def __or__(self, other: 'Mask') -> 'Mask':
+        return self._combine(other, operator.or_)
+
+    def __xor__(self, other: 'Mask') -> 'Mask':
+        return self._combine(other, operator.xor)
+
+    def __invert__(self) -> 'Mask':
+        return Mask(self.bits ^ ((1 << self.size) - 1), self.size)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Mask) and (self.bits, self.size) == (other.bits, other.size)
+
+    def __hash__(self) -> int:
+        return hash((self.bits, self.size))
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.rows())
+
+    def __repr__(self) -> str:
+        return f"Mask({self.count()} of {self.size} rows)"
+
+    def count(self) -> int:
+        """Number of selected rows"""
+        return bin(self.bits).count('1')
+
+    def rows(self) -> List[int]:
+        """Indices of the selected rows, in table order"""
+        digits = bin(self.bits)[:1:-1]  # least significant bit (row 0) first
+        rows = []
+        row = digits.find('1')
+        while row != -1:
+            rows.append(row)
+            row = digits.find('1', row + 1)
+        return rows
+
+
+def _rows_to_bits(rows: Iterable[int], size: int) -> int:
+    bitmap = bytearray((size + 7) >> 3)
+    for row in rows:
+        bitmap[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(bitmap, 'little')
+
+
+class Column:
+    """One field of every row: an array of codes into the field's distinct values"""
+    __slots__ = ('name', 'codes', 'categories', '_category_codes', '_code_rows', '_code_bits')
+
+    def __init__(self, name: str, values: Iterable[Any]):
+        self.name = name
+        self.categories: List[Any] = [None]  # code 0 is None (missing)
+        self._category_codes: Dict[Tuple[type, Any], int] = {(type(None), None): 0}
+        codes = []
+        category_codes = self._category_codes
+        for value in values:
+            # Keyed with the type so True and 1 stay apart
+            key = (type(value), value)
+            code = category_codes.get(key)
+            if code is None:
+                code = category_codes[key] = len(self.categories)
+                self.categories.append(value)
+            codes.append(code)
+        self.codes = array('H' if len(self.categories) <= 0xFFFF else 'I', codes)
+        self._code_rows: Optional[List[List[int]]] = None
+        self._code_bits: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> Any:
+        return self.categories[self.codes[row]]
+
+    def values(self) -> List[Any]:
+        """Value of every row"""
+        categories = self.categories
+        return [categories[code] for code in self.codes]
+
+    def code_of(self, value: Any) -> Optional[int]:
+        """Code of a value, or None if no row has it"""
+        try:
+            return self._category_codes.get((type(value), value))
+        except TypeError:  # unhashable
+            return None
+
+    def code_bits(self, code: int) -> int:
+        """Mask bits of the rows holding a code (built on first use)"""
+        bits = self._code_bits.get(code)
+        if bits is None:
+            if self._code_rows is None:
+                code_rows: List[List[int]] = [[] for _ in self.categories]
+                for row, row_code in enumerate(self.codes):
+                    code_rows[row_code].append(row)
+                self._code_rows = code_rows
+            bits = self._code_bits[code] = _rows_to_bits(self._code_rows[code], len(self.codes))
+        return bits
+
+    def value_counts(self) -> Dict[Any, int]:
+        """Number of rows holding each value (None included)"""
+        counts = [0] * len(self.categories)
+        for code in self.codes:
+            counts[code] += 1
+        return {value: count for value, count in zip(self.categories, counts) if count}
+
+
+Condition = Union[Any, Sequence[Any], Callable[[Any], bool]]
+
+
+class PlateTypeTable:
+    """Every plate type of a set of states as rows, its fields as dictionary-encoded columns
+
+    Row order is state order, then each state's plate_types order. Filters
+    (eq, isin, where, notnull, filter) return Masks; rows, select and
+    plate_types read the selected rows.
+    """
+
+    def __init__(self, state_codes: Sequence[str], plate_indices: Sequence[int],
+                 plates: List[Mapping[str, Any]], columns: Sequence[Tuple[str, Tuple[str, ...]]] = DEFAULT_COLUMNS):
+        self.plate_index = array('I', plate_indices)
+        self._plates = plates
+        self.size = len(plates)
+        self._columns: Dict[str, Column] = {STATE_COLUMN: Column(STATE_COLUMN, state_codes)}
+        # Objects at each path prefix, read once for all the columns below them
+        parents: Dict[Tuple[str, ...], List[Any]] = {(): plates}
+        for name, path in columns:
+            self._columns[name] = Column(name, _column_values(parents, path))
+        self._aliases = _unique_suffixes(self._columns)
+
+    @classmethod
+    def from_states(cls, states: Union[Mapping[str, Mapping[str, Any]], Iterable[Tuple[str, Mapping[str, Any]]]],
+                    columns: Sequence[Tuple[str, Tuple[str, ...]]] = DEFAULT_COLUMNS) -> 'PlateTypeTable':
+        """Build the table from state code -> state data (or (code, data) pairs)"""
+        items = states.items() if isinstance(states, Mapping) else states
+        state_codes: List[str] = []
+        plate_indices: List[int] = []
+        plates: List[Mapping[str, Any]] = []
+        for state_code, data in items:
+            plate_types = data.get('plate_types') if isinstance(data, Mapping) else None
+            if not isinstance(plate_types, list):
+                continue
+            for position, plate in enumerate(plate_types):
+                if isinstance(plate, Mapping):
+                    state_codes.append(state_code)
+                    plate_indices.append(position)
+                    plates.append(plate)
+        return cls(state_codes, plate_indices, plates, columns)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> Column:
+        """A column by name; processing_metadata columns also answer to their last part"""
+        column = self._columns.get(name) or self._columns.get(self._aliases.get(name, ''))
+        if column is None:
+            raise KeyError(f"No column '{name}'")
+        return column
+
+    # Filters
+
+    def all(self) -> Mask:
+        return Mask((1 << self.size) - 1, self.size)
+
+    def none(self) -> Mask:
+        return Mask(0, self.size)
+
+    def eq(self, name: str, value: Any) -> Mask:
+        """Rows whose value is value (None selects rows without one)"""
+        column = self.column(name)
+        code = column.code_of(value)
+        return Mask(column.code_bits(code) if code is not None else 0, self.size)
+
+    def isin(self, name: str, values: Iterable[Any]) -> Mask:
+        """Rows whose value is one of values"""
+        column = self.column(name)
+        bits = 0
+        for code in {column.code_of(value) for value in values} - {None}:
+            bits |= column.code_bits(code)
+        return Mask(bits, self.size)
+
+    def where(self, name: str, predicate: Callable[[Any], bool]) -> Mask:
+        """Rows whose value satisfies predicate, called once per distinct value (not for None)"""
+        column = self.column(name)
+        bits = 0
+        for code, value in enumerate(column.categories):
+            if code and predicate(value):
+                bits |= column.code_bits(code)
+        return Mask(bits, self.size)
+
+    def notnull(self, name: str) -> Mask:
+        """Rows with a value"""
+        return ~self.eq(name, None)
+
+    def filter(self, **conditions: Condition) -> Mask:
+        """Rows matching all conditions: column=value, column=[values] or column=predicate"""
+        mask = self.all()
+        for name, condition in conditions.items():
+            if callable(condition):
+                mask &= self.where(name, condition)
+            elif isinstance(condition, (list, tuple, set, frozenset)):
+                mask &= self.isin(name, condition)
+            else:
+                mask &= self.eq(name, condition)
+            if not mask:
+                break
+        return mask
+
+    # Reading rows
+
+    def rows(self, mask: Optional[Mask] = None) -> List[Tuple[str, int]]:
+        """(state code, index in its plate_types) of the selected rows"""
+        states = self._columns[STATE_COLUMN]
+        selected = mask.rows() if mask is not None else range(self.size)
+        return [(states[row], self.plate_index[row]) for row in selected]
+
+    def select(self, mask: Optional[Mask] = None, *names: str) -> List[Tuple[Any, ...]]:
+        """Values of the named columns (all columns if none are named) of the selected rows"""
+        columns = [self.column(name) for name in names] if names else list(self._columns.values())
+        selected = mask.rows() if mask is not None else range(self.size)
+        return [tuple(column[row] for column in columns) for row in selected]
+
+    def plate_types(self, mask: Optional[Mask] = None) -> List[Tuple[str, Mapping[str, Any]]]:
+        """(state code, plate type) of the selected rows"""
+        states = self._columns[STATE_COLUMN]
+        selected = mask.rows() if mask is not None else range(self.size)
+        return [(states[row], self._plates[row]) for row in selected]
+
+    def plate_at(self, row: int) -> Mapping[str, Any]:
+        """The plate type of a row"""
+        return self._plates[row]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Row count and the number of distinct values of each column"""
+        return {
+            'rows': self.size,
+            'columns': {name: len(column.categories) - 1 for name, column in self._columns.items()},
+        }
+
+
+def _column_values(parents: Dict[Tuple[str, ...], List[Any]], path: Tuple[str, ...]) -> List[Any]:
+    """Scalar value at path in every plate (None where there is none)"""
+    key = path[-1]
+    values = [obj.get(key) if obj is not None else None for obj in _objects_at(parents, path[:-1])]
+    return [value if type(value) in _SCALAR_TYPES else None for value in values]
+
+
+def _objects_at(parents: Dict[Tuple[str, ...], List[Any]], path: Tuple[str, ...]) -> List[Any]:
+    """Object at path in every plate (None where it is not an object)"""
+    objects = parents.get(path)
+    if objects is None:
+        key = path[-1]
+        values = [obj.get(key) if obj is not None else None for obj in _objects_at(parents, path[:-1])]
+        objects = parents[path] = [value if isinstance(value, Mapping) else None for value in values]
+    return objects
+
+
+def _unique_suffixes(columns: Mapping[str, Column]) -> Dict[str, str]:
+    """Last part of each dotted column name that names no other column"""
+    suffixes: Dict[str, List[str]] = {}
+    for name in columns:
+        if '.' in name:
+            suffixes.setdefault(name.rsplit('.', 1)[1], []).append(name)
+    return {suffix: names[0] for suffix, names in suffixes.items()
+            if len(names) == 1 and suffix not in columns}
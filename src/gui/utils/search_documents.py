@@ -0,0 +1,183 @@
+"""
+Search Documents - Flattened, pre-lowercased view of license plate JSON data
+
+Each state's nested JSON (state fields, character_formatting,
+processing_metadata.global_rules, plate types and their
+plate_characteristics / processing_metadata) is walked once when the state
+is loaded and turned into a flat list of SearchDocument records. Search
+paths iterate these records instead of re-walking the dicts and
+re-lowercasing every string per query.
+"""
+
+from collections.abc import Mapping
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple
+
+
+# Plate fields searched when the category is 'all'
+ALL_PLATE_FIELDS = ['type_name', 'pattern', 'description', 'category', 'subtype',
+                    'processing_type', 'code_number']
+
+# Top-level state fields that are searchable
+STATE_INFO_FIELDS = ['slogan', 'name', 'abbreviation', 'notes', 'main_logo', 'main_font',
+                     'main_plate_text', 'main_background', 'description']
+
+# String fields inside processing_metadata.global_rules
+GLOBAL_RULE_FIELDS = ['character_restrictions', 'vertical_handling', 'omit_characters', 'font_changes']
+
+# Record number used for state-level (non plate) documents
+STATE_RECORD = -1
+
+
+class SearchDocument(NamedTuple):
+    """A single searchable field value, flattened out of the state JSON"""
+    state_code: str
+    record: int                  # plate index, or STATE_RECORD for state-level fields
+    plate_type: Optional[str]    # plate type display name (None for state-level fields)
+    field: str                   # field name reported in results
+    value: str                   # display value reported in results
+    text: str                    # lowercased text the query is matched against
+    keys: Tuple[str, ...]        # category field names that select this document
+    in_all: bool                 # searched by the 'all' category
+    always: bool                 # searched regardless of category
+    top_level: bool              # direct plate field (ordered by the category field list)
+    first_only: bool             # report only the first match per state/record/field
+
+
+def flatten_state_data(state_code: str, data: Dict[str, Any]) -> List[SearchDocument]:
+    """Flatten one state's JSON into search documents, in result order"""
+    documents: List[SearchDocument] = []
+    _flatten_state_info(state_code, data, documents)
+
+    plates = data.get('plate_types', data.get('plates', []))
+    for i, plate in enumerate(plates):
+        if isinstance(plate, Mapping):
+            _flatten_plate(state_code, i, plate, documents)
+
+    return documents
+
+
+def _doc(state_code: str, record: int, plate_type: Optional[str], field: str, value: str,
+         text: str, keys: Tuple[str, ...] = (), in_all: bool = False, always: bool = False,
+         top_level: bool = False, first_only: bool = False) -> SearchDocument:
+    return SearchDocument(state_code, record, plate_type, field, value, text,
+                          keys, in_all, always, top_level, first_only)
+
+
+def _flatten_state_info(state_code: str, data: Dict[str, Any], documents: List[SearchDocument]):
+    """Flatten top-level state fields, character_formatting and global rules"""
+    for field_name in STATE_INFO_FIELDS:
+        value = data.get(field_name, '')
+        if isinstance(value, str) and value:
+            documents.append(_doc(state_code, STATE_RECORD, None, field_name, value,
+                                  value.lower(), keys=(field_name,), in_all=True))
+
+    if 'uses_zero_for_o' in data:
+        bool_val = data['uses_zero_for_o']
+        text = f"uses zero for o: {bool_val}" if bool_val else "allows letter o"
+        documents.append(_doc(state_code, STATE_RECORD, None, 'uses_zero_for_o',
+                              f"Uses '0' instead of 'O': {bool_val}", text.lower(),
+                              keys=('uses_zero_for_o',), in_all=True))
+
+    if 'allows_letter_o' in data:
+        bool_val = data['allows_letter_o']
+        text = f"allows letter o: {bool_val}" if bool_val else "does not allow letter o"
+        documents.append(_doc(state_code, STATE_RECORD, None, 'allows_letter_o',
+                              f"Allows letter 'O': {bool_val}", text.lower(),
+                              keys=('allows_letter_o',), in_all=True))
+
+    if 'zero_is_slashed' in data:
+        bool_val = data['zero_is_slashed']
+        documents.append(_doc(state_code, STATE_RECORD, None, 'zero_is_slashed',
+                              f"Zero is slashed: {bool_val}", f"zero is slashed: {bool_val}".lower(),
+                              keys=('zero_is_slashed',), in_all=True))
+
+    char_fmt = data.get('character_formatting')
+    if isinstance(char_fmt, Mapping):
+        for fmt_field, fmt_value in char_fmt.items():
+            if isinstance(fmt_value, str):
+                documents.append(_doc(state_code, STATE_RECORD, None, f'character_formatting.{fmt_field}',
+                                      fmt_value, fmt_value.lower(), always=True))
+            elif isinstance(fmt_value, bool):
+                documents.append(_doc(state_code, STATE_RECORD, None, f'character_formatting.{fmt_field}',
+                                      f"{fmt_field.replace('_', ' ').title()}: {fmt_value}",
+                                      f"{fmt_field}: {fmt_value}".lower(), always=True))
+
+    proc_meta = data.get('processing_metadata')
+    global_rules = proc_meta.get('global_rules') if isinstance(proc_meta, Mapping) else None
+    if not isinstance(global_rules, Mapping):
+        return
+
+    for rule_field in GLOBAL_RULE_FIELDS:
+        rule_value = global_rules.get(rule_field)
+        if isinstance(rule_value, str):
+            documents.append(_doc(state_code, STATE_RECORD, None, f'processing_metadata.{rule_field}',
+                                  rule_value, rule_value.lower(), always=True))
+
+    stacked = global_rules.get('stacked_characters')
+    if not isinstance(stacked, Mapping):
+        return
+
+    for list_name, label in (('include', 'Include'), ('omit', 'Omit')):
+        items = stacked.get(list_name)
+        if isinstance(items, list):
+            display = f"{label}: {', '.join(str(item) for item in items)}"
+            for item in items:
+                if isinstance(item, str):
+                    documents.append(_doc(state_code, STATE_RECORD, None, f'stacked_characters.{list_name}',
+                                          display, item.lower(), always=True, first_only=True))
+
+    for stacked_field in ('position', 'notes'):
+        stacked_value = stacked.get(stacked_field)
+        if isinstance(stacked_value, str):
+            documents.append(_doc(state_code, STATE_RECORD, None, f'stacked_characters.{stacked_field}',
+                                  stacked_value, stacked_value.lower(), always=True))
+
+
+def _flatten_plate(state_code: str, index: int, plate: Dict[str, Any], documents: List[SearchDocument]):
+    """Flatten a plate type's fields, plate_characteristics and processing_metadata"""
+    plate_name = plate.get('type_name', f"Plate {index + 1}")
+
+    # Direct plate fields: the 'all' fields first (in their search order), then the rest
+    ordered_fields = [f for f in ALL_PLATE_FIELDS if f in plate]
+    ordered_fields += [f for f in plate if f not in ALL_PLATE_FIELDS]
+    for field in ordered_fields:
+        value = plate[field]
+        if isinstance(value, str):
+            documents.append(_doc(state_code, index, plate_name, field, value, value.lower(),
+                                  keys=(field,), in_all=field in ALL_PLATE_FIELDS, top_level=True))
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, str):
+                    documents.append(_doc(state_code, index, plate_name, field, item, item.lower(),
+                                          keys=(field,), top_level=True))
+
+    plate_chars = plate.get('plate_characteristics')
+    if isinstance(plate_chars, Mapping):
+        for char_field in ('font', 'logo', 'plate_text'):
+            char_value = plate_chars.get(char_field)
+            if isinstance(char_value, str):
+                documents.append(_doc(state_code, index, plate_name, f'plate_characteristics.{char_field}',
+                                      char_value, char_value.lower(), keys=(char_field,), in_all=True))
+
+        design_variants = plate_chars.get('design_variants')
+        if isinstance(design_variants, list):
+            for variant in design_variants:
+                if isinstance(variant, str):
+                    documents.append(_doc(state_code, index, plate_name, 'plate_characteristics.design_variants',
+                                          f"Design variant: {variant}", variant.lower(),
+                                          keys=('design', 'design_variants'), in_all=True, first_only=True))
+
+        char_fmt = plate_chars.get('character_formatting')
+        if isinstance(char_fmt, Mapping):
+            for fmt_field, fmt_value in char_fmt.items():
+                if isinstance(fmt_value, str):
+                    documents.append(_doc(state_code, index, plate_name, f'character_formatting.{fmt_field}',
+                                          fmt_value, fmt_value.lower(), always=True))
+
+    proc_meta = plate.get('processing_metadata')
+    if isinstance(proc_meta, Mapping):
+        for proc_field in ('character_modifications', 'visual_identifier'):
+            proc_value = proc_meta.get(proc_field)
+            if isinstance(proc_value, str):
+                documents.append(_doc(state_code, index, plate_name, f'processing_metadata.{proc_field}',
+                                      proc_value, proc_value.lower(), always=True))
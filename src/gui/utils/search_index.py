@@ -0,0 +1,208 @@
+"""
+Search Index - Inverted token index over license plate JSON data
+
+Maps every character trigram (and every 1- and 2-character gram) of the
+flattened search documents (see search_documents.py) to the documents that contain it, so
+JSONSearchEngine can answer queries without re-walking the raw dicts.
+"""
+
+import heapq
+import re
+from typing import Dict, List, Any, Optional, Set, Iterable
+
+from .search_documents import SearchDocument, flatten_state_data
+
+
+# Queries at least this long are narrowed with the trigram index
+TRIGRAM_SIZE = 3
+
+# Shorter queries are looked up whole among the texts' grams up to this long
+SHORT_GRAM_SIZE = TRIGRAM_SIZE - 1
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split lowercased text into word tokens"""
+    return _TOKEN_RE.findall(text)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Get the distinct character trigrams of a text"""
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+def short_grams(text: str) -> Set[str]:
+    """Get the distinct 1- and 2-character grams of a text"""
+    return {text[i:i + size] for size in range(1, SHORT_GRAM_SIZE + 1) for i in range(len(text) - size + 1)}
+
+
+class SearchIndex:
+    """Inverted index mapping character grams to flattened search documents.
+
+    Documents with identical text share one text entry, so the postings are
+    kept per distinct text and expanded to documents only for verified hits.
+    Queries of three or more characters are narrowed by intersecting the
+    postings of their trigrams, which preserves substring ("contains")
+    semantics; a shorter query is itself one of the 1- and 2-character grams
+    indexed per text, so it takes a single postings lookup. Candidates are
+    always verified with a substring test.
+
+    Removing a state frees its document slots for the next states added and
+    drops the texts (and their postings) no other document has, so states
+    reloaded or evicted over and over do not grow the index.
+    """
+
+    def __init__(self):
+        self.documents: List[Optional[SearchDocument]] = []  # None in slots freed by removed states
+        self._state_documents: Dict[str, List[int]] = {}
+        self.document_count = 0
+        self._total_text_length = 0
+        self._free_doc_ids: List[int] = []  # heaps of freed ids, reused smallest first
+        self._free_text_ids: List[int] = []
+
+        self._texts: List[Optional[str]] = []
+        self._text_ids: Dict[str, int] = {}
+        self._text_documents: List[List[int]] = []
+        self._short_gram_postings: Dict[str, Set[int]] = {}
+        self._trigram_postings: Dict[str, Set[int]] = {}
+
+    def __contains__(self, state_code: str) -> bool:
+        return state_code in self._state_documents
+
+    @property
+    def indexed_states(self) -> List[str]:
+        return list(self._state_documents.keys())
+
+    def add_state(self, state_code: str, data: Dict[str, Any],
+                  documents: Optional[List[SearchDocument]] = None):
+        """Index a state's flattened documents (no-op if already indexed)"""
+        if state_code in self._state_documents:
+            return
+
+        if documents is None:
+            documents = flatten_state_data(state_code, data)
+        doc_ids = allocate_ids(self.documents, self._free_doc_ids, len(documents))
+        for doc_id, document in zip(doc_ids, documents):
+            self.documents[doc_id] = document
+            self._text_documents[self._get_text_id(document.text)].append(doc_id)
+            self._total_text_length += len(document.text)
+        self._state_documents[state_code] = doc_ids
+        self.document_count += len(doc_ids)
+
+    def remove_state(self, state_code: str) -> bool:
+        """Drop a state's documents (e.g. when its file changed or it was evicted)"""
+        doc_ids = self._state_documents.pop(state_code, None)
+        if doc_ids is None:
+            return False
+
+        removed_by_text: Dict[int, Set[int]] = {}
+        for doc_id in doc_ids:
+            text = self.documents[doc_id].text
+            removed_by_text.setdefault(self._text_ids[text], set()).add(doc_id)
+            self._total_text_length -= len(text)
+            self.documents[doc_id] = None
+            heapq.heappush(self._free_doc_ids, doc_id)
+        self.document_count -= len(doc_ids)
+        for text_id, removed in removed_by_text.items():
+            remaining = [d for d in self._text_documents[text_id] if d not in removed]
+            if remaining:
+                self._text_documents[text_id] = remaining
+            else:
+                self._drop_text(text_id)
+        return True
+
+    def _get_text_id(self, text: str) -> int:
+        text_id = self._text_ids.get(text)
+        if text_id is None:
+            text_id = allocate_ids(self._texts, self._free_text_ids, 1)[0]
+            if text_id == len(self._text_documents):
+                self._text_documents.append([])
+            self._text_ids[text] = text_id
+            self._texts[text_id] = text
+            for gram in short_grams(text):
+                self._short_gram_postings.setdefault(gram, set()).add(text_id)
+            for trigram in trigrams(text):
+                self._trigram_postings.setdefault(trigram, set()).add(text_id)
+        return text_id
+
+    def _drop_text(self, text_id: int):
+        """Forget a text no document has any more, with its postings"""
+        text = self._texts[text_id]
+        del self._text_ids[text]
+        self._texts[text_id] = None
+        self._text_documents[text_id] = []
+        for postings, keys in ((self._short_gram_postings, short_grams(text)),
+                               (self._trigram_postings, trigrams(text))):
+            for key in keys:
+                text_ids = postings[key]
+                text_ids.discard(text_id)
+                if not text_ids:
+                    del postings[key]
+        heapq.heappush(self._free_text_ids, text_id)
+
+    def lookup(self, query_lower: str) -> List[int]:
+        """Return ids of all documents whose text contains query_lower, in index order"""
+        text_ids = self._candidate_text_ids(query_lower)
+        doc_ids: List[int] = []
+        for text_id in text_ids:
+            if query_lower in self._texts[text_id]:
+                doc_ids.extend(self._text_documents[text_id])
+        doc_ids.sort()
+        return doc_ids
+
+    def lookup_many(self, queries_lower: Iterable[str]) -> Dict[str, List[int]]:
+        """lookup() for many queries, each distinct query looked up once"""
+        return {query_lower: self.lookup(query_lower) for query_lower in dict.fromkeys(queries_lower)}
+
+    def _candidate_text_ids(self, query_lower: str) -> Iterable[int]:
+        """Narrow the texts that can contain query_lower"""
+        if len(query_lower) >= TRIGRAM_SIZE:
+            return self._trigram_candidates(query_lower)
+        if not query_lower:
+            return self._text_ids.values()
+        return self._short_gram_postings.get(query_lower, ())
+
+    def _trigram_candidates(self, query_lower: str) -> Iterable[int]:
+        """Texts containing every trigram of the query"""
+        postings = []
+        for trigram in trigrams(query_lower):
+            text_ids = self._trigram_postings.get(trigram)
+            if not text_ids:
+                return ()
+            postings.append(text_ids)
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    @property
+    def average_text_length(self) -> float:
+        """Mean length of the indexed document texts (for BM25 length normalization)"""
+        return self._total_text_length / self.document_count if self.document_count else 0.0
+
+    def document_frequency(self, term: str) -> int:
+        """Number of indexed documents whose text contains term"""
+        return len(self.lookup(term))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index size statistics"""
+        return {
+            'backend': 'memory',
+            'states': len(self._state_documents),
+            'documents': self.document_count,
+            'distinct_texts': len(self._text_ids),
+            'short_grams': len(self._short_gram_postings),
+            'trigrams': len(self._trigram_postings),
+        }
+
+
+def allocate_ids(slots: List, free_ids: List[int], count: int) -> List[int]:
+    """Ids for count new entries of slots, ascending: freed ids (a heap) first, then new slots
+
+    Ascending ids keep a state's documents in document order, which the
+    engine relies on to order the results of a state.
+    """
+    ids = [heapq.heappop(free_ids) for _ in range(min(count, len(free_ids)))]
+    start = len(slots)
+    slots.extend([None] * (count - len(ids)))
+    ids.extend(range(start, len(slots)))
+    return ids
@@ -0,0 +1,286 @@
+"""
+Search Query - Field-scoped boolean query language for the search box
+
+    font:gothic state:FL category:university code:46
+    "purple heart" OR veteran
+    type:(university OR college) NOT state:FL
+    slogan:"sunshine state" -commercial
+
+Terms match as substrings, like plain searches. Terms next to each other
+must all match the same record (a plate type, or a state's own fields);
+AND is implied, OR and NOT (or a '-' after a space, as in 'veteran
+-commercial') combine them and parentheses group. A scope (field:term or
+field:(...)) restricts terms to a field, a search category or, for state:,
+a state: its exact code, its name or the leading words of it (state:new).
+Operators are only recognized in upper case, and text without any query
+syntax is left to the plain substring search.
+
+A parsed query is evaluated as set operations on the records matched by
+each term's index lookup, so extra conditions cost one lookup each.
+"""
+
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+from .search_documents import SearchDocument
+
+
+# Scope that filters by state code or name instead of matching document text
+STATE_SCOPE = 'state'
+
+OPERATORS = ('AND', 'OR', 'NOT')
+
+_TOKEN_RE = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<scope>[A-Za-z_][\w.]*):(?=[^\s]|$)
+  | (?P<phrase>"[^"]*"?)
+  | (?P<open>\()
+  | (?P<close>\))
+  | (?<=\s)(?P<minus>-)(?=[^\s)])
+  | (?P<word>[^\s()"]+)
+''', re.VERBOSE)
+
+# (record key) identifies a plate type, or a state's own fields (STATE_RECORD)
+RecordKey = Tuple[str, int]
+Hit = Tuple[int, SearchDocument]
+
+
+class QuerySyntaxError(ValueError):
+    """Raised for a query that uses query syntax but cannot be parsed"""
+
+
+class Term(NamedTuple):
+    field: Optional[str]  # scope, lowercased (None searches the category's fields)
+    text: str             # lowercased text matched as a substring
+
+
+class And(NamedTuple):
+    children: Tuple
+
+
+class Or(NamedTuple):
+    children: Tuple
+
+
+class Not(NamedTuple):
+    child: object
+
+
+Node = Union[Term, And, Or, Not]
+
+
+def tokenize_query(query: str) -> List[Tuple[str, str]]:
+    """Split a query into (kind, text) tokens; kinds: scope, phrase, open, close, not, and, or, word"""
+    tokens = []
+    # Stripped, so a '-' after a space always follows some other part of the query
+    for match in _TOKEN_RE.finditer(query.strip()):
+        kind = match.lastgroup
+        if kind == 'space':
+            continue
+        if kind == 'scope':
+            tokens.append(('scope', match.group('scope').lower()))
+        elif kind == 'phrase':
+            tokens.append(('phrase', match.group().strip('"')))
+        elif kind == 'minus':
+            tokens.append(('not', '-'))
+        elif kind == 'word' and match.group() in OPERATORS:
+            tokens.append((match.group().lower(), match.group()))
+        else:
+            tokens.append((kind, match.group()))
+    return tokens
+
+
+def uses_query_syntax(tokens: List[Tuple[str, str]]) -> bool:
+    """Whether a query is more than plain text (parentheses alone do not count)"""
+    return any(kind in ('scope', 'phrase', 'not', 'and', 'or') for kind, _ in tokens)
+
+
+class _Parser:
+    """Recursive descent parser: or_expr := and_expr (OR and_expr)*, and_expr := unary+"""
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, str]:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self) -> Optional[Node]:
+        node = self.parse_or(None)
+        if self.peek() is not None:
+            raise QuerySyntaxError(f"Unexpected '{self.tokens[self.position][1]}'")
+        return node
+
+    def parse_or(self, scope: Optional[str]) -> Optional[Node]:
+        children = [self.parse_and(scope)]
+        while self.peek() == 'or':
+            self.take()
+            children.append(self.parse_and(scope))
+        return _combine(Or, children)
+
+    def parse_and(self, scope: Optional[str]) -> Optional[Node]:
+        children = []
+        while self.peek() not in (None, 'or', 'close'):
+            if self.peek() == 'and':
+                self.take()
+                continue
+            children.append(self.parse_unary(scope))
+        return _combine(And, children)
+
+    def parse_unary(self, scope: Optional[str]) -> Optional[Node]:
+        if self.peek() == 'not':
+            self.take()
+            child = self.parse_unary(scope)
+            return Not(child) if child is not None else None
+        return self.parse_primary(scope)
+
+    def parse_primary(self, scope: Optional[str]) -> Optional[Node]:
+        if self.peek() is None:
+            return None  # nothing after an operator yet
+        kind, text = self.take()
+        if kind == 'scope':
+            if self.peek() in ('open', 'word', 'phrase'):
+                return self.parse_primary(text)
+            return None  # nothing after the scope yet
+        if kind == 'open':
+            node = self.parse_or(scope)
+            if self.peek() == 'close':
+                self.take()
+            return node
+        if kind in ('word', 'phrase'):
+            text = text.lower()
+            return Term(scope, text) if text else None
+        raise QuerySyntaxError(f"Unexpected '{text}'")
+
+
+def _combine(node_type, children: List[Optional[Node]]) -> Optional[Node]:
+    """Drop incomplete parts (e.g. while the query is still being typed)"""
+    children = [child for child in children if child is not None]
+    if len(children) > 1:
+        return node_type(tuple(children))
+    return children[0] if children else None
+
+
+def parse_query(query: str) -> Optional['QueryPlan']:
+    """Parse a query that uses query syntax; None for plain text (or nothing to search for)
+
+    Raises QuerySyntaxError if the query uses query syntax but cannot be parsed.
+    """
+    tokens = tokenize_query(query)
+    if not uses_query_syntax(tokens):
+        return None
+    root = _Parser(tokens).parse()
+    return QueryPlan(root) if root is not None else None
+
+
+class QueryPlan:
+    """A parsed query evaluated as set operations on the records each term matches"""
+
+    def __init__(self, root: Node):
+        self.root = root
+        self.positive_terms = _positive_terms(root)
+
+    def __repr__(self) -> str:
+        return f"QueryPlan({self.root!r})"
+
+    def text_terms(self) -> List[str]:
+        """Texts of the terms whose matches are reported (for relevance ranking)"""
+        return [term.text for term in self.positive_terms]
+
+    def state_scopes(self) -> List[str]:
+        """state: terms every match must satisfy (lets the caller skip loading other states)"""
+        children = self.root.children if isinstance(self.root, And) else (self.root,)
+        return [child.text for child in children if isinstance(child, Term) and child.field == STATE_SCOPE]
+
+    def evaluate(self, term_hits: Callable[[Term], List[Hit]],
+                 state_records: Callable[[str], Set[RecordKey]],
+                 all_records: Callable[[], Set[RecordKey]]) -> List[Hit]:
+        """Get the (position, document) hits reported for the matching records
+
+        term_hits looks up a term's matching documents, state_records gets the
+        records of the states a state: term names and all_records every
+        searched record (needed only to negate). The hits are those of terms
+        not under a NOT, in matching records.
+        """
+        evaluation = _Evaluation(term_hits, state_records, all_records)
+        records = evaluation.records(self.root)
+        if not records:
+            return []
+
+        hits: Dict[int, SearchDocument] = {}
+        for term in self.positive_terms:
+            for position, document in evaluation.hits(term):
+                if (document.state_code, document.record) in records:
+                    hits[position] = document
+        return list(hits.items())
+
+
+class _Evaluation:
+    """Record sets of one query evaluation, with each term looked up once"""
+
+    def __init__(self, term_hits, state_records, all_records):
+        self._term_hits = term_hits
+        self._state_records = state_records
+        self._all_records = all_records
+        self._hits: Dict[Term, List[Hit]] = {}
+        self._universe: Optional[Set[RecordKey]] = None
+
+    def hits(self, term: Term) -> List[Hit]:
+        hits = self._hits.get(term)
+        if hits is None:
+            hits = self._hits[term] = self._term_hits(term)
+        return hits
+
+    def universe(self) -> Set[RecordKey]:
+        if self._universe is None:
+            self._universe = self._all_records()
+        return self._universe
+
+    def records(self, node: Node) -> Set[RecordKey]:
+        if isinstance(node, Term):
+            if node.field == STATE_SCOPE:
+                return self._state_records(node.text)
+            return {(document.state_code, document.record) for _, document in self.hits(node)}
+
+        if isinstance(node, Or):
+            records: Set[RecordKey] = set()
+            for child in node.children:
+                records |= self.records(child)
+            return records
+
+        if isinstance(node, Not):
+            return self.universe() - self.records(node.child)
+
+        # And: intersect the positive parts, then subtract the negated ones
+        positives = [child for child in node.children if not isinstance(child, Not)]
+        negatives = [child.child for child in node.children if isinstance(child, Not)]
+        records = None
+        for child in positives:
+            child_records = self.records(child)
+            records = child_records if records is None else records & child_records
+            if not records:
+                return set()
+        if records is None:
+            records = set(self.universe())
+        for child in negatives:
+            records -= self.records(child)
+            if not records:
+                break
+        return records
+
+
+def _positive_terms(node: Node, negated: bool = False) -> List[Term]:
+    """Text terms not under an odd number of NOTs, in query order"""
+    if isinstance(node, Term):
+        return [node] if not negated and node.field != STATE_SCOPE else []
+    if isinstance(node, Not):
+        return _positive_terms(node.child, not negated)
+    terms: List[Term] = []
+    for child in node.children:
+        terms.extend(term for term in _positive_terms(child, negated) if term not in terms)
+    return terms
@@ -0,0 +1,106 @@
+"""
+Search Ranking - BM25-style relevance scoring of matching search documents
+
+A document's score is the BM25 sum over the query's words (term frequency
+saturated by k1 and normalized by the document's length against the
+corpus average, weighted by each word's inverse document frequency),
+multiplied by:
+
+- how the query matched: the whole text, a whole word, a word prefix or
+  just somewhere inside a word
+- the field it matched in (a plate type name outranks a description)
+- a boost for states the caller cares about (e.g. the queue mode's
+  primary states)
+"""
+
+import heapq
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .search_documents import SearchDocument
+
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Multipliers for how the query matched the document text
+EXACT_MATCH_BOOST = 4.0
+WORD_MATCH_BOOST = 2.0
+PREFIX_MATCH_BOOST = 1.5
+PARTIAL_MATCH_BOOST = 1.0
+
+# Multipliers per field; fields not listed weigh 1.0
+FIELD_WEIGHTS = {
+    'type_name': 3.0,
+    'plate_type': 3.0,
+    'name': 2.5,
+    'abbreviation': 2.5,
+    'slogan': 2.0,
+    'main_plate_text': 1.5,
+    'category': 1.5,
+    'subtype': 1.5,
+    'pattern': 1.2,
+    'description': 0.8,
+    'notes': 0.6,
+}
+
+PRIMARY_STATE_BOOST = 1.5
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def query_terms(query_lower: str) -> List[str]:
+    """Words of a query scored separately (the whole query if it has none)"""
+    return _WORD_RE.findall(query_lower) or [query_lower]
+
+
+class SearchRanker:
+    """Scores documents matching one query against corpus statistics"""
+
+    def __init__(self, query_lower: str, document_count: int, average_length: float,
+                 document_frequency: Dict[str, int], boost_states: Optional[Iterable[str]] = None):
+        self.query_lower = query_lower
+        self.terms = query_terms(query_lower)
+        self.average_length = max(average_length, 1.0)
+        self.boost_states = set(boost_states or ())
+        self._word_pattern = re.compile(r'\b' + re.escape(query_lower) + r'\b')
+        self._idf = {term: self.idf(document_frequency.get(term, 0), document_count) for term in self.terms}
+
+    @staticmethod
+    def idf(document_frequency: int, document_count: int) -> float:
+        """BM25 inverse document frequency (always positive)"""
+        return math.log(1.0 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def match_boost(self, text: str) -> float:
+        """How well the whole query matched the text"""
+        if text == self.query_lower:
+            return EXACT_MATCH_BOOST
+        if self._word_pattern.search(text):
+            return WORD_MATCH_BOOST
+        if text.startswith(self.query_lower) or (' ' + self.query_lower) in text:
+            return PREFIX_MATCH_BOOST
+        return PARTIAL_MATCH_BOOST
+
+    def score(self, document: SearchDocument) -> float:
+        text = document.text
+        length_norm = 1.0 - BM25_B + BM25_B * len(text) / self.average_length
+        bm25 = 0.0
+        for term in self.terms:
+            frequency = text.count(term)
+            if frequency:
+                bm25 += self._idf[term] * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+        score = bm25 * self.match_boost(text) * FIELD_WEIGHTS.get(document.field, 1.0)
+        if document.state_code in self.boost_states:
+            score *= PRIMARY_STATE_BOOST
+        return score
+
+    def top(self, documents: List[SearchDocument], limit: Optional[int]) -> List[Tuple[float, SearchDocument]]:
+        """The limit best (score, document) pairs, best first; ties keep document order"""
+        scored = ((self.score(document), -position, document) for position, document in enumerate(documents))
+        if limit is None:
+            best = sorted(scored, key=lambda item: item[:2], reverse=True)
+        else:
+            # Bounded heap: O(n log limit) instead of sorting every match
+            best = heapq.nlargest(limit, scored, key=lambda item: item[:2])
+        return [(score, document) for score, _, document in best]
@@ -0,0 +1,248 @@
+"""
+State Records - Compact, read-only in-memory form of the state JSON
+
+Parsed as dicts, the states take many times their size on disk: every one
+of the ~11,500 plate types is a dict of its own with nested dicts for
+processing_metadata and plate_characteristics, and the same keys and
+values ("standard", "#FFFFFF", "Standard validation stickers") are
+repeated throughout. compact_state_data() converts a parsed state into
+records instead:
+
+- StateRecord, PlateTypeRecord and ProcessingMetadataRecord keep their
+  known fields in __slots__ (any other key goes to a small extra dict)
+- other objects are Records: a tuple of values next to a key tuple shared
+  by every object with the same keys
+- strings are interned, so each distinct value is stored once
+
+Records are read-only Mappings, so existing callers keep using get(),
+[], in, items() and ==; to_plain() turns them back into dicts and lists
+(for json.dump or marshal). measure_compaction() reports the memory saved,
+traced with tracemalloc.
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+
+_intern = sys.intern
+
+
+class _Shape:
+    """Key order shared by every record with the same keys"""
+    __slots__ = ('keys', 'index')
+
+    def __init__(self, keys: Tuple[str, ...]):
+        self.keys = keys
+        self.index = {key: position for position, key in enumerate(keys)}
+
+
+_shapes: Dict[Tuple[str, ...], _Shape] = {}
+
+
+def _get_shape(obj: Dict[str, Any]) -> _Shape:
+    keys = tuple(obj)
+    shape = _shapes.get(keys)
+    if shape is None:
+        shape = _shapes.setdefault(keys, _Shape(tuple(_intern(key) for key in keys)))
+    return shape
+
+
+class Record(Mapping):
+    """Read-only mapping over a JSON object, its keys shared with same-shaped records"""
+    __slots__ = ('_shape', '_values')
+
+    def __init__(self, shape: _Shape, values: Tuple[Any, ...]):
+        self._shape = shape
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        position = self._shape.index.get(key)
+        if position is None:
+            raise KeyError(key)
+        return self._values[position]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        position = self._shape.index.get(key)
+        return default if position is None else self._values[position]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._shape.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._shape.keys)
+
+    def __len__(self) -> int:
+        return len(self._shape.keys)
+
+    def __repr__(self) -> str:
+        # Shown and exported like the dict it replaces
+        return repr(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy (nested records and lists included)"""
+        return to_plain(self)
+
+
+class SlottedRecord(Mapping):
+    """Read-only mapping keeping the known FIELDS of an object in __slots__
+
+    A field that is not set is a key the object does not have. Keys outside
+    FIELDS are kept in a dict of their own.
+    """
+    __slots__ = ('_shape', '_extra')
+
+    FIELDS: Tuple[str, ...] = ()
+    # Record class for a field's object value (or for each object in its list)
+    CHILDREN: Dict[str, type] = {}
+
+    def __init__(self, shape: _Shape, values: Tuple[Any, ...]):
+        self._shape = shape
+        extra = None
+        fields = self._field_set
+        for key, value in zip(shape.keys, values):
+            if key in fields:
+                setattr(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        self._extra = extra
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._field_set:
+            return getattr(self, key, default)
+        return self._extra.get(key, default) if self._extra is not None else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._shape.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._shape.keys)
+
+    def __len__(self) -> int:
+        return len(self._shape.keys)
+
+    def __repr__(self) -> str:
+        # Shown and exported like the dict it replaces
+        return repr(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy (nested records and lists included)"""
+        return to_plain(self)
+
+
+class ProcessingMetadataRecord(SlottedRecord):
+    """A plate type's processing_metadata"""
+    FIELDS = (
+        'currently_processed', 'requires_prefix', 'requires_suffix', 'allows_custom_text',
+        'special_validation', 'notes', 'visual_identifier', 'character_modifications',
+        'verify_state_abbreviation', 'vehicle_type_identification', 'all_numeric_plate',
+        'dot_processing_type', 'dot_dropdown_identifier', 'dot_conditional_rules', 'date_ranges',
+        'plate_images_available', 'csv_processing_rules', 'character_handling_rule',
+    )
+    __slots__ = FIELDS
+
+
+class PlateTypeRecord(SlottedRecord):
+    """One entry of a state's plate_types"""
+    FIELDS = (
+        'type_name', 'pattern', 'character_count', 'description', 'background_color', 'text_color',
+        'has_stickers', 'sticker_description', 'category', 'code_number', 'processing_metadata',
+        'visual_identifier', 'processing_rules', 'requires_prefix', 'plate_characteristics',
+        'subtype', 'processing_type', 'images', 'date_ranges',
+    )
+    __slots__ = FIELDS
+    CHILDREN = {'processing_metadata': ProcessingMetadataRecord}
+
+
+class StateRecord(SlottedRecord):
+    """A state's top-level fields"""
+    FIELDS = (
+        'name', 'abbreviation', 'slogan', 'uses_zero_for_o', 'allows_letter_o', 'zero_is_slashed',
+        'primary_colors', 'main_font', 'main_logo', 'main_plate_text', 'sticker_format',
+        'character_formatting', 'images', 'notes', 'processing_metadata', 'plate_types',
+    )
+    __slots__ = FIELDS
+    CHILDREN = {'plate_types': PlateTypeRecord}
+
+
+def compact_state_data(data: Dict[str, Any]) -> StateRecord:
+    """Convert a parsed state into records with interned strings"""
+    return _compact_object(data, StateRecord)
+
+
+def _compact_object(obj: Dict[str, Any], record_class: type) -> Any:
+    children = record_class.CHILDREN if record_class is not Record else None
+    values = []
+    for key, value in obj.items():
+        kind = type(value)
+        if kind is str:
+            value = _intern(value)
+        elif kind is dict or kind is list:
+            value = _compact(value, children.get(key, Record) if children else Record)
+        values.append(value)
+    return record_class(_get_shape(obj), tuple(values))
+
+
+def _compact(value: Any, record_class: type) -> Any:
+    kind = type(value)
+    if kind is str:
+        return _intern(value)
+    if kind is dict:
+        return _compact_object(value, record_class)
+    if kind is list:
+        return [_compact(item, record_class) for item in value]
+    return value
+
+
+def to_plain(value: Any) -> Any:
+    """Copy of a value with records (and other mappings) turned back into dicts"""
+    if isinstance(value, Mapping):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    return value
+
+
+def measure_compaction(raw_files: Iterable[bytes]) -> Tuple[int, int]:
+    """Bytes held by the parsed files as dicts and as records, traced with tracemalloc
+
+    Both are measured for all the files together, so values shared between
+    states are counted once in the records.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        parsed = [json.loads(raw) for raw in raw_files]
+        plain_bytes = tracemalloc.get_traced_memory()[0] - baseline
+
+        records: Optional[list] = [compact_state_data(data) for data in parsed]
+        del parsed
+        gc.collect()
+        compact_bytes = tracemalloc.get_traced_memory()[0] - baseline
+        del records
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return plain_bytes, compact_bytes
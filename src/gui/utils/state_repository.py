@@ -0,0 +1,304 @@
+"""
+State Repository - One shared, thread-safe loader for the state data files
+
+The search engine, the State Data Manager, the font preview, the Add Image
+dialog and the image manager all read the same data/states/*.json files.
+They get them from one StateRepository per data directory
+(shared_state_repository()), which parses each file once and hands every
+caller the same parsed object while the file is unchanged. Callers must
+treat the data as read-only.
+
+Files are read from their snapshot when one is current (see
+state_snapshot.py) and parsed otherwise, then kept as compact records
+(state_records.py) rather than nested dicts. Concurrent requests for a state
+wait for a single read. Parses and snapshot loads are counted per file
+(get_stats()) so repeated parsing shows up.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+from utils.logger import log_warning
+from .lru_cache import LRUCache
+from .search_documents import SearchDocument
+from .state_records import compact_state_data, to_plain
+from .state_snapshot import StateSnapshotStore, content_digest, default_snapshot_directory, gc_paused
+
+
+# Memory budget for the parsed states kept by a repository
+DEFAULT_REPOSITORY_BYTES = 256 * 1024 * 1024
+
+# Parsed JSON takes roughly this multiple of its file size in memory
+PARSED_SIZE_FACTOR = 2
+
+# State code to filename mapping - All US states, territories and Canadian provinces
+STATE_FILENAME_MAP = {
+    'AL': 'alabama', 'AK': 'alaska', 'AS': 'american_samoa', 'AZ': 'arizona',
+    'AR': 'arkansas', 'AB': 'alberta', 'CA': 'california', 'CO': 'colorado',
+    'CT': 'connecticut', 'DE': 'delaware', 'DM': 'diplomatic', 'FL': 'florida',
+    'GA': 'georgia', 'GU': 'guam', 'HI': 'hawaii', 'ID': 'idaho',
+    'IL': 'illinois', 'IN': 'indiana', 'IA': 'iowa', 'KS': 'kansas',
+    'KY': 'kentucky', 'LA': 'louisiana', 'ME': 'maine', 'MD': 'maryland',
+    'MA': 'massachusetts', 'MI': 'michigan', 'MN': 'minnesota', 'MS': 'mississippi',
+    'MO': 'missouri', 'MT': 'montana', 'NE': 'nebraska', 'NV': 'nevada',
+    'NH': 'new_hampshire', 'NJ': 'new_jersey', 'NM': 'new_mexico', 'NY': 'new_york',
+    'NC': 'north_carolina', 'ND': 'north_dakota', 'MP': 'northern_mariana_islands',
+    'OH': 'ohio', 'OK': 'oklahoma', 'ON': 'ontario', 'OR': 'oregon',
+    'PA': 'pennsylvania', 'PR': 'puerto_rico', 'QC': 'quebec', 'RI': 'rhode_island',
+    'SC': 'south_carolina', 'SD': 'south_dakota', 'TN': 'tennessee', 'TX': 'texas',
+    'UG': 'us_government', 'VI': 'us_virgin_islands', 'UT': 'utah', 'VT': 'vermont',
+    'VA': 'virginia', 'WA': 'washington', 'DC': 'washington_dc', 'WV': 'west_virginia',
+    'WI': 'wisconsin', 'WY': 'wyoming',
+    # Canadian provinces
+    'BC': 'british_columbia', 'MB': 'manitoba', 'NB': 'new_brunswick',
+    'NL': 'newfoundland', 'NS': 'nova_scotia', 'NT': 'northwest_territories',
+    'NU': 'nunavut', 'PE': 'prince_edward_island', 'SK': 'saskatchewan', 'YT': 'yukon'
+}
+
+
+class LoadedState(NamedTuple):
+    """A state file's parsed data, as returned by StateRepository.load()"""
+    data: Mapping[str, Any]                     # StateRecord, or a dict if compact=False
+    stamp: Tuple[int, int]                      # (mtime_ns, size) of the file the data came from
+    documents: Optional[List[SearchDocument]]   # flattened documents, if read from a full snapshot
+    digest: Optional[str]                       # content_digest() of the parsed JSON (None from a snapshot)
+
+
+def file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    """Get (mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class StateRepository:
+    """Parsed state files of one data directory, loaded once and shared by all readers"""
+
+    def __init__(self, data_directory: str, snapshots: Optional[StateSnapshotStore] = None,
+                 max_bytes: int = DEFAULT_REPOSITORY_BYTES, compact: bool = True):
+        self.data_directory = Path(data_directory)
+        self.snapshots = snapshots or StateSnapshotStore(default_snapshot_directory(str(self.data_directory)))
+        # Keep states as read-only records with interned strings (False: plain dicts)
+        self.compact = compact
+
+        self._lock = threading.Lock()
+        self._states = LRUCache(max_bytes, sizeof=lambda loaded: loaded.stamp[1] * PARSED_SIZE_FACTOR)
+        # One lock per file so concurrent requests wait for a single read
+        self._load_locks: Dict[str, threading.Lock] = {}
+        # Top-level-only views for readers that can defer plate_types (see get(lazy=True))
+        self._lazy_views: Dict[str, Tuple[Tuple[int, int], Mapping[str, Any]]] = {}
+        # Files of codes missing from STATE_FILENAME_MAP, found by their 'abbreviation' field
+        self._abbreviation_files: Optional[Dict[str, Path]] = None
+
+        # File name (e.g. 'florida') -> times read
+        self.parse_counts: Dict[str, int] = {}
+        self.snapshot_loads: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def state_file(self, state_code: str) -> Path:
+        """Get the JSON file path for a state code"""
+        filename_base = STATE_FILENAME_MAP.get(state_code)
+        if filename_base is not None:
+            return self.data_directory / f"{filename_base}.json"
+        default_file = self.data_directory / f"{state_code.lower()}.json"
+        if default_file.exists():
+            return default_file
+        return self._find_by_abbreviation(state_code) or default_file
+
+    def _find_by_abbreviation(self, state_code: str) -> Optional[Path]:
+        """Find an unmapped state's file by the abbreviation inside it (files are read once)"""
+        if self._abbreviation_files is None:
+            mapped = {f"{filename_base}.json" for filename_base in STATE_FILENAME_MAP.values()}
+            found: Dict[str, Path] = {}
+            for path in sorted(self.data_directory.glob('*.json')):
+                if path.name in mapped:
+                    continue
+                loaded = self._load_file(path)
+                abbreviation = loaded.data.get('abbreviation') if loaded is not None else None
+                if isinstance(abbreviation, str):
+                    found.setdefault(abbreviation.upper(), path)
+            self._abbreviation_files = found
+        return self._abbreviation_files.get(state_code.upper())
+
+    def load(self, state_code: str) -> LoadedState:
+        """Get a state's data, reading its file only if it changed since the last read
+
+        Raises FileNotFoundError if the state has no file, and OSError or
+        json.JSONDecodeError if it cannot be read.
+        """
+        data_file = self.state_file(state_code)
+        loaded = self._load_file(data_file, raise_errors=True)
+        if loaded is None:
+            raise FileNotFoundError(f"State file not found: {data_file}")
+        return loaded
+
+    def _load_file(self, data_file: Path, raise_errors: bool = False) -> Optional[LoadedState]:
+        # Kept by file name, so every code resolving to a file shares its data
+        key = data_file.stem
+        # Stamp before reading so an edit during the read is still detected later
+        stamp = file_stamp(data_file)
+        if stamp is None:
+            return None
+        with self._lock:
+            loaded = self._current(key, stamp)
+            if loaded is not None:
+                self.hits += 1
+                return loaded
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                # Another thread may have read it while this one waited
+                loaded = self._current(key, stamp)
+                if loaded is not None:
+                    self.hits += 1
+                    return loaded
+                self.misses += 1
+            try:
+                loaded = self._read(key, data_file, stamp)
+            except (OSError, ValueError) as e:
+                if raise_errors:
+                    raise
+                log_warning(f"Could not read state file {data_file.name}: {e}")
+                return None
+            with self._lock:
+                self._states.put(key, loaded)
+                self._lazy_views.pop(key, None)
+        return loaded
+
+    def _current(self, key: str, stamp: Tuple[int, int]) -> Optional[LoadedState]:
+        """The kept data of a file if it is unchanged (call with the lock held)"""
+        loaded = self._states.get(key)
+        if loaded is not None and loaded.stamp != stamp:
+            self._states.invalidate(key)
+            return None
+        return loaded
+
+    def _read(self, key: str, data_file: Path, stamp: Tuple[int, int]) -> LoadedState:
+        snapshot = self.snapshots.load(data_file, stamp)
+        if snapshot is not None:
+            with self._lock:
+                self.snapshot_loads[key] = self.snapshot_loads.get(key, 0) + 1
+            return LoadedState(self._compact(snapshot[0]), stamp, snapshot[1], None)
+
+        raw = data_file.read_bytes()
+        data = json.loads(raw)
+        with self._lock:
+            self.parse_counts[key] = self.parse_counts.get(key, 0) + 1
+        return LoadedState(self._compact(data), stamp, None, content_digest(raw))
+
+    def _compact(self, data: Dict[str, Any]) -> Mapping[str, Any]:
+        if not self.compact or not isinstance(data, dict):
+            return data
+        with gc_paused():
+            return compact_state_data(data)
+
+    def get(self, state_code: str, lazy: bool = False) -> Optional[Mapping[str, Any]]:
+        """Get a state's data, or None if its file is missing or unreadable
+
+        With lazy=True a state that is not loaded yet is returned as a
+        LazyStateData read from its snapshot, whose plate_types is read on
+        first access; its data is parsed as usual if there is no snapshot.
+        """
+        data_file = self.state_file(state_code)
+        if lazy:
+            key = data_file.stem
+            stamp = file_stamp(data_file)
+            if stamp is None:
+                return None
+            with self._lock:
+                loaded = self._current(key, stamp)
+                view = self._lazy_views.get(key)
+            if loaded is not None:
+                with self._lock:
+                    self.hits += 1
+                return loaded.data
+            if view is not None and view[0] == stamp:
+                return view[1]
+            lazy_data = self.snapshots.load_lazy(data_file, stamp)
+            if lazy_data is not None:
+                with self._lock:
+                    self._lazy_views[key] = (stamp, lazy_data)
+                    self.snapshot_loads[key] = self.snapshot_loads.get(key, 0) + 1
+                return lazy_data
+
+        loaded = self._load_file(data_file)
+        if loaded is None:
+            return None
+        if loaded.digest is not None:
+            # Parsed from JSON: leave a snapshot for the next start
+            self.save_snapshot(state_code, loaded)
+        return loaded.data
+
+    def save_snapshot(self, state_code: str, loaded: LoadedState,
+                      documents: Optional[List[SearchDocument]] = None) -> bool:
+        """Write the snapshot of loaded data, with its search documents if given
+
+        Nothing is written if the file changed since it was read or an equally
+        complete snapshot is already current.
+        """
+        data_file = self.state_file(state_code)
+        if self.snapshots.is_current(data_file, loaded.stamp, with_documents=documents is not None):
+            return False
+        digest = loaded.digest
+        if digest is None:
+            try:
+                digest = content_digest(data_file.read_bytes())
+            except OSError:
+                return False
+        if file_stamp(data_file) != loaded.stamp:
+            return False
+        return self.snapshots.save(data_file, loaded.stamp, digest, to_plain(loaded.data), documents)
+
+    def invalidate(self, state_code: str):
+        """Drop a state's data so its file is read again on next access"""
+        key = self.state_file(state_code).stem
+        with self._lock:
+            self._states.invalidate(key)
+            self._lazy_views.pop(key, None)
+
+    def clear(self):
+        """Drop all loaded states (statistics are kept)"""
+        with self._lock:
+            self._states.clear()
+            self._lazy_views.clear()
+            self._abbreviation_files = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get how often each file was parsed or read from its snapshot, and the cache use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'states': len(self._states),
+                'bytes': self._states.current_bytes,
+                'max_bytes': self._states.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self._states.evictions,
+                'json_parses': sum(self.parse_counts.values()),
+                'snapshot_loads': sum(self.snapshot_loads.values()),
+                'parse_counts': dict(self.parse_counts),
+            }
+
+
+_shared_repositories: Dict[Tuple[str, str, bool], StateRepository] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_state_repository(data_directory: str, snapshot_directory: Optional[str] = None,
+                            use_snapshots: bool = True) -> StateRepository:
+    """Get the process-wide repository of a data directory (created on first use)"""
+    snapshot_path = Path(snapshot_directory) if snapshot_directory else default_snapshot_directory(data_directory)
+    key = (os.path.realpath(data_directory), os.path.realpath(snapshot_path), use_snapshots)
+    with _shared_lock:
+        repository = _shared_repositories.get(key)
+        if repository is None:
+            repository = StateRepository(data_directory, StateSnapshotStore(snapshot_path, enabled=use_snapshots))
+            _shared_repositories[key] = repository
+        return repository
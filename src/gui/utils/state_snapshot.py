@@ -0,0 +1,214 @@
+"""
+State Snapshot - Binary cache of parsed state data for fast cold starts
+
+Each state file's parsed JSON and flattened search documents are written
+with marshal to a sibling directory of data/states/ (data/states_snapshot/).
+The top-level fields, the deferred sections (plate_types) and the documents
+are stored as separate sections so a LazyStateData can be restored from the
+top-level fields alone.
+A snapshot is used only while the JSON file it came from is unchanged:
+the file size must match and either the mtime or a content digest must
+match (copies such as the PyInstaller bundle get new mtimes). Anything
+stale, unreadable or written by another format is ignored and the JSON is
+parsed instead.
+"""
+
+import gc
+import hashlib
+import json
+import marshal
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from utils.logger import log_warning
+from .search_documents import SearchDocument
+from .lazy_state_data import LazyStateData, split_state_data
+
+
+# Bump when the snapshot layout or the flattened document contents change
+SNAPSHOT_VERSION = 2
+SNAPSHOT_SUFFIX = '.snapshot'
+
+# marshal's format may change between Python versions
+_FORMAT = (SNAPSHOT_VERSION, tuple(sys.version_info[:2]), len(SearchDocument._fields))
+
+_new_tuple = tuple.__new__
+
+
+def default_snapshot_directory(data_directory: str) -> Path:
+    """Snapshot directory next to the state data directory (data/states -> data/states_snapshot)"""
+    data_path = Path(data_directory)
+    return data_path.parent / f"{data_path.name}_snapshot"
+
+
+def content_digest(raw: bytes) -> str:
+    """Digest of a state file's contents"""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Pause the cyclic GC while building many container objects at once"""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+class StateSnapshotStore:
+    """Reads and writes per-state snapshot files keyed by the state file's size and mtime"""
+
+    def __init__(self, directory: Path, enabled: bool = True):
+        self.directory = Path(directory)
+        self.enabled = enabled
+
+    def snapshot_path(self, data_file: Path) -> Path:
+        return self.directory / f"{data_file.stem}{SNAPSHOT_SUFFIX}"
+
+    def load(self, data_file: Path,
+             stamp: Optional[Tuple[int, int]]) -> Optional[Tuple[Dict[str, Any], Optional[List[SearchDocument]]]]:
+        """Get (data, documents) for a state file, or None if there is no valid snapshot.
+
+        stamp is the file's (mtime_ns, size); documents is None for data-only snapshots.
+        """
+        if not self.enabled or stamp is None:
+            return None
+        try:
+            with open(self.snapshot_path(data_file), 'rb') as f:
+                header = marshal.load(f)
+                if not self._is_current(header, data_file, stamp):
+                    return None
+                # marshal.loads on the whole body is much faster than marshal.load on the file
+                body = memoryview(f.read())
+            with gc_paused():
+                fields_end, deferred_end = header[5][0], header[5][0] + header[5][1]
+                fields, key_order = marshal.loads(body[:fields_end])
+                deferred = marshal.loads(body[fields_end:deferred_end])
+                documents = marshal.loads(body[deferred_end:])
+                if documents is not None:
+                    documents = [_new_tuple(SearchDocument, document) for document in documents]
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            log_warning(f"Ignoring unreadable snapshot for {data_file.name}: {e}")
+            return None
+        fields.update(deferred)
+        return {key: fields[key] for key in key_order}, documents
+
+    def load_lazy(self, data_file: Path, stamp: Optional[Tuple[int, int]]) -> Optional[LazyStateData]:
+        """Get a state's top-level fields, with plate_types read from the snapshot on first access"""
+        if not self.enabled or stamp is None:
+            return None
+        try:
+            with open(self.snapshot_path(data_file), 'rb') as f:
+                header = marshal.load(f)
+                if not self._is_current(header, data_file, stamp):
+                    return None
+                offset = f.tell()
+                fields, key_order = marshal.loads(f.read(header[5][0]))
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            log_warning(f"Ignoring unreadable snapshot for {data_file.name}: {e}")
+            return None
+
+        def load_deferred(key: str) -> Any:
+            return self._load_deferred(data_file, header, offset + header[5][0], header[5][1]).get(key)
+
+        loaders = {key: (lambda key=key: load_deferred(key)) for key in key_order if key not in fields}
+        return LazyStateData(fields, loaders, key_order)
+
+    def _load_deferred(self, data_file: Path, header: tuple, offset: int, size: int) -> Dict[str, Any]:
+        """Read the deferred section written with a given header"""
+        try:
+            with open(self.snapshot_path(data_file), 'rb') as f:
+                if marshal.load(f) == header:
+                    f.seek(offset)
+                    with gc_paused():
+                        return marshal.loads(f.read(size))
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            log_warning(f"Could not read deferred snapshot data for {data_file.name}: {e}")
+        # The snapshot was replaced since the top-level fields were read: parse the JSON instead
+        log_warning(f"Snapshot of {data_file.name} changed, reading plate data from JSON")
+        with open(data_file, 'rb') as f:
+            return split_state_data(json.loads(f.read()))[1]
+
+    @staticmethod
+    def _is_current(header: Any, data_file: Path, stamp: Tuple[int, int]) -> bool:
+        """Check a snapshot header against the state file it was written for"""
+        if not isinstance(header, tuple) or len(header) != 6:
+            return False
+        snapshot_format, mtime_ns, size, digest, _, _ = header
+        if snapshot_format != _FORMAT or size != stamp[1]:
+            return False
+        if mtime_ns == stamp[0]:
+            return True
+        try:
+            return content_digest(data_file.read_bytes()) == digest
+        except OSError:
+            return False
+
+    def is_current(self, data_file: Path, stamp: Optional[Tuple[int, int]],
+                   with_documents: bool = True) -> bool:
+        """Check whether a state file has a valid snapshot without reading its data"""
+        if not self.enabled or stamp is None:
+            return False
+        try:
+            with open(self.snapshot_path(data_file), 'rb') as f:
+                header = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        return self._is_current(header, data_file, stamp) and (header[4] or not with_documents)
+
+    def save(self, data_file: Path, stamp: Optional[Tuple[int, int]], digest: str, data: Dict[str, Any],
+             documents: Optional[List[SearchDocument]] = None) -> bool:
+        """Write a state's snapshot; returns False if it could not be written.
+
+        digest is the content_digest() of the exact bytes data was parsed from.
+        """
+        if not self.enabled or stamp is None:
+            return False
+        path = self.snapshot_path(data_file)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            fields, deferred, key_order = split_state_data(data)
+            sections = [
+                marshal.dumps((fields, key_order)),
+                marshal.dumps(deferred),
+                marshal.dumps([tuple(document) for document in documents] if documents is not None else None),
+            ]
+            header = (_FORMAT, stamp[0], stamp[1], digest, documents is not None,
+                      tuple(len(section) for section in sections))
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                marshal.dump(header, f)
+                for section in sections:
+                    f.write(section)
+            # Replace atomically so a concurrent reader never sees a partial file
+            os.replace(temp_path, path)
+        except (OSError, ValueError) as e:
+            # e.g. a read-only install directory: keep working from the JSON files
+            log_warning(f"Could not write snapshot for {data_file.name}: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+            return False
+        return True
+
+    def clear(self) -> int:
+        """Delete all snapshot files; returns how many were removed"""
+        removed = 0
+        for path in self.directory.glob(f"*{SNAPSHOT_SUFFIX}"):
+            try:
+                path.unlink()
+                removed += 1
+            except OSError as e:
+                log_warning(f"Could not delete snapshot {path.name}: {e}")
+        return removed
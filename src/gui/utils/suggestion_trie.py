@@ -0,0 +1,150 @@
+"""
+Suggestion Trie - Prefix completion over field values with frequency counts
+
+Values (plate type names, slogans, fonts, ...) are stored with how often
+they occur in the data, keyed by their lowercased text and by every word
+start inside it ("heart" completes "Purple Heart"). The trie is compressed
+(edges hold whole strings rather than single characters) and built in one
+pass over the sorted keys. Each node keeps the best completions of its
+subtree, so a lookup only walks the typed prefix: O(len(prefix)) whatever
+the vocabulary size.
+"""
+
+import heapq
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Completions kept per node (the most a lookup can return)
+TOP_COMPLETIONS = 20
+
+_WORD_START_RE = re.compile(r'\b\w')
+
+
+class _Node:
+    __slots__ = ('label', 'children', 'value_ids', 'top')
+
+    def __init__(self, label: str = ''):
+        self.label = label                        # edge text leading to this node
+        self.children: Dict[str, '_Node'] = {}    # first character of a child's label -> child
+        self.value_ids: List[int] = []            # values whose key ends here
+        self.top: List[int] = []                  # best value ids of the subtree, best first
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    """Length of the common prefix, found by comparing slices (C speed) instead of characters"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def completion_keys(value: str) -> List[str]:
+    """Keys a value is completed from: its lowercased text and each word start inside it"""
+    key = value.lower()
+    starts = {0} | {match.start() for match in _WORD_START_RE.finditer(key)}
+    return [key[start:] for start in sorted(starts)]
+
+
+class SuggestionTrie:
+    """Compressed prefix trie returning the most frequent values for a prefix"""
+
+    def __init__(self, values: Dict[str, int], limit: int = TOP_COMPLETIONS):
+        self.values: List[str] = list(values)
+        self.counts: List[int] = list(values.values())
+        self._root = _Node()
+
+        entries: List[Tuple[str, int]] = []
+        for value_id, value in enumerate(self.values):
+            entries.extend((key, value_id) for key in completion_keys(value))
+        entries.sort()
+        self._insert_sorted(entries)
+
+        # Most frequent first, then shorter, then alphabetical
+        order = sorted(range(len(self.values)),
+                       key=lambda value_id: (-self.counts[value_id], len(self.values[value_id]),
+                                             self.values[value_id].lower()))
+        rank = [0] * len(order)
+        for position, value_id in enumerate(order):
+            rank[value_id] = position
+        self._collect_top(self._root, limit, rank.__getitem__)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _insert_sorted(self, entries: List[Tuple[str, int]]):
+        """Build the trie from (key, value id) pairs sorted by key"""
+        # Path to the previous key: (node, length of the key text up to the end of its label)
+        stack: List[Tuple[_Node, int]] = [(self._root, 0)]
+        previous = ''
+        for key, value_id in entries:
+            common = _common_prefix_length(previous, key)
+            while stack[-1][1] > common:
+                node, _ = stack.pop()
+                parent, parent_depth = stack[-1]
+                if parent_depth < common:
+                    # The key leaves this node's edge part way: split the edge
+                    middle = _Node(node.label[:common - parent_depth])
+                    node.label = node.label[common - parent_depth:]
+                    middle.children[node.label[0]] = node
+                    parent.children[middle.label[0]] = middle
+                    stack.append((middle, common))
+            node, depth = stack[-1]
+            if depth == len(key):
+                if value_id not in node.value_ids:
+                    node.value_ids.append(value_id)
+            else:
+                child = node.children[key[depth]] = _Node(key[depth:])
+                child.value_ids.append(value_id)
+                stack.append((child, len(key)))
+            previous = key
+
+    def _collect_top(self, node: _Node, limit: int, rank) -> List[int]:
+        candidates = list(node.value_ids)
+        for child in node.children.values():
+            candidates.extend(self._collect_top(child, limit, rank))
+        # A value can be reached through several of its word starts
+        node.top = heapq.nsmallest(limit, set(candidates), key=rank) if len(candidates) > 1 else candidates
+        return node.top
+
+    def _find(self, prefix: str) -> Optional[_Node]:
+        """The node whose subtree holds the keys starting with prefix"""
+        node = self._root
+        position = 0
+        while position < len(prefix):
+            child = node.children.get(prefix[position])
+            if child is None:
+                return None
+            remaining = prefix[position:]
+            if remaining.startswith(child.label):
+                position += len(child.label)
+            elif child.label.startswith(remaining):
+                return child
+            else:
+                return None
+            node = child
+        return node
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """The most frequent values with a word starting with prefix, best first"""
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+        node = self._find(prefix)
+        if node is None:
+            return []
+        return [self.values[value_id] for value_id in node.top[:limit]]
+
+
+def count_values(values: Iterable[str]) -> Dict[str, int]:
+    """Occurrences of each value, case-insensitively (the first spelling seen is kept)"""
+    counts: Dict[str, int] = {}
+    spelling: Dict[str, str] = {}
+    for value in values:
+        first = spelling.setdefault(value.lower(), value)
+        counts[first] = counts.get(first, 0) + 1
+    return counts
@@ -6,22 +6,34 @@ with debouncing and result categorization for the UI panels.
 """
 
 import sys
+import threading
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 
-from PySide6.QtCore import QObject, Signal, QTimer
+from PySide6.QtCore import QObject, Signal, QTimer, QThreadPool, QRunnable
 
 # Add src to path for imports
 src_dir = Path(__file__).parent.parent.parent
 if str(src_dir) not in sys.path:
     sys.path.insert(0, str(src_dir))
 
-from gui.utils.json_search_engine import JSONSearchEngine
+from gui.utils.json_search_engine import JSONSearchEngine, RankedResults, DEFAULT_SEARCH_BACKEND, SEARCH_BACKENDS
+from gui.utils.plate_identifier import Identification
+from utils.logger import log_warning
 
 # Minimum characters required to start searching
 MIN_SEARCH_CHARS = 2
 
+# Most relevant results shown per search (total_matches still counts all)
+SEARCH_RESULT_LIMIT = 100
+
+# Completions offered for the search box
+SUGGESTION_LIMIT = 10
+
+# Category of the results of identify_plate()
+IDENTIFY_CATEGORY = 'identify'
+
 
 @dataclass
 class SearchResult:
@@ -57,10 +69,17 @@ class CategorizedResults:
     char_rules_results: List[SearchResult] = field(default_factory=list)
     all_results: List[SearchResult] = field(default_factory=list)
     
+    # Matches before the result limit was applied
+    total_matches: int = 0
+    
     @property
     def total_count(self) -> int:
         return len(self.all_results)
     
+    @property
+    def is_truncated(self) -> bool:
+        return self.total_matches > len(self.all_results)
+    
     @property
     def state_count(self) -> int:
         # Count unique states
@@ -80,21 +99,39 @@ class SearchController(QObject):
     
     # Signals
     search_started = Signal()
+    search_partial = Signal(object)  # CategorizedResults of the states searched so far
     search_completed = Signal(object)  # CategorizedResults
     search_cleared = Signal()
     search_error = Signal(str)
+    warm_up_progress = Signal(int, int, str)  # loaded, total, state_code
+    warm_up_finished = Signal()
+    suggestions_ready = Signal()  # completions were rebuilt; ask get_suggestions() again
+    identify_completed = Signal(object)  # CategorizedResults of identify_plate()
+    state_reloaded = Signal(str, bool)  # state code, whether it was re-read (see reload_state())
+    
+    # Emitted from the search worker; queued to the controller's thread (search id first)
+    _batch_found = Signal(int, object)  # search id, results of one state
+    _ranked_found = Signal(int, object)  # search id, RankedResults
+    _identified = Signal(int, object, object)  # search id, Identification, state filter
+    _search_failed = Signal(int, str)  # search id, error message
     
     # Category mappings for UI dropdown
     CATEGORIES = {
         'all': 'All Fields',
         'slogans': 'Slogans',
         'type': 'Plate Types',
+        'fuzzy': 'Plate Types (typo-tolerant)',
         'fonts': 'Fonts',
         'colors': 'Colors',
         'handling_rules': 'Character Rules',
         'processing': 'Processing Rules',
     }
     
+    # Names of result categories not offered in the dropdown
+    RESULT_CATEGORIES = {
+        IDENTIFY_CATEGORY: 'Plate Identification',
+    }
+    
     # Fields that belong to character rules panel
     CHAR_RULES_FIELDS = {
         'uses_zero_for_o', 'allows_letter_o', 'zero_is_slashed',
@@ -103,15 +140,40 @@ class SearchController(QObject):
         'character_modifications', 'font', 'main_font'
     }
     
-    def __init__(self, parent=None, debounce_ms: int = 300):
+    def __init__(self, parent=None, debounce_ms: int = 300, result_limit: Optional[int] = SEARCH_RESULT_LIMIT,
+                 stream_results: bool = True, search_backend: str = DEFAULT_SEARCH_BACKEND,
+                 threaded: bool = True):
         super().__init__(parent)
         
-        self.engine = JSONSearchEngine()
+        # 'memory' (inverted index) or 'sqlite' (FTS5); both give the same results
+        if search_backend not in SEARCH_BACKENDS:
+            # Comes from the user's settings: a bad value must not stop the app from starting
+            log_warning(f"Unknown search backend '{search_backend}', using '{DEFAULT_SEARCH_BACKEND}'")
+            search_backend = DEFAULT_SEARCH_BACKEND
+        self.engine = JSONSearchEngine(search_backend=search_backend)
         self.debounce_ms = debounce_ms
+        self.result_limit = result_limit
+        self.stream_results = stream_results
+        self._boost_states: List[str] = []
         self._debounce_timer = QTimer()
         self._debounce_timer.setSingleShot(True)
         self._debounce_timer.timeout.connect(self._execute_search)
         
+        # Searches run on a worker thread (threaded=False runs them in search()'s caller).
+        # One worker: a superseded search stops at its next state before the new one starts.
+        self.threaded = threaded
+        self._thread_pool = QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(1)
+        self._search_id = 0
+        self._cancelled: Optional[threading.Event] = None
+        self._batch_found.connect(self._on_batch_found)
+        self._ranked_found.connect(self._on_ranked_found)
+        self._identified.connect(self._on_identified)
+        self._search_failed.connect(self._on_search_failed)
+        
+        # Results of the running search's states so far (streamed as search_partial)
+        self._stream_results: List[Dict] = []
+        
         self._pending_query: str = ""
         self._pending_category: str = "all"
         self._pending_state_filter: Optional[str] = None
@@ -127,6 +189,95 @@ class SearchController(QObject):
     def last_results(self) -> Optional[CategorizedResults]:
         return self._last_results
     
+    def start_warm_up(self):
+        """
+        Load and index all states in the background.
+        
+        Progress is reported through warm_up_progress and warm_up_finished
+        once every load has finished, failed or been cancelled; searches
+        issued meanwhile only wait for the states they need.
+        """
+        futures = self.engine.warm_up(progress_callback=self._on_warm_up_progress,
+                                      finished_callback=self.warm_up_finished.emit)
+        if not futures:
+            self.warm_up_finished.emit()
+    
+    def cancel_warm_up(self):
+        """Stop loading states that have not started yet."""
+        self.engine.cancel_warm_up()
+    
+    def shutdown(self):
+        """Stop warm-up and the running search, waiting for the search worker to finish."""
+        self._debounce_timer.stop()
+        self._cancel_search()
+        self.engine.cancel_warm_up()
+        self._thread_pool.waitForDone()
+    
+    def _on_warm_up_progress(self, loaded: int, total: int, state_code: str):
+        # Called from worker threads; Qt queues the signals to the receivers' thread
+        self.warm_up_progress.emit(loaded, total, state_code)
+    
+    def set_boost_states(self, state_codes: List[str]):
+        """Rank matches from these states (e.g. the mode's primary states) higher."""
+        self._boost_states = list(state_codes)
+    
+    def get_suggestions(self, text: str, category: str = 'all', limit: int = SUGGESTION_LIMIT) -> List[str]:
+        """
+        Get the most frequent field values completing the typed text.
+        
+        Never waits for the completions to be rebuilt after the loaded data
+        changed: the previous ones (or none) are offered until
+        suggestions_ready is emitted.
+        """
+        return self.engine.get_suggestions(text, category, limit, wait=False,
+                                           ready_callback=self.suggestions_ready.emit)
+    
+    def reload_state(self, state_code: str):
+        """
+        Re-read a state whose data file changed (its cached search results are dropped).
+        
+        Runs on the search worker, so searches started afterwards see the new
+        data; state_reloaded is emitted once the state was re-read (or, if it
+        was not loaded, only invalidated).
+        """
+        task = _ReloadTask(self, state_code)
+        if self.threaded:
+            self._thread_pool.start(task)
+        else:
+            task.run()
+    
+    def _run_reload(self, state_code: str):
+        """Re-read a changed state (runs on the worker thread)."""
+        try:
+            reloaded = self.engine.reload_state(state_code)
+        except Exception as e:
+            log_warning(f"Could not reload state {state_code}: {e}")
+            reloaded = False
+        self.state_reloaded.emit(state_code, reloaded)
+    
+    def export_data_coverage(self, file_path: str) -> Dict[str, Any]:
+        """Write per-state, per-category and per-field data counts to a JSON or CSV file."""
+        return self.engine.export_corpus_stats(file_path)
+    
+    def identify_plate(self, read: str, state_filter: Optional[str] = None):
+        """
+        Rank the states and plate types a read plate string could be.
+        
+        Replaces any running search and runs on the search worker (the first
+        identification builds the plate type tables); the results are emitted
+        through identify_completed. Each result is a plate type, with its match
+        score (0-1) as the value.
+        """
+        self._debounce_timer.stop()
+        self._cancel_search()
+        self._is_searching = True
+        
+        task = _IdentifyTask(self, self._search_id, read, state_filter, self._cancelled)
+        if self.threaded:
+            self._thread_pool.start(task)
+        else:
+            task.run()
+    
     def get_all_states(self) -> List[str]:
         """Get list of all available state codes."""
         return self.engine.get_all_state_codes()
@@ -147,6 +298,8 @@ class SearchController(QObject):
             state_filter: Optional state code to limit search
             immediate: If True, skip debounce and search immediately
         """
+        # A new query supersedes a search still running
+        self._cancel_search()
         self._pending_query = query.strip()
         self._pending_category = category
         self._pending_state_filter = state_filter
@@ -171,41 +324,153 @@ class SearchController(QObject):
     def clear_search(self):
         """Clear the current search and results."""
         self._debounce_timer.stop()
+        self._cancel_search()
         self._pending_query = ""
         self._last_results = None
         self.search_cleared.emit()
     
     def _execute_search(self):
-        """Execute the pending search."""
+        """Start the pending search on the worker thread."""
         if not self._pending_query:
             return
         
+        self._cancel_search()
         self._is_searching = True
         self.search_started.emit()
         
+        task = _SearchTask(self, self._search_id, self._pending_query, self._pending_category,
+                           self._pending_state_filter, list(self._boost_states), self._cancelled)
+        if self.threaded:
+            self._thread_pool.start(task)
+        else:
+            task.run()
+    
+    def _cancel_search(self):
+        """Abandon the running search: it stops before its next state and its results are dropped."""
+        if self._cancelled is not None:
+            self._cancelled.set()
+        self._cancelled = threading.Event()
+        self._search_id += 1
+        self._is_searching = False
+        self._stream_results = []
+    
+    def _run_search(self, search_id: int, query: str, category: str, state_filter: Optional[str],
+                    boost_states: List[str], cancelled: threading.Event):
+        """Search state by state, then rank what was found (runs on the worker thread)."""
         try:
-            # Use existing search engine
-            raw_results = self.engine.search(
-                query=self._pending_query,
-                category=self._pending_category,
-                state_filter=self._pending_state_filter
-            )
+            stream = self.engine.search_iter(query=query, category=category, state_filter=state_filter,
+                                             priority_states=boost_states, cancelled=cancelled)
+            found: Optional[List] = []  # the batches' documents (None once a batch has none)
+            try:
+                for batch in stream:
+                    if batch.documents is None:
+                        found = None
+                    elif found is not None:
+                        found.extend(batch.documents)
+                    if self.stream_results:
+                        self._batch_found.emit(search_id, batch.results)
+            finally:
+                stream.close()
+            if cancelled.is_set():
+                return
             
+            if found is not None:
+                # Rank the documents the stream found rather than searching again
+                ranked = self.engine.rank_documents(query, found, category, state_filter,
+                                                    self.result_limit, boost_states)
+            else:
+                # Cached or fuzzy results: search_ranked() answers from its cache or the fuzzy matcher
+                ranked = self.engine.search_ranked(
+                    query=query,
+                    category=category,
+                    state_filter=state_filter,
+                    limit=self.result_limit,
+                    boost_states=boost_states
+                )
+            if not cancelled.is_set():
+                self._ranked_found.emit(search_id, ranked)
+        except Exception as e:
+            if not cancelled.is_set():
+                self._search_failed.emit(search_id, str(e))
+    
+    def _run_identify(self, search_id: int, read: str, state_filter: Optional[str], cancelled: threading.Event):
+        """Identify a read plate (runs on the worker thread)."""
+        try:
+            identification = self.engine.identify_plate(read, limit=self.result_limit, state_filter=state_filter)
+            if not cancelled.is_set():
+                self._identified.emit(search_id, identification, state_filter)
+        except Exception as e:
+            if not cancelled.is_set():
+                self._search_failed.emit(search_id, str(e))
+    
+    def _on_batch_found(self, search_id: int, results: List[Dict]):
+        """Emit the results of the states searched so far."""
+        if search_id != self._search_id:
+            return  # superseded search
+        
+        self._stream_results.extend(results)
+        # Matches in search order; the ranked top results replace them when the search completes
+        shown = self._stream_results if self.result_limit is None else self._stream_results[:self.result_limit]
+        partial = self._categorize_results(
+            shown,
+            self._pending_query,
+            self._pending_category,
+            self._pending_state_filter
+        )
+        partial.total_matches = len(self._stream_results)
+        self.search_partial.emit(partial)
+    
+    def _on_ranked_found(self, search_id: int, ranked: RankedResults):
+        """Emit the ranked results of the finished search."""
+        if search_id != self._search_id:
+            return  # superseded search
+        
+        self._is_searching = False
+        self._stream_results = []
+        try:
             # Convert and categorize results
             categorized = self._categorize_results(
-                raw_results,
+                ranked.results,
                 self._pending_query,
                 self._pending_category,
                 self._pending_state_filter
             )
+            categorized.total_matches = ranked.total_count
             
             self._last_results = categorized
             self.search_completed.emit(categorized)
             
         except Exception as e:
             self.search_error.emit(str(e))
-        finally:
-            self._is_searching = False
+    
+    def _on_identified(self, search_id: int, identification: Identification, state_filter: Optional[str]):
+        """Emit the plate types of a finished identification."""
+        if search_id != self._search_id:
+            return  # superseded by a search or another identification
+        
+        self._is_searching = False
+        raw_results = [
+            {
+                'state': candidate.state_code,
+                'state_name': self.engine.state_names.get(candidate.state_code, candidate.state_code),
+                'plate_type': candidate.type_name,
+                'field': 'match score',
+                'value': f"{candidate.score:.2f}",
+                'match_type': 'plate_type',
+            }
+            for candidate in identification.candidates
+        ]
+        results = self._categorize_results(raw_results, identification.plate, IDENTIFY_CATEGORY, state_filter)
+        results.total_matches = identification.total_count
+        self._last_results = results
+        self.identify_completed.emit(results)
+    
+    def _on_search_failed(self, search_id: int, message: str):
+        if search_id != self._search_id:
+            return  # superseded search
+        self._is_searching = False
+        self._stream_results = []
+        self.search_error.emit(message)
     
     def _categorize_results(
         self,
@@ -257,3 +522,54 @@ class SearchController(QObject):
     def get_state_data(self, state_code: str) -> Dict[str, Any]:
         """Get full data for a specific state."""
         return self.engine.load_state_data(state_code)
+
+
+class _SearchTask(QRunnable):
+    """One search run by SearchController's thread pool."""
+    
+    def __init__(self, controller: SearchController, search_id: int, query: str, category: str,
+                 state_filter: Optional[str], boost_states: List[str], cancelled: threading.Event):
+        super().__init__()
+        self.controller = controller
+        self.search_id = search_id
+        self.query = query
+        self.category = category
+        self.state_filter = state_filter
+        self.boost_states = boost_states
+        self.cancelled = cancelled
+    
+    def run(self):
+        if self.cancelled.is_set():
+            return  # superseded while queued
+        self.controller._run_search(self.search_id, self.query, self.category, self.state_filter,
+                                    self.boost_states, self.cancelled)
+
+
+class _IdentifyTask(QRunnable):
+    """One plate identification run by SearchController's thread pool."""
+    
+    def __init__(self, controller: SearchController, search_id: int, read: str,
+                 state_filter: Optional[str], cancelled: threading.Event):
+        super().__init__()
+        self.controller = controller
+        self.search_id = search_id
+        self.read = read
+        self.state_filter = state_filter
+        self.cancelled = cancelled
+    
+    def run(self):
+        if self.cancelled.is_set():
+            return  # superseded while queued
+        self.controller._run_identify(self.search_id, self.read, self.state_filter, self.cancelled)
+
+
+class _ReloadTask(QRunnable):
+    """One changed state re-read by SearchController's thread pool."""
+    
+    def __init__(self, controller: SearchController, state_code: str):
+        super().__init__()
+        self.controller = controller
+        self.state_code = state_code
+    
+    def run(self):
+        self.controller._run_reload(self.state_code)
@@ -4,11 +4,22 @@ State Data Manager for License Plate Information System.
 Handles loading and providing state data from JSON files.
 """
 
-import json
+import sys
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Mapping, Tuple
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, QFileSystemWatcher, QTimer
+
+# Add src to path for imports
+src_dir = Path(__file__).parent.parent.parent
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+from gui.utils.state_repository import STATE_FILENAME_MAP, StateRepository, shared_state_repository
+
+# Quiet period after the last file system event before changed files are re-read
+# (editors and json.dump write a file in several steps)
+FILE_CHANGE_DEBOUNCE_MS = 500
 
 
 class StateDataManager(QObject):
@@ -20,47 +31,111 @@ class StateDataManager(QObject):
     """
     
     # Signals
-    state_loaded = Signal(str, dict)  # state_code, data
-    
-    # State code to filename mapping - All 60 jurisdictions
-    STATE_FILENAME_MAP = {
-        'AL': 'alabama', 'AK': 'alaska', 'AS': 'american_samoa', 'AZ': 'arizona',
-        'AR': 'arkansas', 'AB': 'alberta', 'CA': 'california', 'CO': 'colorado',
-        'CT': 'connecticut', 'DE': 'delaware', 'DM': 'diplomatic', 'FL': 'florida',
-        'GA': 'georgia', 'GU': 'guam', 'HI': 'hawaii', 'ID': 'idaho',
-        'IL': 'illinois', 'IN': 'indiana', 'IA': 'iowa', 'KS': 'kansas',
-        'KY': 'kentucky', 'LA': 'louisiana', 'ME': 'maine', 'MD': 'maryland',
-        'MA': 'massachusetts', 'MI': 'michigan', 'MN': 'minnesota', 'MS': 'mississippi',
-        'MO': 'missouri', 'MT': 'montana', 'NE': 'nebraska', 'NV': 'nevada',
-        'NH': 'new_hampshire', 'NJ': 'new_jersey', 'NM': 'new_mexico', 'NY': 'new_york',
-        'NC': 'north_carolina', 'ND': 'north_dakota', 'MP': 'northern_mariana_islands',
-        'OH': 'ohio', 'OK': 'oklahoma', 'ON': 'ontario', 'OR': 'oregon',
-        'PA': 'pennsylvania', 'PR': 'puerto_rico', 'QC': 'quebec', 'RI': 'rhode_island',
-        'SC': 'south_carolina', 'SD': 'south_dakota', 'TN': 'tennessee', 'TX': 'texas',
-        'UG': 'us_government', 'VI': 'us_virgin_islands', 'UT': 'utah', 'VT': 'vermont',
-        'VA': 'virginia', 'WA': 'washington', 'DC': 'washington_dc', 'WV': 'west_virginia',
-        'WI': 'wisconsin', 'WY': 'wyoming',
-        # Canadian provinces
-        'BC': 'british_columbia', 'MB': 'manitoba', 'NB': 'new_brunswick',
-        'NL': 'newfoundland', 'NS': 'nova_scotia', 'NT': 'northwest_territories',
-        'NU': 'nunavut', 'PE': 'prince_edward_island', 'SK': 'saskatchewan', 'YT': 'yukon'
-    }
-    
-    def __init__(self, parent=None, data_dir: str = "data/states"):
+    state_loaded = Signal(str, object)  # state_code, data (dict or LazyStateData)
+    state_changed = Signal(str)  # state_code whose file changed on disk (see watch_for_changes)
+    
+    # State code to filename mapping, shared with the state repository
+    STATE_FILENAME_MAP = STATE_FILENAME_MAP
+    
+    def __init__(self, parent=None, data_dir: str = "data/states", use_snapshots: bool = True,
+                 repository: Optional[StateRepository] = None):
         super().__init__(parent)
         
         self.data_dir = Path(data_dir)
-        self._cache: Dict[str, dict] = {}
+        self._cache: Dict[str, Mapping[str, Any]] = {}
+        
+        # State files are read through the process-wide repository shared with the search engine
+        self.repository = repository or shared_state_repository(str(self.data_dir), use_snapshots=use_snapshots)
+        self.snapshots = self.repository.snapshots
+        
+        # Hot reload of edited state files (started by watch_for_changes)
+        self._watcher: Optional[QFileSystemWatcher] = None
+        self._file_stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._change_timer = QTimer(self)
+        self._change_timer.setSingleShot(True)
+        self._change_timer.timeout.connect(self.check_for_changes)
+    
+    def _get_state_file(self, state_code: str) -> Path:
+        """Get the JSON file path for a state."""
+        return self.repository.state_file(state_code)
+    
+    def _get_file_stamp(self, state_code: str) -> Optional[Tuple[int, int]]:
+        """Get (mtime_ns, size) of a state's file, or None if it does not exist."""
+        try:
+            stat = self._get_state_file(state_code).stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def watch_for_changes(self, debounce_ms: int = FILE_CHANGE_DEBOUNCE_MS):
+        """
+        Watch the state files and emit state_changed for each one edited on disk.
+        
+        The changed state's cached data is dropped first, so the next
+        get_state_data() call re-reads only that file.
+        """
+        self._change_timer.setInterval(debounce_ms)
+        self._file_stamps = {code: self._get_file_stamp(code) for code in self.STATE_FILENAME_MAP}
+        if self._watcher is None:
+            self._watcher = QFileSystemWatcher(self)
+            self._watcher.directoryChanged.connect(self._on_path_changed)
+            self._watcher.fileChanged.connect(self._on_path_changed)
+        self._watch_paths()
+    
+    def _watch_paths(self):
+        """Watch the directory and its state files (files replaced by a save drop out of the watch)."""
+        paths = [str(self.data_dir)] + [str(self._get_state_file(code)) for code, stamp
+                                        in self._file_stamps.items() if stamp is not None]
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        missing = [path for path in paths if path not in watched]
+        if missing:
+            self._watcher.addPaths(missing)
+    
+    def _on_path_changed(self, path: str):
+        """Restart the quiet period on every file system event."""
+        self._change_timer.start()
     
-    def get_state_data(self, state_code: str) -> Optional[dict]:
+    def check_for_changes(self) -> List[str]:
+        """
+        Find the state files that changed since they were last seen.
+        
+        Drops their cached data and emits state_changed for each one.
+        
+        Returns:
+            Codes of the changed states
+        """
+        changed = []
+        for state_code in self.STATE_FILENAME_MAP:
+            stamp = self._get_file_stamp(state_code)
+            if stamp != self._file_stamps.get(state_code):
+                self._file_stamps[state_code] = stamp
+                changed.append(state_code)
+        
+        if self._watcher is not None:
+            self._watch_paths()
+        for state_code in changed:
+            self.invalidate_state(state_code)
+            self.state_changed.emit(state_code)
+        return changed
+    
+    def invalidate_state(self, state_code: str):
+        """Drop a state's cached data so it is re-read on next access."""
+        self._cache.pop(state_code.upper(), None)
+        self.repository.invalidate(state_code.upper())
+    
+    def get_state_data(self, state_code: str) -> Optional[Mapping[str, Any]]:
         """
         Load and return data for a state.
         
+        Data already loaded by the search engine is shared. Otherwise, when
+        the state has a current snapshot, only the top-level fields are read;
+        plate_types is loaded the first time it is accessed.
+        
         Args:
             state_code: Two-letter state abbreviation (e.g., 'FL', 'CA')
             
         Returns:
-            Dict with state data, or None if not found
+            Mapping with state data, or None if not found
         """
         if not state_code:
             return None
@@ -72,16 +147,16 @@ class StateDataManager(QObject):
             return self._cache[state_code]
         
         # Get filename
-        filename_base = self.STATE_FILENAME_MAP.get(state_code, state_code.lower())
-        filepath = self.data_dir / f"{filename_base}.json"
+        filepath = self._get_state_file(state_code)
         
         if not filepath.exists():
             print(f"[WARN] State file not found: {filepath}")
             return None
         
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self.repository.get(state_code, lazy=True)
+            if data is None:
+                return None
             
             self._cache[state_code] = data
             self.state_loaded.emit(state_code, data)
@@ -164,7 +239,7 @@ class StateDataManager(QObject):
         # Return simplified plate type info
         result = []
         for pt in plate_types:
-            if isinstance(pt, dict):
+            if isinstance(pt, Mapping):
                 result.append({
                     'type_name': pt.get('type_name', 'Unknown'),
                     'description': pt.get('description', ''),
@@ -6,6 +6,7 @@ with optional metadata including plate type, description, and character
 rule information.
 """
 
+from collections.abc import Mapping
 from pathlib import Path
 from typing import Optional, List
 
@@ -21,8 +22,10 @@ from PySide6.QtGui import QPixmap, QDragEnterEvent, QDropEvent, QFont
 # Handle both relative and absolute imports for bundled exe compatibility
 try:
     from ...utils.user_image_manager import UserImageManager
+    from ...gui.utils.state_repository import shared_state_repository
 except ImportError:
     from utils.user_image_manager import UserImageManager
+    from gui.utils.state_repository import shared_state_repository
 
 
 class TagWidget(QWidget):
@@ -661,43 +664,21 @@ class AddImageDialog(QDialog):
         self._update_add_button()
     
     def _load_plate_types(self, state_code: str) -> List[str]:
-        """Load plate types for a state from JSON file."""
-        import json
-        
-        # Try to load from state JSON file
-        state_file = self.data_path / 'states' / f'{state_code.lower()}.json'
-        
-        if not state_file.exists():
-            # Try alternate naming
-            for f in (self.data_path / 'states').iterdir():
-                if f.suffix == '.json':
-                    try:
-                        with open(f, 'r', encoding='utf-8') as file:
-                            data = json.load(file)
-                            if data.get('abbreviation', '').upper() == state_code.upper():
-                                state_file = f
-                                break
-                    except:
-                        continue
+        """Load plate types for a state from the shared state repository."""
+        # The repository finds files by state name, or by the abbreviation inside them
+        data = shared_state_repository(str(self.data_path / 'states')).get(state_code.upper())
         
         plate_types = set()
         
-        if state_file.exists():
-            try:
-                with open(state_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    # Extract plate types from various possible locations
-                    if 'plate_types' in data:
-                        for pt in data['plate_types']:
-                            if isinstance(pt, dict):
-                                name = pt.get('type_name') or pt.get('name', '')
-                                if name:
-                                    plate_types.add(name)
-                            elif isinstance(pt, str):
-                                plate_types.add(pt)
-            except Exception as e:
-                print(f"Error loading plate types: {e}")
+        if data:
+            # Extract plate types from various possible locations
+            for pt in data.get('plate_types') or []:
+                if isinstance(pt, Mapping):
+                    name = pt.get('type_name') or pt.get('name', '')
+                    if name:
+                        plate_types.add(name)
+                elif isinstance(pt, str):
+                    plate_types.add(pt)
         
         # Add common defaults if none found
         if not plate_types:
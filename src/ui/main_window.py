@@ -6,11 +6,12 @@ This is the main application window with menu bar, toolbar, and splitter-based l
 
 import json
 import sys
+from collections.abc import Mapping
 from pathlib import Path
 from typing import Optional
 
-from PySide6.QtCore import Qt, Signal, QSettings
-from PySide6.QtGui import QAction, QKeySequence, QCloseEvent, QShortcut
+from PySide6.QtCore import Qt, Signal, QSettings, QTimer, QStringListModel
+from PySide6.QtGui import QAction, QKeySequence, QCloseEvent, QShortcut, QShowEvent
 from PySide6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -33,9 +34,11 @@ from PySide6.QtWidgets import (
     QListWidgetItem,
     QSizePolicy,
     QFileDialog,
+    QCompleter,
 )
 
-from ui.controllers.search_controller import SearchController, CategorizedResults
+from gui.utils.state_records import to_plain
+from ui.controllers.search_controller import SearchController, CategorizedResults, DEFAULT_SEARCH_BACKEND
 from ui.controllers.mode_controller import ModeController
 from ui.controllers.state_data_manager import StateDataManager
 from ui.widgets.font_preview import FontPreviewWidget
@@ -71,11 +74,20 @@ class MainWindow(QMainWindow):
             base_path = Path(__file__).parent.parent.parent
         self.data_path = base_path / "data"
         
-        # Initialize search controller
-        self.search_controller = SearchController(self)
+        # Initialize search controller (search_backend setting: 'memory' or 'sqlite', others fall back to memory)
+        self.search_controller = SearchController(
+            self, search_backend=str(self.settings.value("search_backend", DEFAULT_SEARCH_BACKEND))
+        )
+        self.search_controller.search_partial.connect(self._on_search_partial)
         self.search_controller.search_completed.connect(self._on_search_completed)
         self.search_controller.search_cleared.connect(self._on_search_cleared)
         self.search_controller.search_error.connect(self._on_search_error)
+        self.search_controller.warm_up_progress.connect(self._on_warm_up_progress)
+        self.search_controller.warm_up_finished.connect(self._on_warm_up_finished)
+        self.search_controller.suggestions_ready.connect(self._update_search_suggestions)
+        self.search_controller.identify_completed.connect(self._on_identify_completed)
+        self.search_controller.state_reloaded.connect(self._on_state_reloaded)
+        self._warm_up_started = False
         
         # Initialize mode controller
         self.mode_controller = ModeController(self)
@@ -87,6 +99,10 @@ class MainWindow(QMainWindow):
         # Initialize state data manager with the correct data path
         self.state_data_manager = StateDataManager(self, data_dir=str(self.data_path / "states"))
         
+        # Hot reload: state files edited while the app runs are re-read one at a time
+        self.state_data_manager.state_changed.connect(self._on_state_file_changed)
+        self.state_data_manager.watch_for_changes()
+        
         # State button references
         self.state_buttons: dict[str, StateButton] = {}
         
@@ -168,6 +184,10 @@ class MainWindow(QMainWindow):
         export_search_action.triggered.connect(self._on_export_search_results)
         file_menu.addAction(export_search_action)
         
+        export_coverage_action = QAction("Export Data Coverage...", self)
+        export_coverage_action.triggered.connect(self._on_export_data_coverage)
+        file_menu.addAction(export_coverage_action)
+        
         file_menu.addSeparator()
         
         settings_action = QAction("Settings", self)
@@ -278,6 +298,11 @@ class MainWindow(QMainWindow):
         jump_action.triggered.connect(self._on_jump_to_state)
         tools_menu.addAction(jump_action)
         
+        identify_action = QAction("Identify Plate...", self)
+        identify_action.setShortcut(QKeySequence("Ctrl+Shift+I"))
+        identify_action.triggered.connect(self._on_identify_plate)
+        tools_menu.addAction(identify_action)
+        
         tools_menu.addSeparator()
         
         refresh_action = QAction("Refresh Database", self)
@@ -505,8 +530,21 @@ class MainWindow(QMainWindow):
         search_input_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search all data...")
+        self.search_input.setToolTip(
+            "Search text, or combine terms:\n"
+            "  type:university state:FL code:46\n"
+            "  \"purple heart\" OR veteran\n"
+            "  category:military NOT state:TX"
+        )
         self.search_input.textChanged.connect(self._on_search_text_changed)
         self.search_input.returnPressed.connect(self._on_search_enter)
+        
+        # Autocomplete from the values in the loaded data (refreshed as the user types)
+        self.search_suggestions = QStringListModel(self)
+        search_completer = QCompleter(self.search_suggestions, self)
+        search_completer.setCaseSensitivity(Qt.CaseInsensitive)
+        search_completer.setFilterMode(Qt.MatchContains)
+        self.search_input.setCompleter(search_completer)
         search_input_layout.addWidget(self.search_input)
         
         self.search_clear_btn = QPushButton("✕")
@@ -655,7 +693,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.char_rules_list)
         
         # Font preview widget
-        self.font_preview = FontPreviewWidget()
+        self.font_preview = FontPreviewWidget(data_dir=str(self.data_path / "states"))
         layout.addWidget(self.font_preview, 1)  # Give it stretch factor
         
         scroll.setWidget(content)
@@ -827,8 +865,16 @@ class MainWindow(QMainWindow):
         self.mode_description.setText(f"  {description}")
         self.mode_description.setStyleSheet("color: #b0b0b0; padding: 0 8px;")
     
+    def showEvent(self, event: QShowEvent):
+        """Start loading state data in the background once the window is visible."""
+        super().showEvent(event)
+        if not self._warm_up_started:
+            self._warm_up_started = True
+            self.search_controller.start_warm_up()
+    
     def closeEvent(self, event: QCloseEvent):
         """Handle window close event."""
+        self.search_controller.shutdown()
         self._save_state()
         event.accept()
     
@@ -921,7 +967,7 @@ class MainWindow(QMainWindow):
             else:
                 # Export as JSON
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(export_data, f, indent=2, ensure_ascii=False)
+                    json.dump(export_data, f, indent=2, ensure_ascii=False, default=to_plain)
             
             self.status_bar.showMessage(f"Exported {self.current_state} data to {file_path}", 3000)
             
@@ -994,7 +1040,8 @@ class MainWindow(QMainWindow):
                     "char_rules": [r.to_dict() for r in results.char_rules_results]
                 }
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(export_data, f, indent=2, ensure_ascii=False, default=str)
+                    json.dump(export_data, f, indent=2, ensure_ascii=False,
+                              default=lambda value: to_plain(value) if isinstance(value, Mapping) else str(value))
             
             self.status_bar.showMessage(f"Exported search results to {file_path}", 3000)
             
@@ -1004,6 +1051,36 @@ class MainWindow(QMainWindow):
                 f"Failed to export search results:\n{str(e)}"
             )
     
+    def _on_export_data_coverage(self):
+        """Export counts of the plate data per state, search category and field."""
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Export Data Coverage",
+            "data_coverage.json",
+            "JSON Files (*.json);;CSV Files (*.csv);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        try:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                coverage = self.search_controller.export_data_coverage(file_path)
+            finally:
+                QApplication.restoreOverrideCursor()
+            
+            self.status_bar.showMessage(
+                f"Exported data coverage of {coverage['states']} states "
+                f"({coverage['plate_types']} plate types) to {file_path}", 3000
+            )
+            
+        except Exception as e:
+            QMessageBox.critical(
+                self, "Export Error",
+                f"Failed to export data coverage:\n{str(e)}"
+            )
+    
     def _on_settings(self):
         """Open settings dialog."""
         self.status_bar.showMessage("Settings - Not yet implemented", 3000)
@@ -1089,6 +1166,9 @@ class MainWindow(QMainWindow):
         # Re-layout state buttons with mode-based categories
         if hasattr(self, 'state_buttons') and self.state_buttons:
             self._layout_state_buttons()
+        
+        # Rank search matches from the mode's primary states first
+        self.search_controller.set_boost_states(self.mode_controller.get_primary_states())
     
     def _on_mode_selected(self, mode_name: str):
         """Handle mode selection from menu or dropdown."""
@@ -1281,10 +1361,9 @@ class MainWindow(QMainWindow):
     
     def _update_panels_with_state(self, state_code: str):
         """Update all content panels with state information."""
-        # Get state data
+        # Get state data (top-level fields only; the plate list is loaded below)
         state_info = self.state_data_manager.get_state_info_summary(state_code)
         char_rules = self.state_data_manager.get_character_rules(state_code)
-        plate_types = self.state_data_manager.get_plate_types(state_code)
         
         # Update State Info Panel
         self._display_state_info(state_info)
@@ -1292,17 +1371,28 @@ class MainWindow(QMainWindow):
         # Update Character Rules Panel
         self._display_char_rules(state_code, char_rules)
         
-        # Update Plate Type Panel
-        self._display_plate_types(state_code, plate_types)
-        
         # Update Image Panel
         self.image_panel.set_state(state_code)
         
-        # Update Plate Type Dropdown
-        self._update_plate_type_dropdown(plate_types)
-        
         # Update Font Preview with state character data
         self._update_font_preview(state_code, char_rules)
+        
+        # Plate lists can be long (991 types for MD): fill them in after the other panels paint
+        self.plate_type_header.setText(f"Plate Types - {state_code} (loading...)")
+        QTimer.singleShot(0, lambda: self._update_plate_type_panels(state_code))
+    
+    def _update_plate_type_panels(self, state_code: str):
+        """Fill the Plate Type panel and dropdown once the plate list is loaded."""
+        if state_code != self.current_state:
+            return  # another state was selected meanwhile
+        
+        plate_types = self.state_data_manager.get_plate_types(state_code)
+        
+        # Update Plate Type Panel
+        self._display_plate_types(state_code, plate_types)
+        
+        # Update Plate Type Dropdown
+        self._update_plate_type_dropdown(plate_types)
     
     def _display_state_info(self, info: dict):
         """Display state info in the State Info panel."""
@@ -1605,6 +1695,50 @@ class MainWindow(QMainWindow):
             else:
                 self.status_bar.showMessage(f"State '{state_code}' not found", 3000)
     
+    def _on_identify_plate(self):
+        """Ask for a plate as read and list the states and plate types it could be."""
+        from PySide6.QtWidgets import QInputDialog
+        
+        read, ok = QInputDialog.getText(
+            self, "Identify Plate",
+            "Enter the plate as read (e.g., ABC1234):",
+            text=""
+        )
+        
+        if not ok or not read.strip():
+            return
+        
+        state_filter = self.state_filter_combo.currentData()
+        self.status_bar.showMessage(f"Identifying '{read.strip()}'...")
+        self.search_controller.identify_plate(read, state_filter)
+    
+    def _on_identify_completed(self, results: CategorizedResults):
+        """Show the plate types a read plate could be."""
+        self.status_bar.showMessage("Ready")
+        if results.is_empty:
+            self.status_bar.showMessage(f"No plate types match '{results.query}'", 3000)
+            return
+        
+        if self.current_state in self.state_buttons:
+            self.state_buttons[self.current_state].set_selected(False)
+        self.current_state = None
+        self._on_search_completed(results)
+    
+    def _on_state_file_changed(self, state_code: str):
+        """Reload a state whose data file was edited (in the background)."""
+        self.search_controller.reload_state(state_code)
+    
+    def _on_state_reloaded(self, state_code: str, reloaded: bool):
+        """Refresh what shows a state once its edited data file was reloaded."""
+        if state_code == self.current_state:
+            self.font_preview.update_state(state_code)
+            self._update_panels_with_state(state_code)
+        elif self.is_search_mode:
+            # Re-run the search so results of the edited state are current
+            self._on_filter_changed()
+        
+        self.status_bar.showMessage(f"Reloaded {state_code} data from disk", 3000)
+    
     def _on_refresh_database(self):
         """Refresh database."""
         self.status_bar.showMessage("Refreshing database...", 2000)
@@ -1703,6 +1837,7 @@ class MainWindow(QMainWindow):
             self.current_state = None
         
         if not text.strip():
+            self.search_suggestions.setStringList([])
             self.search_controller.clear_search()
             return
         
@@ -1710,6 +1845,8 @@ class MainWindow(QMainWindow):
         state_filter = self.state_filter_combo.currentData()
         category = self.category_combo.currentData() or 'all'
         
+        self._update_search_suggestions()
+        
         # Trigger debounced search
         self.search_controller.search(text, category, state_filter)
     
@@ -1734,20 +1871,35 @@ class MainWindow(QMainWindow):
             category = self.category_combo.currentData() or 'all'
             self.search_controller.search(text, category, state_filter, immediate=True)
     
+    def _on_search_partial(self, results: CategorizedResults):
+        """Show the matches of the states searched so far."""
+        self.is_search_mode = True
+        self.search_result_label.setText(
+            f"Searching... {results.total_matches} results in {results.state_count} states so far"
+        )
+        self._update_panels_with_search_results(results)
+    
     def _on_search_completed(self, results: CategorizedResults):
         """Handle search results from controller."""
         self.is_search_mode = True
         self._last_search_results = results  # Store for export
         
         # Update result count label
-        self.search_result_label.setText(
-            f"Found {results.total_count} results in {results.state_count} states"
-        )
+        if results.is_truncated:
+            self.search_result_label.setText(
+                f"Found {results.total_matches} results - showing the top {results.total_count} "
+                f"in {results.state_count} states"
+            )
+        else:
+            self.search_result_label.setText(
+                f"Found {results.total_count} results in {results.state_count} states"
+            )
         
         # Update status bar
-        category_name = SearchController.CATEGORIES.get(results.category, results.category)
+        category_name = (SearchController.CATEGORIES.get(results.category)
+                         or SearchController.RESULT_CATEGORIES.get(results.category, results.category))
         self.status_bar.showMessage(
-            f"Search: '{results.query}' - {results.total_count} results | Category: {category_name}"
+            f"Search: '{results.query}' - {results.total_matches} results | Category: {category_name}"
         )
         
         # Update all panels with search results
@@ -1781,6 +1933,24 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage(f"Search error: {error_message}", 5000)
         self.search_result_label.setText(f"Error: {error_message}")
     
+    def _update_search_suggestions(self):
+        """Offer completions of the search text (again once they were rebuilt)."""
+        text = self.search_input.text()
+        if not text.strip():
+            return
+        category = self.category_combo.currentData() or 'all'
+        self.search_suggestions.setStringList(self.search_controller.get_suggestions(text, category))
+    
+    def _on_warm_up_progress(self, loaded: int, total: int, state_code: str):
+        """Show state data loading progress."""
+        if not self.is_search_mode:
+            self.status_bar.showMessage(f"Loading state data... {loaded}/{total} ({state_code})")
+    
+    def _on_warm_up_finished(self):
+        """State data is loaded and indexed."""
+        if not self.is_search_mode:
+            self.status_bar.showMessage("Ready")
+    
     def _update_panels_with_search_results(self, results: CategorizedResults):
         """Update all panels with categorized search results."""
         
@@ -5,9 +5,7 @@ Displays character samples using the appropriate font for each state's license p
 Shows visual distinction for letter O / number 0 usage.
 """
 
-import json
-from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QGridLayout, QLabel, QFrame, QScrollArea
@@ -15,6 +13,12 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont
 
+# Handle both relative and absolute imports for bundled exe compatibility
+try:
+    from ...gui.utils.state_repository import shared_state_repository
+except ImportError:
+    from gui.utils.state_repository import shared_state_repository
+
 
 class FontPreviewWidget(QWidget):
     """
@@ -76,12 +80,13 @@ class FontPreviewWidget(QWidget):
     COLOR_BG = "#3a3a3a"           # Cell background
     COLOR_PANEL_BG = "#2a2a2a"     # Panel background
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, data_dir: str = "data/states"):
         super().__init__(parent)
         
         self.current_state: Optional[str] = None
         self._character_labels: Dict[str, QLabel] = {}
-        self._state_data_cache: Dict[str, dict] = {}
+        # State files are shared with the search engine and the State Data Manager
+        self.repository = shared_state_repository(data_dir)
         
         self._setup_ui()
     
@@ -186,23 +191,10 @@ class FontPreviewWidget(QWidget):
         
         return ('Arial', 16, 'Bold')
     
-    def _load_state_data(self, state_code: str) -> Optional[dict]:
-        """Load state data from JSON file."""
-        if state_code in self._state_data_cache:
-            return self._state_data_cache[state_code]
-        
-        state_file = Path('data/states') / f'{state_code.lower()}.json'
-        if not state_file.exists():
-            return None
-        
-        try:
-            with open(state_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            self._state_data_cache[state_code] = data
-            return data
-        except Exception as e:
-            print(f"Error loading state data for {state_code}: {e}")
-            return None
+    def _load_state_data(self, state_code: str) -> Optional[Mapping[str, Any]]:
+        """Get state data from the shared repository (re-read when its file changes)."""
+        # Only top-level fields are used, so plate_types can stay unread
+        return self.repository.get(state_code, lazy=True)
     
     def _get_character_rules(self, state_data: dict) -> dict:
         """Extract character rules from state data."""
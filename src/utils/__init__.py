@@ -7,7 +7,11 @@ from .helpers import (
     get_ambiguous_character_pairs,
     generate_character_alternatives,
     expand_plate_with_alternatives,
+    iter_plate_alternatives,
     validate_plate_pattern,
+    compile_plate_pattern,
+    plate_shape,
+    PatternShapeIndex,
     score_plate_match,
     format_color_display,
     get_image_path,
@@ -24,7 +28,11 @@ __all__ = [
     'get_ambiguous_character_pairs',
     'generate_character_alternatives',
     'expand_plate_with_alternatives',
+    'iter_plate_alternatives',
     'validate_plate_pattern',
+    'compile_plate_pattern',
+    'plate_shape',
+    'PatternShapeIndex',
     'score_plate_match',
     'format_color_display',
     'get_image_path',
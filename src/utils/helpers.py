@@ -4,7 +4,9 @@ Utility functions for License Plate Information System
 
 import os
 import json
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 import re
 
 def normalize_plate_text(plate_text: Optional[str]) -> str:
@@ -69,44 +71,269 @@ def generate_character_alternatives(char: str, state_rules: Optional[Dict] = Non
             
             alternatives.append(alt)
     
-    return list(set(alternatives))  # Remove duplicates
+    return list(dict.fromkeys(alternatives))  # Remove duplicates, original first
 
-def expand_plate_with_alternatives(plate: str, state_rules: Optional[Dict] = None, max_combinations: int = 50) -> List[str]:
+def expand_plate_with_alternatives(plate: str, state_rules: Optional[Dict] = None,
+                                   max_combinations: Optional[int] = None,
+                                   patterns: Union['PatternShapeIndex', Iterable[str], None] = None) -> List[str]:
     """Expand plate text with character alternatives
     
     Args:
         plate: Input plate text
         state_rules: State-specific character rules
-        max_combinations: Maximum number of combinations to generate
+        max_combinations: Optional maximum number of variations (the most likely are kept)
+        patterns: Optional plate patterns (or a PatternShapeIndex) every variation must match
         
     Returns:
-        List of possible plate text variations
+        List of possible plate text variations, most likely first (see iter_plate_alternatives)
     """
     if not plate:
         return []
+    return list(islice(iter_plate_alternatives(plate, state_rules, patterns), max_combinations))
+
+def iter_plate_alternatives(plate: str, state_rules: Optional[Dict] = None,
+                            patterns: Union['PatternShapeIndex', Iterable[str], None] = None) -> Iterator[str]:
+    """Lazily generate the readings of a plate with ambiguous characters swapped
+    
+    Readings are generated most likely first: the read itself, then those
+    with one character swapped, then two, and so on. With patterns, a
+    reading is built position by position and dropped as soon as its
+    shape cannot start any pattern's shape, so only readings matching a
+    pattern are generated (and no work is spent on the others). State
+    rules are applied as they go: no letter O where allows_letter_o is
+    False (an O read there can only be a zero), and O is not swapped for
+    zero where uses_zero_for_o is False.
     
-    # Generate alternatives for each position
-    position_alternatives = []
-    for char in plate:
-        if char.isalnum():
-            alternatives = generate_character_alternatives(char, state_rules)
-            position_alternatives.append(alternatives)
+    Args:
+        plate: Input plate text (upper-cased)
+        state_rules: State-specific character rules
+        patterns: Optional plate patterns (or a PatternShapeIndex) readings must match
+        
+    Yields:
+        Plate text variations, each once
+    """
+    if not plate:
+        return
+    plate = plate.upper()
+    if patterns is None or isinstance(patterns, PatternShapeIndex):
+        index = patterns
+    else:
+        index = PatternShapeIndex(patterns)
+    shape_prefixes = index.shape_prefixes if index is not None else None
+    
+    options = [_reading_options(char, state_rules) for char in plate]
+    # Fewest and most swaps still possible from each position on
+    min_swaps = [0] * (len(plate) + 1)
+    max_swaps = [0] * (len(plate) + 1)
+    for position in range(len(plate) - 1, -1, -1):
+        char_options = options[position]
+        if not char_options:
+            return  # a character no reading can have
+        min_swaps[position] = min_swaps[position + 1] + (plate[position] not in char_options)
+        max_swaps[position] = max_swaps[position + 1] + (char_options != [plate[position]])
+    
+    def readings(position: int, reading: str, shape: str, swaps: int) -> Iterator[str]:
+        if position == len(plate):
+            if index is None or index.matching(reading):
+                yield reading
+            return
+        for option in options[position]:
+            remaining = swaps - (option != plate[position])
+            if not min_swaps[position + 1] <= remaining <= max_swaps[position + 1]:
+                continue
+            option_shape = shape + plate_shape(option)
+            if shape_prefixes is not None and option_shape not in shape_prefixes:
+                continue
+            yield from readings(position + 1, reading + option, option_shape, remaining)
+    
+    for swaps in range(min_swaps[0], max_swaps[0] + 1):
+        yield from readings(0, '', '', swaps)
+
+def _reading_options(char: str, state_rules: Optional[Dict]) -> List[str]:
+    """Characters a read character can stand for, itself first (empty if none is allowed)"""
+    if not char.isalnum():
+        return [char]
+    options = generate_character_alternatives(char, state_rules)
+    if state_rules and not state_rules.get('allows_letter_o', True):
+        options = [option for option in options if option != 'O']
+    return options
+
+# Known literal prefixes that should match exactly
+LITERAL_PREFIXES = {
+    'UG': 'University of Georgia',
+    'GT': 'Georgia Tech',
+    'CV': 'Classic Vehicle',
+    'DV': 'Disabled Veteran',
+}
+
+# Shape classes: a letter, a digit, or either (the X wildcard)
+SHAPE_LETTER = 'L'
+SHAPE_DIGIT = 'D'
+SHAPE_ANY = 'X'
+
+_SHAPE_CLASS_REGEX = {SHAPE_LETTER: '[A-Z]', SHAPE_DIGIT: '[0-9]', SHAPE_ANY: '[A-Z0-9]'}
+
+
+class CompiledPattern(NamedTuple):
+    """A plate pattern normalized once into a literal prefix, a shape and a regex
+
+    shape has one character per plate character after the prefix: L
+    (letter), D (digit), X (either) or the literal character itself (as
+    the A of T12A4). shapes are the plate shapes it can match, with
+    literal letters and digits as L and D; the regex checks the literals.
+    """
+    pattern: str                           # upper-cased and stripped
+    prefix: str                            # literal prefix (UG, DV..., or T of T1234)
+    shape: str                             # e.g. 'LLL-DDD' (the prefix is not included)
+    regex: Optional['re.Pattern[str]']     # None if no plate can match
+    shapes: FrozenSet[str]                 # plate_shape() of every plate the pattern can match
+
+    def matches(self, plate: str) -> bool:
+        """Whether an upper-cased, stripped ASCII plate matches"""
+        return self.regex is not None and self.regex.fullmatch(plate) is not None
+
+
+@lru_cache(maxsize=1024)
+def compile_plate_pattern(pattern: str) -> Optional[CompiledPattern]:
+    """Normalize a pattern with validate_plate_pattern()'s conventions into a CompiledPattern
+    
+    Args:
+        pattern: Pattern as stored in the state data (e.g. ABC-123, UGXXXX, T1234)
+        
+    Returns:
+        The compiled pattern, or None for a pattern only the character-by-character
+        check handles (empty, non-ASCII or containing whitespace)
+    """
+    if not pattern or not isinstance(pattern, str):
+        return None
+    normalized = pattern.upper().strip()
+    if not normalized.isascii() or any(char.isspace() for char in normalized):
+        return None
+    
+    # Literal prefixes, each followed by a pattern of its own (UG alone matches nothing)
+    prefix = ''
+    rest = normalized
+    while True:
+        literal = next((p for p in LITERAL_PREFIXES if rest.startswith(p)), None)
+        if literal is None:
+            break
+        prefix += literal
+        rest = rest[len(literal):]
+        if not rest:
+            return CompiledPattern(normalized, prefix, '', None, frozenset())
+    
+    # (shape class or None, literal character) per position after the prefix
+    tokens: List[Tuple[Optional[str], str]] = []
+    if len(rest) >= 2 and rest[0].isalpha() and rest[1].isdigit():
+        # Single-letter literal (T1234): digits are placeholders, anything else is literal
+        prefix += rest[0]
+        tokens = [(SHAPE_DIGIT, char) if char.isdigit() else (None, char) for char in rest[1:]]
+    else:
+        for char in rest:
+            if char == 'X':
+                tokens.append((SHAPE_ANY, char))
+            elif char == '-':
+                tokens.append((None, char))
+            elif char.isalpha():
+                tokens.append((SHAPE_LETTER, char))
+            elif char.isdigit():
+                tokens.append((SHAPE_DIGIT, char))
+            else:
+                tokens.append((None, char))
+    
+    shape = ''.join(shape_class or char for shape_class, char in tokens)
+    regex = re.compile(re.escape(prefix) + ''.join(
+        _SHAPE_CLASS_REGEX[shape_class] if shape_class else re.escape(char) for shape_class, char in tokens))
+    return CompiledPattern(normalized, prefix, shape, regex, _expand_shapes(plate_shape(prefix), tokens))
+
+
+def _expand_shapes(prefix_shape: str, tokens: List[Tuple[Optional[str], str]]) -> FrozenSet[str]:
+    """plate_shape() of every plate matching the tokens (each X is a letter or a digit)"""
+    shapes = [prefix_shape]
+    for shape_class, char in tokens:
+        if shape_class == SHAPE_ANY:
+            options = (SHAPE_LETTER, SHAPE_DIGIT)
         else:
-            position_alternatives.append([char])  # Keep non-alphanumeric as-is
-    
-    # Generate combinations (with limit to prevent explosion)
-    combinations = ['']
-    for alternatives in position_alternatives:
-        new_combinations = []
-        for combo in combinations:
-            for alt in alternatives:
-                new_combo = combo + alt
-                new_combinations.append(new_combo)
-                if len(new_combinations) >= max_combinations:
-                    return new_combinations[:max_combinations]
-        combinations = new_combinations
-    
-    return combinations
+            options = (shape_class or plate_shape(char),)
+        shapes = [shape + option for shape in shapes for option in options]
+    return frozenset(shapes)
+
+
+def plate_shape(plate: str) -> str:
+    """Reduce upper-cased plate text to its shape: L per letter, D per digit, other characters kept
+    
+    Args:
+        plate: Upper-cased ASCII plate text (e.g. ABC-123)
+        
+    Returns:
+        Shape string (e.g. LLL-DDD)
+    """
+    return plate.translate(_SHAPE_TABLE)
+
+
+_SHAPE_TABLE = str.maketrans({
+    **{chr(code): SHAPE_LETTER for code in range(ord('A'), ord('Z') + 1)},
+    **{chr(code): SHAPE_DIGIT for code in range(ord('0'), ord('9') + 1)},
+})
+
+
+class PatternShapeIndex:
+    """Finds the patterns a plate matches by a hash lookup on the plate's shape
+    
+    Each pattern is compiled once and indexed under every shape it can
+    match; a plate is reduced to its shape and only the patterns indexed
+    there are checked with their regex (for literal prefixes). Patterns
+    compile_plate_pattern() cannot compile are checked with
+    validate_plate_pattern().
+    """
+    
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        self._by_shape: Dict[str, List[Tuple[str, CompiledPattern]]] = {}
+        self._uncompiled: List[str] = []
+        for pattern in self.patterns:
+            compiled = compile_plate_pattern(pattern)
+            if compiled is None:
+                self._uncompiled.append(pattern)
+                continue
+            for shape in compiled.shapes:
+                self._by_shape.setdefault(shape, []).append((pattern, compiled))
+        self._shape_prefixes: Optional[FrozenSet[str]] = None
+    
+    @property
+    def shape_prefixes(self) -> Optional[FrozenSet[str]]:
+        """Every prefix of an indexed shape ('' included), or None if some pattern has no shape
+        
+        A partial plate whose shape is not in the set cannot be completed
+        into a plate matching any of the patterns.
+        """
+        if self._uncompiled:
+            return None
+        if self._shape_prefixes is None:
+            self._shape_prefixes = frozenset(shape[:length] for shape in self._by_shape
+                                             for length in range(len(shape) + 1))
+        return self._shape_prefixes
+    
+    def matching(self, plate: str) -> List[str]:
+        """Patterns the plate matches (as validate_plate_pattern() would decide), in index order
+        
+        Args:
+            plate: Plate text
+            
+        Returns:
+            Matching patterns, as given to the index
+        """
+        if not plate:
+            return []
+        normalized = plate.upper().strip()
+        if not normalized.isascii():
+            return [pattern for pattern in self.patterns if validate_plate_pattern(plate, pattern)]
+        
+        matched = {pattern for pattern, compiled in self._by_shape.get(plate_shape(normalized), ())
+                   if compiled.matches(normalized)}
+        matched.update(pattern for pattern in self._uncompiled if validate_plate_pattern(plate, pattern))
+        return [pattern for pattern in self.patterns if pattern in matched]
+
 
 def validate_plate_pattern(plate: str, pattern: str) -> bool:
     """Check if plate matches a given pattern
@@ -124,12 +351,26 @@ def validate_plate_pattern(plate: str, pattern: str) -> bool:
           * - = literal hyphen
         - Single letter + numbers: T1234, F1234 = literal letter + placeholder digits
         
+    Patterns are compiled once (compile_plate_pattern) and matched as a regex.
+        
     Returns:
         True if plate matches pattern
     """
     if not plate or not pattern:
         return False
     
+    compiled = compile_plate_pattern(pattern)
+    normalized = plate.upper().strip()
+    if compiled is None or not normalized.isascii():
+        return _validate_pattern_chars(plate, pattern)
+    return compiled.matches(normalized)
+
+
+def _validate_pattern_chars(plate: str, pattern: str) -> bool:
+    """validate_plate_pattern() character by character (for what the regex cannot express)"""
+    if not plate or not pattern:
+        return False
+    
     plate = plate.upper().strip()
     pattern = pattern.upper().strip()
     
@@ -137,22 +378,14 @@ def validate_plate_pattern(plate: str, pattern: str) -> bool:
     if len(plate) != len(pattern):
         return False
     
-    # Known literal prefixes that should match exactly
-    literal_prefixes = {
-        'UG': 'University of Georgia',
-        'GT': 'Georgia Tech', 
-        'CV': 'Classic Vehicle',
-        'DV': 'Disabled Veteran',
-    }
-    
     # Check for literal prefix patterns
-    for prefix in literal_prefixes:
+    for prefix in LITERAL_PREFIXES:
         if pattern.startswith(prefix):
             # This prefix must match exactly
             if not plate.startswith(prefix):
                 return False
             # Validate the rest of the pattern
-            return validate_plate_pattern(plate[len(prefix):], pattern[len(prefix):])
+            return _validate_pattern_chars(plate[len(prefix):], pattern[len(prefix):])
     
     # Check for single-letter literal patterns (T1234, F1234)
     if len(pattern) >= 2 and pattern[0].isalpha() and pattern[1].isdigit():
@@ -514,13 +514,15 @@ class LicensePlateImageManager:
         # to find images that correspond to specific plate types
         
         try:
-            state_file = self.project_root / 'data' / 'states' / f'{state_abbrev.lower()}.json'
-            if not state_file.exists():
+            # Read through the state repository shared with the rest of the application
+            try:
+                from ..gui.utils.state_repository import shared_state_repository
+            except ImportError:
+                from gui.utils.state_repository import shared_state_repository
+            state_data = shared_state_repository(str(self.project_root / 'data' / 'states')).get(state_abbrev.upper())
+            if not state_data:
                 return []
             
-            with open(state_file, 'r') as f:
-                state_data = json.load(f)
-            
             # Find the plate type
             matching_plate_type = None
             for plate_type in state_data.get('plate_types', []):
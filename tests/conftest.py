@@ -234,6 +234,49 @@ def sample_character_reference_dict():
     }
 
 
+@pytest.fixture
+def search_state_data():
+    """Provide a small state in the real data/states file layout"""
+    return {
+        'name': 'Florida',
+        'abbreviation': 'FL',
+        'slogan': 'Sunshine State',
+        'uses_zero_for_o': True,
+        'allows_letter_o': False,
+        'main_font': 'Highway Gothic',
+        'character_formatting': {'stacked_characters': None, 'slanted_characters': True},
+        'processing_metadata': {
+            'global_rules': {
+                'character_restrictions': 'No letter O',
+                'stacked_characters': {'include': ['DV', 'WW'], 'omit': [], 'notes': 'Stacked left'}
+            }
+        },
+        'plate_types': [
+            {
+                'type_name': 'Breast Cancer Awareness',
+                'pattern': 'ABC123',
+                'description': 'Pink ribbon specialty plate',
+                'category': 'specialty',
+                'code_number': '46',
+                'background_color': '#FFFFFF',
+                'vehicle_types': ['Car', 'Truck'],
+                'plate_characteristics': {
+                    'font': 'Gothic',
+                    'design_variants': ['Pink ribbon', 'Ribbon and heart'],
+                },
+                'processing_metadata': {'visual_identifier': 'Pink ribbon at left'}
+            },
+            {
+                'type_name': 'Passenger',
+                'pattern': 'ABC 123',
+                'description': 'Standard passenger plate',
+                'category': 'standard',
+                'code_number': '1',
+            }
+        ]
+    }
+
+
 # ============================================================================
 # MOCK FIXTURES
 # ============================================================================
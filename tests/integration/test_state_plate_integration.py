@@ -5,6 +5,7 @@ Tests bidirectional filtering and data loading
 
 import pytest
 import json
+from collections.abc import Mapping
 
 
 class TestStatePlateIntegration:
@@ -16,7 +17,7 @@ class TestStatePlateIntegration:
         state_data = mock_search_engine.load_state_data('CA')
         
         # Should have plate type information
-        assert isinstance(state_data, dict)
+        assert isinstance(state_data, Mapping)
         has_plate_info = 'plate_types' in state_data or 'plates' in state_data
         
         # State data structure should exist
@@ -75,7 +76,7 @@ class TestDataConsistency:
         state_data = mock_search_engine.load_state_data('FL')
         
         # Should have data structure
-        assert isinstance(state_data, dict)
+        assert isinstance(state_data, Mapping)
         
         # Count would be len of plate_types if exists
         if 'plates' in state_data:
@@ -95,7 +96,7 @@ class TestStatePlateNavigation:
         state_data = mock_search_engine.load_state_data(state_code)
         
         # Should be able to access plate types
-        assert isinstance(state_data, dict)
+        assert isinstance(state_data, Mapping)
     
     def test_navigate_from_plate_to_states(self, mock_search_engine):
         """Test navigating from plate type to states that have it"""
@@ -116,8 +117,8 @@ class TestStatePlateNavigation:
         tx_data = mock_search_engine.load_state_data('TX')
         
         # Both should be valid
-        assert isinstance(ca_data, dict)
-        assert isinstance(tx_data, dict)
+        assert isinstance(ca_data, Mapping)
+        assert isinstance(tx_data, Mapping)
 
 
 class TestFilteringLogic:
@@ -178,7 +179,7 @@ class TestDataRefresh:
         data2 = mock_search_engine.load_state_data('FL')
         
         # Should reload
-        assert isinstance(data2, dict)
+        assert isinstance(data2, Mapping)
     
     def test_refresh_plate_type_list(self, mock_search_engine):
         """Test refreshing plate type list"""
@@ -0,0 +1,56 @@
+"""
+Unit tests for category_plan.py
+Tests for compiled search category plans
+"""
+
+from src.gui.utils.category_plan import CategoryPlan
+from src.gui.utils.search_documents import SearchDocument
+
+
+def _document(field: str, keys=None, in_all: bool = True, always: bool = False,
+              top_level: bool = True) -> SearchDocument:
+    keys = (field,) if keys is None else keys
+    return SearchDocument('CA', 0, 'Passenger', field, field, field, keys, in_all, always, top_level, False)
+
+
+class TestCategoryPlan:
+    """Test cases for CategoryPlan"""
+
+    def test_selects_by_keys(self):
+        plan = CategoryPlan(['font', 'main_font'])
+        assert plan.selects(_document('plate_characteristics.font', keys=('font',)))
+        assert not plan.selects(_document('slogan'))
+
+    def test_always_documents_are_selected(self):
+        plan = CategoryPlan(['font'])
+        assert plan.selects(_document('character_formatting.stacked', keys=(), in_all=False, always=True))
+
+    def test_all_category(self):
+        plan = CategoryPlan(['all'])
+        assert plan.match_all
+        assert plan.selects(_document('slogan'))
+        assert not plan.selects(_document('colors', in_all=False))
+
+    def test_order_key(self):
+        plan = CategoryPlan(['type', 'category', 'type_name'])
+        assert plan.order_key(_document('type_name')) == 2
+        assert plan.order_key(_document('type_name', top_level=False)) == 0
+        assert CategoryPlan(['all']).order_key(_document('type_name')) == 0
+
+    def test_state_hits_are_kept_per_documents_list(self):
+        plan = CategoryPlan(['slogan'])
+        documents = [_document('name'), _document('slogan')]
+        hits = plan.state_hits('CA', documents)
+
+        assert hits == [(1, documents[1])]
+        assert plan.state_hits('CA', documents) is hits
+        # A reloaded state has a new documents list
+        reloaded = [_document('slogan')]
+        assert plan.state_hits('CA', reloaded) == [(0, reloaded[0])]
+
+    def test_forget_state(self):
+        plan = CategoryPlan(['slogan'])
+        documents = [_document('slogan')]
+        hits = plan.state_hits('CA', documents)
+        plan.forget_state('CA')
+        assert plan.state_hits('CA', documents) is not hits
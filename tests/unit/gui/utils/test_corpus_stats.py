@@ -0,0 +1,68 @@
+"""
+Unit tests for corpus_stats.py
+Tests for the per-state, per-field and per-category data counts
+"""
+
+from src.gui.utils.category_plan import CategoryPlan
+from src.gui.utils.corpus_stats import StateStats, combine_stats
+from src.gui.utils.search_documents import SearchDocument, STATE_RECORD
+
+
+def _document(state_code: str, record: int, field: str, keys=None, in_all: bool = True,
+              always: bool = False) -> SearchDocument:
+    keys = (field,) if keys is None else keys
+    return SearchDocument(state_code, record, 'Plate', field, field, field, keys, in_all, always, True, False)
+
+
+DOCUMENTS = [
+    _document('CA', STATE_RECORD, 'slogan'),
+    _document('CA', 0, 'type_name'),
+    _document('CA', 0, 'plate_characteristics.font', keys=('font',)),
+    _document('CA', 1, 'type_name'),
+    _document('CA', 1, 'character_formatting.stacked', keys=(), in_all=False, always=True),
+]
+
+CATEGORY_PLANS = {
+    'fonts': CategoryPlan(['font', 'main_font']),
+    'slogans': CategoryPlan(['slogan']),
+    'type': CategoryPlan(['type_name']),
+}
+
+
+class TestStateStats:
+    """Test cases for StateStats"""
+
+    def test_counts(self):
+        stats = StateStats('CA', DOCUMENTS)
+        assert stats.plate_types == 2
+        assert stats.documents == 5
+        assert stats.field_counts['type_name'] == 2
+
+    def test_category_records(self):
+        stats = StateStats('CA', DOCUMENTS)
+        assert stats.category_records(CATEGORY_PLANS['type']) == 2
+        assert stats.category_records(CATEGORY_PLANS['slogans']) == 1  # the state's own fields
+
+    def test_always_documents_do_not_count(self):
+        stats = StateStats('CA', DOCUMENTS)
+        assert stats.category_records(CATEGORY_PLANS['fonts']) == 1
+        assert stats.category_records(CategoryPlan(['design'])) == 0
+
+
+class TestCombineStats:
+    """Test cases for combine_stats()"""
+
+    def test_totals(self):
+        texas = [_document('TX', 0, 'type_name'), _document('TX', 0, 'slogan')]
+        combined = combine_stats([StateStats('CA', DOCUMENTS), StateStats('TX', texas)], CATEGORY_PLANS)
+        assert combined['states'] == 2
+        assert combined['plate_types'] == 3
+        assert combined['documents'] == 7
+        assert combined['categories'] == {'fonts': 1, 'slogans': 2, 'type': 3}
+        assert combined['fields']['type_name'] == 3
+        assert combined['by_state']['TX']['categories']['type'] == 1
+
+    def test_empty(self):
+        combined = combine_stats([], CATEGORY_PLANS)
+        assert combined['states'] == 0
+        assert combined['categories'] == {'fonts': 0, 'slogans': 0, 'type': 0}
@@ -0,0 +1,113 @@
+"""
+Unit tests for fts_index.py
+Tests for the SQLite FTS5 search index backend
+"""
+
+import pytest
+from src.gui.utils.fts_index import FTSSearchIndex, fts5_available
+from src.gui.utils.search_index import SearchIndex
+from src.gui.utils.json_search_engine import JSONSearchEngine
+
+pytestmark = pytest.mark.skipif(not fts5_available(), reason="SQLite built without FTS5 trigram tokenizer")
+
+
+@pytest.fixture
+def index(search_state_data):
+    """Provide an FTS index with one state loaded"""
+    search_index = FTSSearchIndex()
+    search_index.add_state('FL', search_state_data)
+    yield search_index
+    search_index.close()
+
+
+def _texts(index, doc_ids):
+    return [index.documents[doc_id].text for doc_id in doc_ids]
+
+
+class TestFTSSearchIndexLookup:
+    """Test cases for FTSSearchIndex.lookup()"""
+
+    QUERIES = ['cancer', 'ancer aw', 't cancer a', 'cancer passenger', '#ff', 'zebra', '46', 'c ', 'a',
+               'ribbon', '@#$', '"', '%', '_']
+
+    def test_matches_memory_index(self, index, search_state_data):
+        """Both backends find the same documents"""
+        memory_index = SearchIndex()
+        memory_index.add_state('FL', search_state_data)
+        for query in self.QUERIES:
+            assert _texts(index, index.lookup(query)) == _texts(memory_index, memory_index.lookup(query)), query
+
+    def test_wildcards_are_literal(self, index, search_state_data):
+        assert index.lookup('%') == []
+        assert index.lookup('a_c') == []
+        assert 'abc 123' in _texts(index, index.lookup('c 1'))
+
+    def test_empty_query(self, index):
+        assert index.lookup('') == []
+
+    def test_remove_state(self, index, search_state_data):
+        assert index.remove_state('FL')
+        assert index.lookup('ribbon') == []
+        assert index.document_count == 0
+        assert 'FL' not in index
+
+        index.add_state('FL', search_state_data)
+        assert len(index.lookup('ribbon')) == 4
+
+    def test_removed_texts_are_deleted(self, index, search_state_data):
+        """Removing the only state with a text deletes its row; slots are reused"""
+        count = len(index.documents)
+        rows = index._connection.execute("SELECT count(*) FROM search_text").fetchone()[0]
+        index.add_state('TX', search_state_data)
+        index.remove_state('FL')
+        assert len(index.lookup('ribbon')) == 4
+        
+        index.remove_state('TX')
+        assert index._connection.execute("SELECT count(*) FROM search_text").fetchone()[0] == 0
+        assert index.get_stats()['distinct_texts'] == 0
+        index.add_state('FL', search_state_data)
+        assert len(index.documents) == 2 * count
+        assert index._connection.execute("SELECT count(*) FROM search_text").fetchone()[0] == rows
+        assert len(index.lookup('ribbon')) == 4
+
+    def test_add_state_is_idempotent(self, index, search_state_data):
+        count = len(index.documents)
+        index.add_state('FL', search_state_data)
+        assert len(index.documents) == count
+
+    def test_stats(self, index):
+        stats = index.get_stats()
+        assert stats['backend'] == 'sqlite'
+        assert stats['states'] == 1
+        assert stats['documents'] == index.document_count
+
+
+class TestSQLiteBackend:
+    """The 'sqlite' backend must return exactly what the in-memory index returns"""
+
+    QUERIES = ['passenger', 'Plate', 'ribbon', 'gothic', 'letter o', 'dv', '46', '#fff', 'a',
+               '"pink ribbon" OR standard', 'type:passenger']
+
+    @pytest.mark.parametrize('category', ['all', 'type', 'fonts', 'handling_rules'])
+    def test_parity_with_memory_backend(self, sample_data_dir, search_state_data, category):
+        memory = JSONSearchEngine(str(sample_data_dir))
+        sqlite = JSONSearchEngine(str(sample_data_dir), search_backend='sqlite')
+        assert sqlite.search_backend == 'sqlite'
+        for engine in (memory, sqlite):
+            engine.incremental_search = False
+            engine._store_state_data('FL', search_state_data)
+
+        for query in self.QUERIES:
+            assert sqlite.search(query, category) == memory.search(query, category)
+            assert sqlite.search_ranked(query, category) == memory.search_ranked(query, category)
+
+    def test_search_many(self, sample_data_dir, search_state_data):
+        memory = JSONSearchEngine(str(sample_data_dir))
+        sqlite = JSONSearchEngine(str(sample_data_dir), search_backend='sqlite')
+        for engine in (memory, sqlite):
+            engine._store_state_data('FL', search_state_data)
+        assert sqlite.search_many(self.QUERIES) == memory.search_many(self.QUERIES)
+
+    def test_unknown_backend(self, sample_data_dir):
+        with pytest.raises(ValueError):
+            JSONSearchEngine(str(sample_data_dir), search_backend='elastic')
@@ -0,0 +1,78 @@
+"""
+Unit tests for fuzzy_matcher.py
+Tests for the typo-tolerant plate type name matcher
+"""
+
+import pytest
+from src.gui.utils.fuzzy_matcher import FuzzyMatcher, edit_distance, index_terms
+
+
+@pytest.fixture
+def matcher():
+    return FuzzyMatcher({
+        'Purple Heart': ['AZ', 'CO'],
+        'Ball State University': ['IN'],
+        'Breast Cancer Awareness': ['CA', 'FL'],
+        'Amateur Radio': ['CA', 'TX'],
+        'University of Florida': ['FL'],
+        'Passenger': ['CA', 'FL', 'TX'],
+    })
+
+
+class TestEditDistance:
+    """Test cases for edit_distance()"""
+
+    def test_identical(self):
+        assert edit_distance('heart', 'heart', 2) == 0
+
+    def test_substitution_and_deletion(self):
+        assert edit_distance('hart', 'heart', 2) == 1
+        assert edit_distance('cansr', 'cancer', 2) == 2
+
+    def test_transposition_counts_once(self):
+        assert edit_distance('raido', 'radio', 2) == 1
+
+    def test_capped_above_max(self):
+        assert edit_distance('purple', 'orange', 2) == 3
+
+
+class TestFuzzyMatcher:
+    """Test cases for FuzzyMatcher.search()"""
+
+    def test_index_terms_join_adjacent_words(self):
+        assert index_terms('Ball State') == ['ball', 'state', 'ballstate']
+
+    def test_misspelled_word(self, matcher):
+        matches = matcher.search('Purple Hart')
+        assert matches[0].name == 'Purple Heart'
+        assert matches[0].distance == 1
+        assert matches[0].states == ['AZ', 'CO']
+
+    def test_words_run_together(self, matcher):
+        matches = matcher.search('Allstate Universty')
+        assert [m.name for m in matches] == ['Ball State University']
+
+    def test_closer_match_ranks_first(self, matcher):
+        matches = matcher.search('pasenger')
+        assert [m.name for m in matches] == ['Passenger']
+        matches = matcher.search('universty of florda')
+        assert matches[0].name == 'University of Florida'
+        assert matches[0].distance == 2
+
+    def test_last_word_matches_prefix(self, matcher):
+        assert [m.name for m in matcher.search('breast canc')] == ['Breast Cancer Awareness']
+
+    def test_every_word_must_match(self, matcher):
+        assert matcher.search('purple radio') == []
+
+    def test_no_match(self, matcher):
+        assert matcher.search('xyzzy') == []
+        assert matcher.search('   ') == []
+
+    def test_state_filter(self, matcher):
+        matches = matcher.search('amatur radio', states=['TX'])
+        assert matches[0].states == ['TX']
+        assert matcher.search('purple heart', states=['TX']) == []
+
+    def test_limit(self, matcher):
+        assert len(matcher.search('university', limit=1)) == 1
@@ -5,8 +5,12 @@ Tests for JSONSearchEngine class
 
 import pytest
 import json
+import threading
+from collections.abc import Mapping
+from concurrent.futures import CancelledError
 from pathlib import Path
 from src.gui.utils.json_search_engine import JSONSearchEngine
+from src.gui.utils.state_repository import PARSED_SIZE_FACTOR
 
 
 # ============================================================================
@@ -47,7 +51,7 @@ class TestLoadStateData:
         """Test loading existing state data"""
         data = mock_search_engine.load_state_data('CA')
         assert data is not None
-        assert isinstance(data, dict)
+        assert isinstance(data, Mapping)
     
     def test_load_state_data_caching(self, mock_search_engine):
         """Test that loaded data is cached"""
@@ -145,6 +149,52 @@ class TestGetSuggestions:
         """Test suggestions with empty query"""
         suggestions = mock_search_engine.get_suggestions('')
         assert isinstance(suggestions, list)
+    
+    def test_suggestions_come_from_loaded_data(self, mock_search_engine):
+        """Test that field values of the loaded states are suggested"""
+        mock_search_engine.load_state_data('CA')
+        assert mock_search_engine.get_suggestions('pass') == ['Passenger']
+        assert mock_search_engine.get_suggestions('xyz') == []
+    
+    def test_suggestions_by_category(self, mock_search_engine):
+        """Test that only the category's fields are suggested"""
+        mock_search_engine.load_state_data('CA')
+        assert mock_search_engine.get_suggestions('pass', category='type') == ['Passenger']
+        assert mock_search_engine.get_suggestions('pass', category='fonts') == []
+    
+    def test_suggestions_most_frequent_first(self, sample_data_dir):
+        """Test that values found in more states are suggested first"""
+        from src.gui.utils.json_search_engine import JSONSearchEngine
+        for state_code, name in (('TX', 'texas'), ('NV', 'nevada')):
+            state_data = {
+                "state_info": {"name": name.title(), "abbreviation": state_code},
+                "plate_types": [{"type_name": "Veteran"}, {"type_name": f"Veterinary {state_code}"}],
+            }
+            (sample_data_dir / f"{name}.json").write_text(json.dumps(state_data))
+        engine = JSONSearchEngine(str(sample_data_dir))
+        engine.load_state_data('TX')
+        engine.load_state_data('NV')
+        
+        assert engine.get_suggestions('vet') == ['Veteran', 'Veterinary NV', 'Veterinary TX']
+        assert engine.get_suggestions('vet', limit=1) == ['Veteran']
+    
+    def test_suggestions_follow_data_changes(self, mock_search_engine):
+        """Test that the suggestions are rebuilt when more states are loaded"""
+        assert mock_search_engine.get_suggestions('pass') == []
+        mock_search_engine.load_state_data('CA')
+        assert mock_search_engine.get_suggestions('pass') == ['Passenger']
+    
+    def test_suggestions_without_waiting(self, mock_search_engine):
+        """Test that wait=False answers from the outdated trie while a new one is built"""
+        ready = threading.Event()
+        assert mock_search_engine.get_suggestions('pass', wait=False, ready_callback=ready.set) == []
+        assert ready.wait(10)
+        
+        mock_search_engine.load_state_data('CA')
+        ready.clear()
+        assert mock_search_engine.get_suggestions('pass', wait=False, ready_callback=ready.set) == []
+        assert ready.wait(10)
+        assert mock_search_engine.get_suggestions('pass', wait=False) == ['Passenger']
 
 
 # ============================================================================
@@ -163,6 +213,57 @@ class TestGetCategoryStats:
         """Test getting category stats with state filter"""
         stats = mock_search_engine.get_category_stats(state_filter='CA')
         assert isinstance(stats, dict)
+    
+    def test_category_stats_count_records(self, mock_search_engine):
+        """Test that categories count the plate types with a value in their fields"""
+        stats = mock_search_engine.get_category_stats(state_filter='CA')
+        assert stats['type'] == 2  # type_name and category of both plate types
+        assert stats['design'] == 2  # pattern
+        assert stats['fonts'] == 0
+        assert set(stats) == set(mock_search_engine.field_mappings)
+    
+    def test_category_stats_cover_all_states(self, mock_search_engine):
+        """Test that the stats cover every state file, not only loaded states"""
+        stats = mock_search_engine.get_corpus_stats()
+        assert stats['states'] == 1
+        assert stats['plate_types'] == 2
+        assert list(stats['by_state']) == ['CA']
+        assert stats['fields']['type_name'] == 2
+        assert 'FL' in stats['missing_states']
+    
+    def test_corpus_stats_kept_after_eviction(self, mock_search_engine):
+        """Test that counted states are not reloaded while their file is unchanged"""
+        mock_search_engine.get_corpus_stats()
+        mock_search_engine._on_state_evicted('CA', {})
+        mock_search_engine.loaded_data.invalidate('CA')
+        
+        stats = mock_search_engine.get_corpus_stats(state_filter='CA')
+        assert stats['plate_types'] == 2
+        assert 'CA' not in mock_search_engine.loaded_data
+    
+    def test_corpus_stats_follow_file_changes(self, mock_search_engine, sample_data_dir):
+        """Test that a changed state file is counted again"""
+        assert mock_search_engine.get_corpus_stats('CA')['plate_types'] == 2
+        
+        data_file = sample_data_dir / "california.json"
+        data = json.loads(data_file.read_text())
+        data['plate_types'].append({'type_name': 'Amateur Radio', 'pattern': 'ABC123'})
+        data_file.write_text(json.dumps(data))
+        
+        assert mock_search_engine.get_corpus_stats('CA')['plate_types'] == 3
+    
+    def test_export_corpus_stats(self, mock_search_engine, tmp_path):
+        """Test exporting the stats as JSON and CSV"""
+        json_file = tmp_path / "coverage.json"
+        mock_search_engine.export_corpus_stats(str(json_file))
+        assert json.loads(json_file.read_text())['by_state']['CA']['plate_types'] == 2
+        
+        csv_file = tmp_path / "coverage.csv"
+        mock_search_engine.export_corpus_stats(str(csv_file))
+        rows = csv_file.read_text().splitlines()
+        assert rows[0].startswith('state,plate_types,documents,')
+        assert rows[1].startswith('CA,2,')
+        assert rows[-1].startswith('TOTAL,2,')
 
 
 # ============================================================================
@@ -305,7 +406,7 @@ class TestErrorHandling:
         
         # Should return sample data, not crash
         assert data is not None
-        assert isinstance(data, dict)
+        assert isinstance(data, Mapping)
     
     def test_search_special_characters_handling(self, mock_search_engine):
         """Test search handles special characters without crashing"""
@@ -339,3 +440,573 @@ class TestStateDetails:
         assert isinstance(state_data, dict)
         # Should have some identifying information
         assert len(state_data) > 0
+
+
+class TestIncrementalSearch:
+    """Test type-ahead refinement of the previous result set"""
+    
+    def test_extended_query_matches_full_search(self, mock_search_engine):
+        """Refined results equal a fresh search for the extended query"""
+        for query in ['pa', 'pas', 'pass', 'passenger']:
+            mock_search_engine.search(query)
+        refined = mock_search_engine.search('passenger p')
+        
+        fresh_engine = JSONSearchEngine(mock_search_engine.data_directory)
+        fresh_engine.incremental_search = False
+        assert refined == fresh_engine.search('passenger p')
+    
+    def test_extended_query_skips_index_lookup(self, mock_search_engine, monkeypatch):
+        """An extended query filters the previous matches without an index lookup"""
+        mock_search_engine.search('comm')
+        
+        def fail_lookup(query_lower):
+            raise AssertionError("index lookup should not run for an extended query")
+        monkeypatch.setattr(mock_search_engine.index, 'lookup', fail_lookup)
+        
+        results = mock_search_engine.search('commercial')
+        assert any(r.get('plate_type') == 'Commercial' for r in results)
+    
+    def test_streamed_search_refines_previous_matches(self, mock_search_engine, monkeypatch):
+        """search_iter refines an extended query through the same shared lookup"""
+        for state_code in mock_search_engine.get_all_state_codes():
+            mock_search_engine.load_state_data(state_code)
+        list(mock_search_engine.search_iter('comm'))
+        
+        def fail_lookup(query_lower):
+            raise AssertionError("index lookup should not run for an extended query")
+        monkeypatch.setattr(mock_search_engine.index, 'lookup', fail_lookup)
+        
+        results = [r for batch in mock_search_engine.search_iter('commercial') for r in batch.results]
+        assert any(r.get('plate_type') == 'Commercial' for r in results)
+    
+    def test_changed_filter_does_full_lookup(self, mock_search_engine):
+        """A different state filter or category is not refined from the previous query"""
+        mock_search_engine.search('comm', state_filter='TX')
+        results = mock_search_engine.search('commercial', state_filter='CA')
+        assert any(r['state'] == 'CA' for r in results)
+    
+    def test_clear_cache_resets_type_ahead(self, mock_search_engine):
+        """Clearing the cache drops the previous match set"""
+        mock_search_engine.search('comm')
+        mock_search_engine.clear_cache()
+        assert mock_search_engine._type_ahead is None
+
+
+class TestCacheLimitsAndInvalidation:
+    """Test bounded caches and file-change invalidation"""
+    
+    def test_cache_stats(self, mock_search_engine):
+        """Cache statistics are exposed for tuning"""
+        mock_search_engine.search('Passenger', state_filter='CA')
+        mock_search_engine.search('Passenger', state_filter='CA')
+        stats = mock_search_engine.get_cache_stats()
+        
+        assert stats['search_cache']['hits'] == 1
+        assert stats['search_cache']['entries'] == 1
+        assert stats['state_cache']['entries'] >= 1
+        assert stats['index']['states'] >= 1
+    
+    def test_search_cache_budget(self, sample_data_dir):
+        """Search results are evicted once the budget is exceeded"""
+        engine = JSONSearchEngine(str(sample_data_dir), search_cache_bytes=1)
+        engine.search('Passenger', state_filter='CA')
+        engine.search('Commercial', state_filter='CA')
+        
+        assert len(engine.search_cache) == 1
+        assert engine.search_cache.evictions == 1
+    
+    def test_state_cache_charged_file_size(self, sample_data_dir):
+        """Loaded states are sized from their file, sample data from its JSON text"""
+        engine = JSONSearchEngine(str(sample_data_dir))
+        engine.load_state_data('CA')
+        ca_size = (sample_data_dir / 'california.json').stat().st_size
+        assert engine.loaded_data.current_bytes == ca_size * PARSED_SIZE_FACTOR
+        
+        sample_data = {'name': 'Sample', 'plate_types': [{'type_name': 'Passenger' * 100}]}
+        engine._store_state_data('SM', sample_data)
+        assert engine.loaded_data.current_bytes == \
+            (ca_size + len(json.dumps(sample_data))) * PARSED_SIZE_FACTOR
+    
+    def test_state_eviction_removes_index_entries(self, sample_data_dir):
+        """Evicted states are dropped from the search index too"""
+        engine = JSONSearchEngine(str(sample_data_dir), state_cache_bytes=1)
+        engine.load_state_data('CA')
+        engine.load_state_data('TX')
+        
+        assert 'CA' not in engine.loaded_data
+        assert 'CA' not in engine.index
+        assert 'TX' in engine.index
+    
+    def test_changed_file_is_reloaded(self, sample_data_dir):
+        """Editing a state file invalidates that state's data and results"""
+        engine = JSONSearchEngine(str(sample_data_dir))
+        assert engine.search('Amateur Radio', state_filter='CA') == []
+        engine.search('Passenger', state_filter='TX')
+        
+        ca_file = sample_data_dir / 'california.json'
+        data = json.loads(ca_file.read_text(encoding='utf-8'))
+        data['plate_types'].append({'type_name': 'Amateur Radio', 'pattern': 'ABC123'})
+        ca_file.write_text(json.dumps(data) + '\n', encoding='utf-8')
+        
+        assert engine.check_for_changes() == ['CA']
+        assert 'Passenger_all_TX' in engine.search_cache
+        results = engine.search('Amateur Radio', state_filter='CA')
+        assert [r['plate_type'] for r in results] == ['Amateur Radio']
+    
+    def test_reload_state_updates_only_that_state(self, sample_data_dir):
+        """Reloading a changed state re-reads it and keeps the other states' results"""
+        engine = JSONSearchEngine(str(sample_data_dir))
+        engine.search('Passenger', state_filter='TX')
+        assert engine.search('Amateur Radio', state_filter='CA') == []
+        tx_documents = engine.state_documents['TX']
+        
+        ca_file = sample_data_dir / 'california.json'
+        data = json.loads(ca_file.read_text(encoding='utf-8'))
+        data['plate_types'].append({'type_name': 'Amateur Radio', 'pattern': 'ABC123'})
+        ca_file.write_text(json.dumps(data) + '\n', encoding='utf-8')
+        
+        assert engine.reload_state('CA')
+        assert 'CA' in engine.loaded_data  # re-read now, not on the next search
+        assert any(d.value == 'Amateur Radio' for d in engine.state_documents['CA'])
+        assert engine.state_documents['TX'] is tx_documents
+        assert 'Passenger_all_TX' in engine.search_cache
+        results = engine.search('Amateur Radio', state_filter='CA')
+        assert [r['plate_type'] for r in results] == ['Amateur Radio']
+    
+    def test_reload_state_not_loaded(self, mock_search_engine):
+        """A state that was never loaded is left to be read when searched"""
+        assert not mock_search_engine.reload_state('CA')
+        assert 'CA' not in mock_search_engine.loaded_data
+    
+    def test_unchanged_files_not_invalidated(self, mock_search_engine):
+        """No state is invalidated when nothing changed on disk"""
+        mock_search_engine.load_state_data('CA')
+        assert mock_search_engine.check_for_changes() == []
+        assert 'CA' in mock_search_engine.loaded_data
+
+
+class TestStateDocuments:
+    """Test the flattened documents built when a state is loaded"""
+    
+    def test_documents_built_on_load(self, mock_search_engine):
+        """Loading a state builds its flat document list once"""
+        mock_search_engine.load_state_data('CA')
+        documents = mock_search_engine.state_documents['CA']
+        
+        assert any(d.field == 'type_name' and d.value == 'Passenger' for d in documents)
+        mock_search_engine.load_state_data('CA')
+        assert mock_search_engine.state_documents['CA'] is documents
+    
+    def test_scan_path_uses_documents(self, sample_data_dir):
+        """The non-index search path matches the indexed one"""
+        indexed = JSONSearchEngine(str(sample_data_dir))
+        scanned = JSONSearchEngine(str(sample_data_dir), use_index=False)
+        
+        for query in ['passenger', 'plate', 'sample', 'arial']:
+            assert indexed.search(query) == scanned.search(query)
+    
+    def test_invalidation_drops_documents(self, mock_search_engine):
+        """Invalidating a state drops its documents"""
+        mock_search_engine.load_state_data('CA')
+        mock_search_engine.invalidate_state('CA')
+        assert 'CA' not in mock_search_engine.state_documents
+
+
+class TestWarmUp:
+    """Test background loading and indexing of states"""
+    
+    def test_warm_up_loads_states(self, sample_data_dir):
+        """Warm-up loads and indexes the requested states"""
+        engine = JSONSearchEngine(str(sample_data_dir))
+        futures = engine.warm_up(['CA', 'TX'])
+        for future in futures:
+            future.result(timeout=10)
+        
+        assert 'CA' in engine.index
+        assert 'TX' in engine.index
+        assert not engine.is_warming_up
+    
+    def test_warm_up_reports_progress(self, sample_data_dir):
+        """The progress callback is called once per state"""
+        engine = JSONSearchEngine(str(sample_data_dir))
+        progress = []
+        futures = engine.warm_up(['CA', 'TX'], progress_callback=lambda *args: progress.append(args))
+        for future in futures:
+            future.result(timeout=10)
+        
+        assert sorted(loaded for loaded, total, _ in progress) == [1, 2]
+        assert {code for _, _, code in progress} == {'CA', 'TX'}
+        assert all(total == 2 for _, total, _ in progress)
+    
+    def test_warm_up_finished_after_cancel(self, sample_data_dir):
+        """The finished callback is called once even when loads are cancelled"""
+        engine = JSONSearchEngine(str(sample_data_dir))
+        started, release = threading.Event(), threading.Event()
+        original = engine._warm_up_state
+        
+        def blocking_warm_up(state_code):
+            started.set()
+            release.wait(10)
+            original(state_code)
+        
+        engine._warm_up_state = blocking_warm_up
+        finished = []
+        progress = []
+        futures = engine.warm_up(['CA', 'TX'], max_workers=1,
+                                 progress_callback=lambda *args: progress.append(args),
+                                 finished_callback=lambda: finished.append(True))
+        assert started.wait(10)
+        engine.cancel_warm_up()
+        release.set()
+        for future in futures:
+            try:
+                future.result(timeout=10)
+            except CancelledError:
+                pass
+        
+        assert finished == [True]
+        assert len(progress) == 1
+        assert not engine.is_warming_up
+    
+    def test_warm_up_skips_loaded_states(self, mock_search_engine):
+        """States that are already loaded are not loaded again"""
+        mock_search_engine.load_state_data('CA')
+        assert mock_search_engine.warm_up(['CA']) == []
+    
+    def test_search_during_warm_up(self, sample_data_dir):
+        """A search issued during warm-up matches one after it"""
+        engine = JSONSearchEngine(str(sample_data_dir))
+        expected = JSONSearchEngine(str(sample_data_dir)).search('Passenger', state_filter='CA')
+        futures = engine.warm_up(['CA', 'TX'], max_workers=1)
+        
+        assert engine.search('Passenger', state_filter='CA') == expected
+        for future in futures:
+            future.result(timeout=10)
+
+
+class TestFuzzySearch:
+    """Test the typo-tolerant plate type search mode"""
+    
+    def test_fuzzy_search_from_state_files(self, mock_search_engine):
+        """Without a mapping file the vocabulary comes from the state files"""
+        results = mock_search_engine.search('Pasenger', category='fuzzy')
+        
+        assert results
+        assert {r['plate_type'] for r in results} == {'Passenger'}
+        assert all(r['match_type'] == 'plate_type' and r['distance'] == 1 for r in results)
+    
+    def test_fuzzy_search_from_mapping_file(self, sample_data_dir):
+        """The plate type mapping file next to the states directory is used when present"""
+        mapping = {
+            'plate_type_to_states': {'Purple Heart': ['AZ', 'CO']},
+            'state_to_plate_types': {'AZ': {'name': 'Arizona'}, 'CO': {'name': 'Colorado'}}
+        }
+        (sample_data_dir.parent / 'state_plate_type_mapping.json').write_text(json.dumps(mapping))
+        engine = JSONSearchEngine(str(sample_data_dir))
+        
+        results = engine.search('Purple Hart', category='fuzzy')
+        assert [(r['state'], r['state_name']) for r in results] == [('AZ', 'Arizona'), ('CO', 'Colorado')]
+        assert engine.search('Purple Hart', category='fuzzy', state_filter='CO')[0]['state'] == 'CO'
+
+
+class TestCategoryPlans:
+    """Test compiled per-category field plans"""
+    
+    def test_add_search_category_recompiles(self, mock_search_engine):
+        """A replaced category is searched with its new fields"""
+        assert mock_search_engine.search('passenger', category='custom') == []
+        mock_search_engine.add_search_category('custom', ['type_name'])
+        
+        results = mock_search_engine.search('passenger', category='custom')
+        assert [r['field'] for r in results] == ['type_name']
+    
+    def test_narrow_category_matches_index_lookup(self, sample_data_dir, monkeypatch):
+        """Scanning a narrow category's documents gives the index lookup's results"""
+        import src.gui.utils.json_search_engine as engine_module
+        scanned = JSONSearchEngine(str(sample_data_dir)).search('a', category='type', state_filter='CA')
+        monkeypatch.setattr(engine_module, 'CATEGORY_SCAN_RATIO', 0)
+        looked_up = JSONSearchEngine(str(sample_data_dir)).search('a', category='type', state_filter='CA')
+        assert scanned == looked_up and scanned
+    
+    def test_reloaded_state_is_rescanned(self, sample_data_dir):
+        engine = JSONSearchEngine(str(sample_data_dir), use_index=False)
+        assert engine.search('commercial', category='type', state_filter='CA')
+        
+        ca_file = sample_data_dir / 'california.json'
+        data = json.loads(ca_file.read_text(encoding='utf-8'))
+        data['plate_types'] = data['plate_types'][:1]
+        ca_file.write_text(json.dumps(data), encoding='utf-8')
+        engine.check_for_changes()
+        engine.clear_cache()
+        
+        assert engine.search('commercial', category='type', state_filter='CA') == []
+
+
+class TestSearchIter:
+    """Test streaming search results state by state"""
+    
+    @pytest.fixture
+    def veteran_data_dir(self, sample_data_dir):
+        plate_types = {'plate_types': [{'type_name': 'Veteran', 'category': 'military'}]}
+        for filename in ('florida.json', 'texas.json', 'new_york.json'):
+            (sample_data_dir / filename).write_text(json.dumps(plate_types), encoding='utf-8')
+        return sample_data_dir
+    
+    def test_batches_match_search(self, mock_search_engine):
+        """Each state's batch holds that state's search() results"""
+        batches = list(mock_search_engine.search_iter('plate'))
+        results = mock_search_engine.search('plate')
+        
+        assert [batch.state_code for batch in batches] == ['CA']
+        assert batches[0].results == [r for r in results if r['state'] == 'CA']
+    
+    def test_priority_order(self, veteran_data_dir):
+        """Florida comes first, then the priority states, then the rest"""
+        engine = JSONSearchEngine(str(veteran_data_dir))
+        batches = list(engine.search_iter('veteran', priority_states=['NY']))
+        
+        assert [batch.state_code for batch in batches] == ['FL', 'NY', 'TX']
+        assert [batch.searched for batch in batches[:2]] == [1, 2]
+        assert all(batch.total == len(engine.get_all_state_codes()) for batch in batches)
+    
+    def test_cancelled_search_stops(self, veteran_data_dir):
+        """Setting the cancellation event ends the search before the next state, uncached"""
+        import threading
+        engine = JSONSearchEngine(str(veteran_data_dir))
+        cancelled = threading.Event()
+        stream = engine.search_iter('veteran', cancelled=cancelled)
+        
+        assert next(stream).state_code == 'FL'
+        cancelled.set()
+        assert list(stream) == []
+        assert 'veteran_all_None' not in engine.search_cache
+        assert 'TX' not in engine.loaded_data
+    
+    def test_completed_search_is_cached(self, veteran_data_dir):
+        """A fully iterated search is cached in search() order"""
+        engine = JSONSearchEngine(str(veteran_data_dir))
+        list(engine.search_iter('veteran', priority_states=['NY']))
+        
+        assert engine.search_cache.get('veteran_all_None') == JSONSearchEngine(str(veteran_data_dir)).search('veteran')
+        # ... and streamed again from the cache in priority order
+        assert [batch.state_code for batch in engine.search_iter('veteran', priority_states=['TX'])] == ['FL', 'TX', 'NY']
+    
+    def test_abandoned_search_is_not_cached(self, veteran_data_dir):
+        """Stopping early loads no further states and caches nothing"""
+        engine = JSONSearchEngine(str(veteran_data_dir))
+        stream = engine.search_iter('veteran')
+        assert next(stream).state_code == 'FL'
+        stream.close()
+        
+        assert engine.search_cache.get('veteran_all_None') is None
+        assert 'TX' not in engine.loaded_data
+    
+    def test_scan_path_matches_index(self, veteran_data_dir):
+        """Batches are the same without the index"""
+        indexed = list(JSONSearchEngine(str(veteran_data_dir)).search_iter('veteran'))
+        scanned = list(JSONSearchEngine(str(veteran_data_dir), use_index=False).search_iter('veteran'))
+        assert indexed == scanned
+    
+    def test_rank_streamed_documents(self, veteran_data_dir):
+        """Ranking the batches' documents gives search_ranked()'s results"""
+        engine = JSONSearchEngine(str(veteran_data_dir))
+        for query in ('veteran', 'military', 'type:veteran -state:TX'):
+            documents = [document for batch in engine.search_iter(query, priority_states=['TX'])
+                         for document in batch.documents]
+            ranked = engine.rank_documents(query, documents, limit=2, boost_states=['TX'])
+            assert ranked.total_count == len(engine.search(query))
+            engine.search_cache.clear()
+            assert engine.search_ranked(query, limit=2, boost_states=['TX']) == ranked
+    
+    def test_loaded_states_looked_up_once(self, veteran_data_dir):
+        """States indexed before the search share one index lookup"""
+        engine = JSONSearchEngine(str(veteran_data_dir))
+        for state_code in engine.get_all_state_codes():
+            engine.load_state_data(state_code)
+        expected = engine.search('veteran')
+        engine.clear_cache()
+        lookups = []
+        lookup = engine.index.lookup
+        engine.index.lookup = lambda query_lower: lookups.append(query_lower) or lookup(query_lower)
+        
+        batches = list(engine.search_iter('veteran'))
+        assert lookups == ['veteran']
+        assert sorted(map(repr, (r for batch in batches for r in batch.results))) == sorted(map(repr, expected))
+    
+    def test_state_filter(self, veteran_data_dir):
+        engine = JSONSearchEngine(str(veteran_data_dir))
+        batches = list(engine.search_iter('veteran', state_filter='TX'))
+        assert [(batch.state_code, batch.searched, batch.total) for batch in batches] == [('TX', 1, 1)]
+    
+    def test_empty_query(self, mock_search_engine):
+        assert list(mock_search_engine.search_iter('  ')) == []
+
+
+class TestSearchMany:
+    """Test searching a batch of queries at once"""
+    
+    QUERIES = ['plate', 'Passenger', 'passenger', 'a', '46', 'zebra', 'type:commercial', 'plate -passenger']
+    
+    @pytest.mark.parametrize('category', ['all', 'type', 'fonts', 'fuzzy'])
+    def test_matches_search(self, sample_data_dir, category):
+        """Each query gets exactly its search() results"""
+        results = JSONSearchEngine(str(sample_data_dir)).search_many(self.QUERIES, category=category)
+        engine = JSONSearchEngine(str(sample_data_dir))
+        
+        assert list(results) == self.QUERIES
+        for query in self.QUERIES:
+            assert results[query] == engine.search(query, category=category), query
+    
+    def test_state_filter(self, mock_search_engine):
+        results = mock_search_engine.search_many(['plate'], state_filter='CA')
+        assert results['plate'] == mock_search_engine.search('plate', state_filter='CA')
+        assert mock_search_engine.search_many(['plate'], state_filter='TX') == {'plate': []}
+    
+    def test_results_are_cached(self, mock_search_engine, monkeypatch):
+        """Batch results are cached for search(), and cached queries are not looked up again"""
+        mock_search_engine.search_many(['plate'])
+        assert 'plate_all_None' in mock_search_engine.search_cache
+        
+        monkeypatch.setattr(mock_search_engine.index, 'lookup_many',
+                            lambda queries: pytest.fail("cached query looked up"))
+        assert mock_search_engine.search_many(['plate'])['plate'] == mock_search_engine.search('plate')
+    
+    def test_scan_path_matches_index(self, sample_data_dir):
+        indexed = JSONSearchEngine(str(sample_data_dir)).search_many(self.QUERIES)
+        scanned = JSONSearchEngine(str(sample_data_dir), use_index=False).search_many(self.QUERIES)
+        assert indexed == scanned
+    
+    def test_empty_queries(self, mock_search_engine):
+        assert mock_search_engine.search_many(['', '  ']) == {'': [], '  ': []}
+        assert mock_search_engine.search_many([]) == {}
+
+
+class TestQuerySyntax:
+    """Test field-scoped boolean queries"""
+    
+    @pytest.fixture
+    def plates_data_dir(self, sample_data_dir):
+        florida = {'name': 'Florida', 'plate_types': [
+            {'type_name': 'Florida State University', 'category': 'university', 'code_number': '46'},
+            {'type_name': 'Purple Heart', 'category': 'military', 'code_number': '12'},
+        ]}
+        texas = {'name': 'Texas', 'plate_types': [
+            {'type_name': 'Texas State University', 'category': 'university', 'code_number': '46'},
+        ]}
+        (sample_data_dir / 'florida.json').write_text(json.dumps(florida), encoding='utf-8')
+        (sample_data_dir / 'texas.json').write_text(json.dumps(texas), encoding='utf-8')
+        return sample_data_dir
+    
+    def test_scoped_terms(self, plates_data_dir):
+        """Scoped terms must all match the same plate type"""
+        engine = JSONSearchEngine(str(plates_data_dir))
+        results = engine.search('category:university code:46 state:FL')
+        
+        assert {(r['state'], r['plate_type'], r['field']) for r in results} == {
+            ('FL', 'Florida State University', 'category'),
+            ('FL', 'Florida State University', 'code_number'),
+        }
+    
+    def test_state_scope_skips_other_states(self, plates_data_dir):
+        engine = JSONSearchEngine(str(plates_data_dir))
+        engine.search('state:texas university')
+        assert 'TX' in engine.loaded_data
+        assert 'FL' not in engine.loaded_data and 'CA' not in engine.loaded_data
+    
+    def test_state_code_scope_is_exact(self, plates_data_dir):
+        """A state code names only its state, not every state with it in its name"""
+        for filename, name in (('indiana', 'Indiana'), ('illinois', 'Illinois'), ('virginia', 'Virginia'),
+                               ('california', 'California'), ('north_carolina', 'North Carolina'),
+                               ('american_samoa', 'American Samoa')):
+            state = {'name': name, 'plate_types': [{'type_name': 'Passenger'}]}
+            (plates_data_dir / f'{filename}.json').write_text(json.dumps(state), encoding='utf-8')
+        engine = JSONSearchEngine(str(plates_data_dir))
+        
+        assert {r['state'] for r in engine.search('state:IN passenger')} == {'IN'}
+        assert {r['state'] for r in engine.search('state:CA passenger')} == {'CA'}
+        assert {r['state'] for r in engine.search('state:"north carolina" passenger')} == {'NC'}
+        assert {r['state'] for r in engine.search('state:north passenger')} == {'NC'}
+        assert engine.search('state:carolina passenger') == []
+    
+    def test_or_not_and_phrases(self, plates_data_dir):
+        engine = JSONSearchEngine(str(plates_data_dir))
+        results = engine.search('"purple heart" OR university NOT state:FL')
+        assert {(r['state'], r['value']) for r in results} == {
+            ('FL', 'Purple Heart'), ('TX', 'Texas State University'), ('TX', 'university')}
+    
+    def test_plain_text_unchanged(self, plates_data_dir):
+        """Text without query syntax is still one substring search"""
+        engine = JSONSearchEngine(str(plates_data_dir))
+        assert [r['value'] for r in engine.search('state university')] == [
+            'Florida State University', 'Texas State University']
+    
+    def test_query_still_being_typed(self, plates_data_dir):
+        """A trailing operator is ignored; a lone operator or leading '-' is plain text"""
+        georgia = {'name': 'Georgia', 'plate_types': [{'type_name': 'Notary', 'code_number': 'N-1'}]}
+        (plates_data_dir / 'georgia.json').write_text(json.dumps(georgia), encoding='utf-8')
+        engine = JSONSearchEngine(str(plates_data_dir))
+        assert engine.search('university NOT') == engine.search('university')
+        assert engine.search('university OR') == engine.search('university')
+        assert [r['value'] for r in engine.search('NOT')] == ['Notary']
+        assert [r['value'] for r in engine.search('-1')] == ['N-1']
+        assert [r['value'] for r in engine.search('46 -state:FL')] == ['46']
+    
+    def test_scan_path_matches_index(self, plates_data_dir):
+        query = 'type_name:university OR military -state:TX'
+        indexed = JSONSearchEngine(str(plates_data_dir)).search(query)
+        scanned = JSONSearchEngine(str(plates_data_dir), use_index=False).search(query)
+        assert indexed == scanned and indexed
+    
+    def test_ranked_and_streamed(self, plates_data_dir):
+        engine = JSONSearchEngine(str(plates_data_dir))
+        ranked = engine.search_ranked('type:university state:FL')
+        assert ranked.total_count == 2
+        assert {r['state'] for r in ranked.results} == {'FL'}
+        assert all(r['score'] > 0 for r in ranked.results)
+        assert [batch.state_code for batch in engine.search_iter('code:46')] == ['FL', 'TX']
+
+
+class TestRankedSearch:
+    """Test relevance-ranked top-k search"""
+    
+    def test_ranked_matches_search_results(self, mock_search_engine):
+        """Ranked search returns the same matches, with scores, best first"""
+        plain = mock_search_engine.search('plate')
+        ranked = mock_search_engine.search_ranked('plate', limit=None)
+        
+        assert ranked.total_count == len(plain)
+        assert sorted(r['value'] for r in ranked.results) == sorted(r['value'] for r in plain)
+        scores = [r['score'] for r in ranked.results]
+        assert scores == sorted(scores, reverse=True)
+    
+    def test_limit_keeps_total_count(self, mock_search_engine):
+        """Only the top results are returned, but all matches are counted"""
+        total = len(mock_search_engine.search('plate'))
+        ranked = mock_search_engine.search_ranked('plate', limit=2)
+        
+        assert len(ranked.results) == 2
+        assert ranked.total_count == total
+    
+    def test_type_name_ranks_first(self, mock_search_engine):
+        """A plate type name match outranks other fields"""
+        ranked = mock_search_engine.search_ranked('passenger', state_filter='CA')
+        assert ranked.results[0]['field'] == 'type_name'
+    
+    def test_boost_states(self, sample_data_dir):
+        """Boosted states rank ahead of equal matches elsewhere"""
+        plate_types = {'plate_types': [{'type_name': 'Veteran', 'category': 'military'}]}
+        for filename in ('texas.json', 'new_york.json'):
+            (sample_data_dir / filename).write_text(json.dumps(plate_types), encoding='utf-8')
+        engine = JSONSearchEngine(str(sample_data_dir))
+        
+        assert engine.search_ranked('veteran', boost_states=['TX']).results[0]['state'] == 'TX'
+        assert engine.search_ranked('veteran', boost_states=['NY']).results[0]['state'] == 'NY'
+    
+    def test_scan_path_matches_index(self, sample_data_dir):
+        """Ranking gives the same order without the index"""
+        indexed = JSONSearchEngine(str(sample_data_dir)).search_ranked('plate', limit=None)
+        scanned = JSONSearchEngine(str(sample_data_dir), use_index=False).search_ranked('plate', limit=None)
+        assert [r['value'] for r in indexed.results] == [r['value'] for r in scanned.results]
+    
+    def test_empty_query(self, mock_search_engine):
+        assert mock_search_engine.search_ranked('  ') == ([], 0)
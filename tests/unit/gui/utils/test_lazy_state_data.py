@@ -0,0 +1,70 @@
+"""
+Unit tests for lazy_state_data.py
+Tests for LazyStateData
+"""
+
+import pytest
+from src.gui.utils.lazy_state_data import LazyStateData, split_state_data
+
+
+@pytest.fixture
+def state_data():
+    return {'name': 'Maryland', 'plate_types': [{'type_name': 'Passenger'}], 'notes': 'n'}
+
+
+class TestSplitStateData:
+    """Test cases for split_state_data()"""
+
+    def test_split(self, state_data):
+        header, deferred, key_order = split_state_data(state_data)
+        assert header == {'name': 'Maryland', 'notes': 'n'}
+        assert deferred == {'plate_types': [{'type_name': 'Passenger'}]}
+        assert key_order == ['name', 'plate_types', 'notes']
+
+
+class TestLazyStateData:
+    """Test cases for LazyStateData"""
+
+    def _lazy(self, state_data, calls):
+        header, deferred, key_order = split_state_data(state_data)
+
+        def load_plate_types():
+            calls.append('plate_types')
+            return deferred['plate_types']
+
+        return LazyStateData(header, {'plate_types': load_plate_types}, key_order)
+
+    def test_header_fields_do_not_load(self, state_data):
+        calls = []
+        data = self._lazy(state_data, calls)
+
+        assert data['name'] == 'Maryland'
+        assert data.get('notes') == 'n'
+        assert 'plate_types' in data
+        assert not data.is_loaded('plate_types')
+        assert calls == []
+
+    def test_deferred_key_loads_once(self, state_data):
+        calls = []
+        data = self._lazy(state_data, calls)
+
+        assert data.get('plate_types') == [{'type_name': 'Passenger'}]
+        assert data['plate_types'] is data['plate_types']
+        assert data.is_loaded('plate_types')
+        assert calls == ['plate_types']
+
+    def test_missing_key(self, state_data):
+        data = self._lazy(state_data, [])
+        assert data.get('missing', 'default') == 'default'
+        with pytest.raises(KeyError):
+            data['missing']
+
+    def test_iteration_keeps_original_order(self, state_data):
+        data = self._lazy(state_data, [])
+        assert list(data) == ['name', 'plate_types', 'notes']
+        assert len(data) == 3
+
+    def test_to_dict(self, state_data):
+        data = self._lazy(state_data, [])
+        assert data.to_dict() == state_data
+        assert list(data.to_dict()) == list(state_data)
@@ -0,0 +1,120 @@
+"""
+Unit tests for lru_cache.py
+Tests for LRUCache
+"""
+
+import pytest
+from src.gui.utils.lru_cache import LRUCache
+
+
+@pytest.fixture
+def cache():
+    """Provide a cache where every entry costs 10 bytes, with room for 3"""
+    return LRUCache(max_bytes=30, sizeof=lambda value: 10)
+
+
+class TestLRUCacheBasics:
+    """Test cases for dict-like access"""
+
+    def test_put_and_get(self, cache):
+        cache.put('a', 1)
+        assert cache.get('a') == 1
+        assert 'a' in cache
+        assert len(cache) == 1
+
+    def test_get_missing_returns_default(self, cache):
+        assert cache.get('missing', []) == []
+
+    def test_getitem_missing_raises(self, cache):
+        with pytest.raises(KeyError):
+            cache['missing']
+
+    def test_setitem(self, cache):
+        cache['a'] = 1
+        assert cache['a'] == 1
+
+    def test_delitem(self, cache):
+        cache['a'] = 1
+        del cache['a']
+        assert 'a' not in cache
+        assert cache.current_bytes == 0
+
+    def test_replace_keeps_size(self, cache):
+        cache.put('a', 1)
+        cache.put('a', 2)
+        assert cache.get('a') == 2
+        assert cache.current_bytes == 10
+
+
+class TestLRUCacheEviction:
+    """Test cases for budget enforcement"""
+
+    def test_evicts_least_recently_used(self, cache):
+        for key in ('a', 'b', 'c'):
+            cache.put(key, key)
+        cache.get('a')  # 'b' is now least recently used
+        cache.put('d', 'd')
+        assert 'b' not in cache
+        assert all(key in cache for key in ('a', 'c', 'd'))
+        assert cache.evictions == 1
+
+    def test_explicit_size_overrides_sizeof(self, cache):
+        cache.put('a', 1)
+        cache.put('b', 2, size=25)
+        assert 'a' not in cache
+        assert 'b' in cache
+
+    def test_oversized_entry_is_kept_alone(self, cache):
+        cache.put('a', 1)
+        cache.put('big', 2, size=100)
+        assert list(cache) == ['big']
+
+    def test_max_entries(self):
+        cache = LRUCache(max_bytes=1000, sizeof=lambda value: 1, max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.put(key, key)
+        assert list(cache) == ['b', 'c']
+
+    def test_on_evict_callback(self):
+        evicted = []
+        cache = LRUCache(max_bytes=10, sizeof=lambda value: 10,
+                         on_evict=lambda key, value: evicted.append(key))
+        cache.put('a', 1)
+        cache.put('b', 2)
+        assert evicted == ['a']
+
+
+class TestLRUCacheInvalidation:
+    """Test cases for invalidation and statistics"""
+
+    def test_invalidate(self, cache):
+        cache.put('a', 1)
+        assert cache.invalidate('a') is True
+        assert cache.invalidate('a') is False
+        assert cache.invalidations == 1
+        assert cache.current_bytes == 0
+
+    def test_invalidate_where_by_tag(self, cache):
+        cache.put('fl', 1, tag='FL')
+        cache.put('ca', 2, tag='CA')
+        cache.put('all', 3, tag=None)
+        removed = cache.invalidate_where(lambda key, tag: tag in ('FL', None))
+        assert removed == 2
+        assert list(cache) == ['ca']
+
+    def test_stats(self, cache):
+        cache.put('a', 1)
+        cache.get('a')
+        cache.get('b')
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+        assert stats['bytes'] == 10
+
+    def test_clear_keeps_stats(self, cache):
+        cache.put('a', 1)
+        cache.get('a')
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == 1
@@ -0,0 +1,97 @@
+"""
+Unit tests for plate_identifier.py
+Tests for ranking the states and plate types a read plate string could be
+"""
+
+import pytest
+from src.gui.utils.json_search_engine import JSONSearchEngine
+from src.gui.utils.plate_identifier import PlateIdentifier
+from src.utils.helpers import score_plate_match
+
+
+@pytest.fixture
+def states():
+    return {
+        'GA': {
+            'name': 'Georgia',
+            'allows_letter_o': True,
+            'uses_zero_for_o': True,
+            'plate_types': [
+                {'type_name': 'Passenger', 'pattern': 'ABC1234', 'character_count': 7},
+                {'type_name': 'University of Georgia', 'pattern': 'UGXXXX', 'character_count': 6},
+                {'type_name': 'Trailer', 'pattern': 'T1234', 'character_count': 5},
+                {'type_name': 'Custom', 'pattern': 'TBD'},
+                {'type_name': 'No pattern'},
+            ],
+        },
+        'NY': {
+            'name': 'New York',
+            'allows_letter_o': False,
+            'uses_zero_for_o': True,
+            'plate_types': [
+                {'type_name': 'Passenger', 'pattern': 'ABC1234', 'character_count': 7},
+                {'type_name': 'Commercial', 'pattern': 'AB1234', 'character_count': 6},
+            ],
+        },
+    }
+
+
+@pytest.fixture
+def identifier(states):
+    return PlateIdentifier.from_states(states)
+
+
+class TestPlateIdentifier:
+    """Test cases for PlateIdentifier"""
+
+    def test_ranked_candidates(self, identifier):
+        identification = identifier.identify('abc 1234')
+        assert identification.plate == 'ABC1234'
+        assert [(c.state_code, c.type_name) for c in identification.candidates] == \
+            [('GA', 'Passenger'), ('NY', 'Passenger')]
+        assert identification.total_count == 2
+
+    def test_literal_prefix(self, identifier):
+        candidates = identifier.identify('UG12AB').candidates
+        assert [(c.state_code, c.type_name) for c in candidates] == [('GA', 'University of Georgia')]
+        assert candidates[0].plate_index == 1
+
+    def test_state_o_rules_lower_the_score(self, identifier):
+        candidates = identifier.identify('OBC1234').candidates
+        scores = {c.state_code: c.score for c in candidates}
+        assert scores['GA'] > scores['NY']
+
+    def test_scores_match_score_plate_match(self, identifier, states):
+        for read in ('ABC1234', 'UG12AB', 'T5678', 'OB1234', 'AB-123', 'XYZ'):
+            identification = identifier.identify(read, limit=None, min_score=0.0)
+            assert identification.total_count == 7
+            for candidate in identification.candidates:
+                expected = score_plate_match(identification.plate, states[candidate.state_code],
+                                             candidate.plate_type)
+                assert candidate.score == expected, (read, candidate.type_name)
+
+    def test_best_first(self, identifier):
+        scores = [c.score for c in identifier.identify('AB1234', limit=None, min_score=0.0).candidates]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_limit_and_state_filter(self, identifier):
+        identification = identifier.identify('ABC1234', limit=1)
+        assert len(identification.candidates) == 1 and identification.total_count == 2
+        assert [c.state_code for c in identifier.identify('ABC1234', state_filter='NY').candidates] == ['NY']
+
+    def test_no_candidates(self, identifier):
+        assert identifier.identify('!!').candidates == []
+        assert identifier.identify('ZZZZZZZZZZ').total_count == 0
+
+    def test_patterns_validated_once(self, identifier):
+        assert identifier.get_stats() == {'plate_types': 7, 'groups': 7, 'patterns': 5}
+
+
+class TestEngineIdentifyPlate:
+    """Test the engine's plate identification"""
+
+    def test_identify_plate(self, sample_data_dir):
+        engine = JSONSearchEngine(str(sample_data_dir), use_snapshots=False)
+        identification = engine.identify_plate('1ABC123', min_score=0.0, limit=None)
+        assert {c.type_name for c in identification.candidates} == {'Passenger', 'Commercial'}
+        assert engine.get_plate_identifier() is engine.get_plate_identifier()
@@ -0,0 +1,129 @@
+"""
+Unit tests for plate_table.py
+Tests for the columnar plate type table and its masks
+"""
+
+import pytest
+from src.gui.utils.json_search_engine import JSONSearchEngine
+from src.gui.utils.plate_table import Mask, PlateTypeTable
+from src.gui.utils.state_records import compact_state_data
+
+
+@pytest.fixture
+def states():
+    return {
+        'FL': {
+            'name': 'Florida',
+            'plate_types': [
+                {'type_name': 'Passenger', 'character_count': 7, 'has_stickers': True,
+                 'processing_metadata': {'dot_processing_type': 'conditional', 'currently_processed': True}},
+                {'type_name': 'Motorcycle', 'character_count': 5, 'has_stickers': True,
+                 'processing_metadata': {'dot_processing_type': 'always_standard'}},
+                {'type_name': 'Antique', 'character_count': None, 'has_stickers': False, 'images': {}},
+            ],
+        },
+        'GA': {
+            'name': 'Georgia',
+            'plate_types': [
+                {'type_name': 'Passenger', 'character_count': 7, 'has_stickers': True,
+                 'processing_metadata': {'dot_processing_type': 'conditional', 'currently_processed': False}},
+                'not a plate type',
+            ],
+        },
+        'XX': {'name': 'No plate types'},
+    }
+
+
+@pytest.fixture
+def table(states):
+    return PlateTypeTable.from_states(states)
+
+
+class TestPlateTypeTable:
+    """Test cases for PlateTypeTable"""
+
+    def test_rows(self, table):
+        assert len(table) == 4
+        assert table.rows() == [('FL', 0), ('FL', 1), ('FL', 2), ('GA', 0)]
+        assert table.column('type_name').values() == ['Passenger', 'Motorcycle', 'Antique', 'Passenger']
+
+    def test_dictionary_encoding(self, table):
+        column = table.column('type_name')
+        assert column.categories == [None, 'Passenger', 'Motorcycle', 'Antique']
+        assert list(column.codes) == [1, 2, 3, 1]
+        assert column.value_counts() == {'Passenger': 2, 'Motorcycle': 1, 'Antique': 1}
+
+    def test_multi_attribute_filter(self, table):
+        mask = table.filter(character_count=7, dot_processing_type='conditional', has_stickers=True)
+        assert table.rows(mask) == [('FL', 0), ('GA', 0)]
+
+    def test_metadata_columns_by_full_name(self, table):
+        assert table.eq('processing_metadata.currently_processed', False).rows() == [3]
+        assert table.column('currently_processed') is table.column('processing_metadata.currently_processed')
+
+    def test_conditions(self, table):
+        assert table.isin('state', ['GA', 'TX']).rows() == [3]
+        assert table.where('character_count', lambda count: count < 7).rows() == [1]
+        assert table.filter(character_count=lambda count: count >= 5, state='FL').rows() == [0, 1]
+        assert table.notnull('character_count').count() == 3
+        assert table.eq('character_count', None).rows() == [2]
+        assert not table.eq('type_name', 'Trailer')
+
+    def test_booleans_are_not_integers(self):
+        table = PlateTypeTable.from_states({'FL': {'plate_types': [{'character_count': 1}, {'character_count': True}]}})
+        assert table.eq('character_count', 1).rows() == [0]
+        assert table.eq('character_count', True).rows() == [1]
+
+    def test_non_scalar_values_read_as_none(self):
+        table = PlateTypeTable.from_states({'FL': {'plate_types': [{'type_name': ['A', 'B']}]}},
+                                           columns=[('type_name', ('type_name',))])
+        assert table.column('type_name')[0] is None
+
+    def test_mask_operators(self, table):
+        passenger = table.eq('type_name', 'Passenger')
+        florida = table.eq('state', 'FL')
+        assert (passenger & florida).rows() == [0]
+        assert (passenger | florida).rows() == [0, 1, 2, 3]
+        assert (passenger ^ florida).rows() == [1, 2, 3]
+        assert (~florida).rows() == [3]
+        assert ~table.all() == table.none()
+        assert repr(passenger) == "Mask(2 of 4 rows)"
+        with pytest.raises(ValueError):
+            passenger & Mask(1, 5)
+
+    def test_select_and_plate_types(self, table, states):
+        mask = table.eq('type_name', 'Passenger')
+        assert table.select(mask, 'state', 'character_count') == [('FL', 7), ('GA', 7)]
+        assert table.plate_types(mask) == [('FL', states['FL']['plate_types'][0]),
+                                           ('GA', states['GA']['plate_types'][0])]
+
+    def test_unknown_column(self, table):
+        with pytest.raises(KeyError):
+            table.eq('no_such_column', 1)
+
+    def test_compact_records(self, states):
+        records = {code: compact_state_data(data) for code, data in states.items()}
+        mask = PlateTypeTable.from_states(records).filter(has_stickers=True, character_count=7)
+        assert mask.rows() == [0, 3]
+
+    def test_large_mask_rows(self):
+        states = {'FL': {'plate_types': [{'character_count': row % 3} for row in range(10_000)]}}
+        table = PlateTypeTable.from_states(states)
+        assert table.eq('character_count', 0).rows() == list(range(0, 10_000, 3))
+
+
+class TestEnginePlateTable:
+    """Test the engine's plate type table"""
+
+    def test_filter_plate_types(self, sample_data_dir):
+        engine = JSONSearchEngine(str(sample_data_dir), use_snapshots=False)
+        matches = engine.filter_plate_types(character_count=7, category='commercial')
+        assert [(state, plate['type_name']) for state, plate in matches] == [('CA', 'Commercial')]
+
+    def test_table_reused_until_data_changes(self, sample_data_dir):
+        engine = JSONSearchEngine(str(sample_data_dir), use_snapshots=False)
+        table = engine.get_plate_table()
+        assert engine.get_plate_table() is table
+
+        engine.invalidate_state('CA')
+        assert engine.get_plate_table() is not table
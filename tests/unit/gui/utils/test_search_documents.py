@@ -0,0 +1,57 @@
+"""
+Unit tests for search_documents.py
+Tests for flattening state data into search documents
+"""
+
+from src.gui.utils.search_documents import flatten_state_data, STATE_RECORD
+
+
+class TestFlattenStateData:
+    """Test cases for flatten_state_data()"""
+
+    def test_state_fields_flattened(self, search_state_data):
+        documents = flatten_state_data('FL', search_state_data)
+        fields = [d.field for d in documents if d.record == STATE_RECORD]
+        assert 'slogan' in fields
+        assert 'uses_zero_for_o' in fields
+        assert 'processing_metadata.character_restrictions' in fields
+
+    def test_text_is_lowercased_value(self, search_state_data):
+        documents = flatten_state_data('FL', search_state_data)
+        slogan = next(d for d in documents if d.field == 'slogan')
+        assert slogan.value == 'Sunshine State'
+        assert slogan.text == 'sunshine state'
+
+    def test_boolean_search_text(self, search_state_data):
+        documents = flatten_state_data('FL', search_state_data)
+        allows_o = next(d for d in documents if d.field == 'allows_letter_o')
+        assert allows_o.text == 'does not allow letter o'
+        assert allows_o.value == "Allows letter 'O': False"
+
+    def test_plate_fields_flattened(self, search_state_data):
+        documents = flatten_state_data('FL', search_state_data)
+        plate_docs = [d for d in documents if d.record == 0]
+        assert all(d.plate_type == 'Breast Cancer Awareness' for d in plate_docs)
+        assert [d.value for d in plate_docs if d.field == 'vehicle_types'] == ['Car', 'Truck']
+
+    def test_nested_plate_fields_use_field_paths(self, search_state_data):
+        documents = flatten_state_data('FL', search_state_data)
+        fields = {d.field for d in documents if d.record == 0}
+        assert 'plate_characteristics.font' in fields
+        assert 'plate_characteristics.design_variants' in fields
+        assert 'processing_metadata.visual_identifier' in fields
+
+    def test_stacked_list_reported_once(self, search_state_data):
+        documents = flatten_state_data('FL', search_state_data)
+        include = [d for d in documents if d.field == 'stacked_characters.include']
+        assert [d.text for d in include] == ['dv', 'ww']
+        assert all(d.first_only and d.value == 'Include: DV, WW' for d in include)
+
+    def test_documents_in_record_order(self, search_state_data):
+        documents = flatten_state_data('FL', search_state_data)
+        records = [d.record for d in documents]
+        assert records == sorted(records)
+
+    def test_legacy_plates_key(self):
+        documents = flatten_state_data('ZZ', {'plates': [{'type': 'standard', 'font': 'Arial'}]})
+        assert [d.plate_type for d in documents] == ['Plate 1', 'Plate 1']
@@ -0,0 +1,151 @@
+"""
+Unit tests for search_index.py
+Tests for SearchIndex and state flattening
+"""
+
+import pytest
+from src.gui.utils.search_index import SearchIndex, short_grams, tokenize, trigrams
+from src.gui.utils.json_search_engine import JSONSearchEngine
+
+
+@pytest.fixture
+def index(search_state_data):
+    """Provide an index with one state loaded"""
+    search_index = SearchIndex()
+    search_index.add_state('FL', search_state_data)
+    return search_index
+
+
+def _texts(index, doc_ids):
+    return [index.documents[doc_id].text for doc_id in doc_ids]
+
+
+class TestTokenize:
+    """Test cases for tokenize()"""
+
+    def test_splits_on_punctuation(self):
+        assert tokenize('a & m university') == ['a', 'm', 'university']
+
+    def test_punctuation_only(self):
+        assert tokenize('@#$') == []
+
+
+class TestTrigrams:
+    """Test cases for trigrams()"""
+
+    def test_trigrams(self):
+        assert trigrams('pink') == {'pin', 'ink'}
+
+    def test_short_text_has_no_trigrams(self):
+        assert trigrams('46') == set()
+
+
+class TestShortGrams:
+    """Test cases for short_grams()"""
+
+    def test_short_grams(self):
+        assert short_grams('c 46') == {'c', ' ', '4', '6', 'c ', ' 4', '46'}
+
+    def test_empty_text(self):
+        assert short_grams('') == set()
+
+
+class TestSearchIndexLookup:
+    """Test cases for SearchIndex.lookup()"""
+
+    def test_whole_word(self, index):
+        assert 'breast cancer awareness' in _texts(index, index.lookup('cancer'))
+
+    def test_substring_inside_word(self, index):
+        assert 'breast cancer awareness' in _texts(index, index.lookup('ancer aw'))
+
+    def test_multiple_tokens_must_all_match(self, index):
+        assert index.lookup('cancer passenger') == []
+
+    def test_punctuation_only_query(self, index):
+        assert _texts(index, index.lookup('#ff')) == ['#ffffff']
+
+    def test_no_match(self, index):
+        assert index.lookup('zebra') == []
+
+    def test_contains_spans_words(self, index):
+        """Trigram lookup keeps 'contains' semantics across word boundaries"""
+        assert _texts(index, index.lookup('t cancer a')) == ['breast cancer awareness']
+
+    def test_short_query_uses_short_grams(self, index):
+        assert '46' in _texts(index, index.lookup('46'))
+        assert 'abc 123' in _texts(index, index.lookup('c '))
+
+    def test_short_query_is_one_postings_lookup(self, index):
+        """A query under three characters is looked up whole, not matched against every token"""
+        assert index._candidate_text_ids('ri') is index._short_gram_postings['ri']
+        assert index.lookup('q') == []
+
+    def test_short_queries_match_scan(self, index):
+        texts = [document.text for document in index.documents]
+        for query in ['a', 'o', 'ri', 'c ', ' ', '#', '@', '4', '']:
+            assert _texts(index, index.lookup(query)) == [text for text in texts if query in text]
+
+    def test_unknown_trigram_short_circuits(self, index):
+        assert index.lookup('qqq') == []
+
+    def test_results_in_index_order(self, index):
+        doc_ids = index.lookup('ribbon')
+        assert doc_ids == sorted(doc_ids)
+        assert len(doc_ids) == 4
+
+    def test_add_state_is_idempotent(self, index, search_state_data):
+        count = len(index.documents)
+        index.add_state('FL', search_state_data)
+        assert len(index.documents) == count
+        assert 'FL' in index
+
+    def test_removed_slots_are_reused(self, index, search_state_data):
+        """Re-adding a removed state reuses its slots and postings, in document order"""
+        count = len(index.documents)
+        stats = index.get_stats()
+        ribbon = _texts(index, index.lookup('ribbon'))
+        for _ in range(3):
+            assert index.remove_state('FL')
+            assert index.get_stats()['distinct_texts'] == 0
+            assert index.lookup('ribbon') == [] and index.lookup('@') == []
+            index.add_state('FL', search_state_data)
+        
+        assert len(index.documents) == count
+        assert index.get_stats() == stats
+        assert _texts(index, index.lookup('ribbon')) == ribbon
+        assert [index.documents[doc_id] for doc_id in index._state_documents['FL']] == \
+            [document for document in index.documents if document is not None]
+
+    def test_texts_kept_while_another_state_has_them(self, index, search_state_data):
+        index.add_state('TX', search_state_data)
+        index.remove_state('FL')
+        assert len(index.lookup('ribbon')) == 4
+        assert {index.documents[doc_id].state_code for doc_id in index.lookup('ribbon')} == {'TX'}
+
+    def test_lookup_many(self, index):
+        """Each distinct query maps to its lookup()"""
+        queries = ['ribbon', 'cancer', '46', 'c ', 'zebra', 'ribbon']
+        assert index.lookup_many(queries) == {query: index.lookup(query) for query in queries}
+
+
+class TestIndexMatchesScan:
+    """The index must return exactly what the legacy state scan returns"""
+
+    QUERIES = ['passenger', 'Plate', 'ribbon', 'gothic', 'letter o', 'dv', 'true', '46', '#fff', 'a', '@#$']
+
+    @pytest.mark.parametrize('category', ['all', 'type', 'fonts', 'design', 'colors', 'handling_rules'])
+    def test_parity_with_scan(self, sample_data_dir, search_state_data, category):
+        indexed = JSONSearchEngine(str(sample_data_dir))
+        scanned = JSONSearchEngine(str(sample_data_dir), use_index=False)
+        indexed.add_search_category('design', ['design'])
+        scanned.add_search_category('design', ['design'])
+        indexed.add_search_category('colors', ['background_color', 'vehicle_types'])
+        scanned.add_search_category('colors', ['background_color', 'vehicle_types'])
+        for engine in (indexed, scanned):
+            engine._store_state_data('FL', search_state_data)
+
+        for query in self.QUERIES:
+            for state_filter in (None, 'FL', 'CA'):
+                assert indexed.search(query, category, state_filter) == \
+                    scanned.search(query, category, state_filter)
@@ -0,0 +1,128 @@
+"""
+Unit tests for search_query.py
+Tests for parsing and evaluating field-scoped boolean queries
+"""
+
+import pytest
+from src.gui.utils.search_documents import SearchDocument
+from src.gui.utils.search_query import (
+    And, Not, Or, Term, QuerySyntaxError, parse_query, tokenize_query
+)
+
+
+def _document(state_code: str, record: int, field: str, value: str) -> SearchDocument:
+    return SearchDocument(state_code, record, f"Plate {record}", field, value, value.lower(), (field,),
+                          True, False, True, False)
+
+
+DOCUMENTS = [
+    _document('FL', 0, 'type_name', 'Florida State University'),
+    _document('FL', 0, 'category', 'university'),
+    _document('FL', 1, 'type_name', 'Purple Heart'),
+    _document('FL', 1, 'category', 'military'),
+    _document('TX', 0, 'type_name', 'Texas A&M University'),
+    _document('TX', 0, 'category', 'university'),
+    _document('TX', 1, 'type_name', 'Veteran'),
+]
+
+
+def _evaluate(query: str):
+    """Evaluate a query over DOCUMENTS; returns the matching (state, record, field) triples"""
+    def term_hits(term):
+        return [(position, document) for position, document in enumerate(DOCUMENTS)
+                if term.text in document.text and term.field in (None, document.field)]
+
+    def records_of(state_codes):
+        return {(d.state_code, d.record) for d in DOCUMENTS if d.state_code.lower() in state_codes}
+
+    hits = parse_query(query).evaluate(term_hits, lambda text: records_of({text}),
+                                       lambda: records_of({'fl', 'tx'}))
+    return sorted((d.state_code, d.record, d.field) for _, d in hits)
+
+
+class TestParseQuery:
+    """Test cases for the query grammar"""
+
+    def test_plain_text_is_not_parsed(self):
+        assert parse_query('purple heart') is None
+        assert parse_query('allows letter o: true') is None
+        assert parse_query('and or not') is None
+
+    def test_scopes(self):
+        plan = parse_query('font:gothic state:FL code:46')
+        assert plan.root == And((Term('font', 'gothic'), Term('state', 'fl'), Term('code', '46')))
+
+    def test_phrases_and_operators(self):
+        plan = parse_query('"Purple Heart" OR veteran')
+        assert plan.root == Or((Term(None, 'purple heart'), Term(None, 'veteran')))
+
+    def test_and_binds_tighter_than_or(self):
+        plan = parse_query('a:x b:y OR c:z')
+        assert plan.root == Or((And((Term('a', 'x'), Term('b', 'y'))), Term('c', 'z')))
+
+    def test_not_and_minus(self):
+        assert parse_query('veteran NOT state:TX').root == And((Term(None, 'veteran'), Not(Term('state', 'tx'))))
+        assert parse_query('veteran -state:TX').root == parse_query('veteran NOT state:TX').root
+
+    def test_scoped_group(self):
+        plan = parse_query('type:(university OR "a&m" x:y)')
+        assert plan.root == Or((Term('type', 'university'), And((Term('type', 'a&m'), Term('x', 'y')))))
+
+    def test_incomplete_query(self):
+        """Parts still being typed are dropped"""
+        assert parse_query('veteran AND').root == Term(None, 'veteran')
+        assert parse_query('state:FL type:').root == Term('state', 'fl')
+        assert parse_query('type:(veteran').root == Term('type', 'veteran')
+        assert parse_query('state:') is None
+
+    def test_trailing_operator(self):
+        """A query ending in an operator drops the operator"""
+        assert parse_query('veteran NOT').root == Term(None, 'veteran')
+        assert parse_query('veteran OR').root == Term(None, 'veteran')
+        assert parse_query('state:FL NOT').root == Term('state', 'fl')
+        assert parse_query('state:FL -').root == And((Term('state', 'fl'), Term(None, '-')))
+        assert parse_query('NOT') is None
+        assert parse_query('OR') is None
+
+    def test_minus_negates_only_after_a_space(self):
+        """A '-' starting the query or inside a word is text"""
+        assert parse_query('-1') is None
+        assert parse_query(' -1 state:FL').root == And((Term(None, '-1'), Term('state', 'fl')))
+        assert parse_query('veteran-commercial') is None
+        assert parse_query('veteran  -commercial').root == And((Term(None, 'veteran'), Not(Term(None, 'commercial'))))
+
+    def test_unbalanced_parenthesis(self):
+        with pytest.raises(QuerySyntaxError):
+            parse_query('type:veteran)')
+
+    def test_tokenize_keeps_colons_in_words(self):
+        assert tokenize_query('12:30 x: y') == [('word', '12:30'), ('word', 'x:'), ('word', 'y')]
+
+    def test_state_scopes(self):
+        assert parse_query('veteran state:FL').state_scopes() == ['fl']
+        assert parse_query('veteran OR state:FL').state_scopes() == []
+
+    def test_positive_terms(self):
+        plan = parse_query('veteran NOT military state:FL OR "purple heart"')
+        assert plan.text_terms() == ['veteran', 'purple heart']
+
+
+class TestEvaluate:
+    """Test cases for evaluating a query as record set operations"""
+
+    def test_terms_must_match_the_same_record(self):
+        assert _evaluate('category:university type_name:texas') == [
+            ('TX', 0, 'category'), ('TX', 0, 'type_name')]
+
+    def test_or(self):
+        assert _evaluate('"purple heart" OR veteran') == [('FL', 1, 'type_name'), ('TX', 1, 'type_name')]
+
+    def test_not(self):
+        assert _evaluate('category:university -state:fl') == [('TX', 0, 'category')]
+        assert _evaluate('university NOT texas') == [('FL', 0, 'category'), ('FL', 0, 'type_name')]
+
+    def test_only_negated_terms_report_nothing(self):
+        assert _evaluate('NOT university') == []
+
+    def test_no_match(self):
+        assert _evaluate('category:university veteran') == []
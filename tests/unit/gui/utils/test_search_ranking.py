@@ -0,0 +1,59 @@
+"""
+Unit tests for search_ranking.py
+Tests for BM25-style relevance scoring
+"""
+
+import pytest
+from src.gui.utils.search_documents import SearchDocument
+from src.gui.utils.search_ranking import SearchRanker, query_terms
+
+
+def _document(value: str, field: str = 'type_name', state_code: str = 'CA') -> SearchDocument:
+    return SearchDocument(state_code, 0, value, field, value, value.lower(), (field,),
+                          True, False, True, False)
+
+
+@pytest.fixture
+def ranker():
+    return SearchRanker('blue', document_count=100, average_length=20.0, document_frequency={'blue': 10})
+
+
+class TestSearchRanker:
+    """Test cases for SearchRanker"""
+
+    def test_query_terms(self):
+        assert query_terms('purple heart') == ['purple', 'heart']
+        assert query_terms('--') == ['--']
+
+    def test_exact_beats_word_beats_partial(self, ranker):
+        exact = ranker.score(_document('Blue'))
+        word = ranker.score(_document('Blue Knights'))
+        partial = ranker.score(_document('Bluebonnet'))
+        assert exact > word > partial
+
+    def test_type_name_beats_description(self, ranker):
+        assert (ranker.score(_document('Blue Knights'))
+                > ranker.score(_document('Blue Knights', field='description')))
+
+    def test_shorter_text_scores_higher(self, ranker):
+        assert (ranker.score(_document('Back the Blue'))
+                > ranker.score(_document('Back the Blue - supports law enforcement families')))
+
+    def test_boost_states(self):
+        ranker = SearchRanker('blue', 100, 20.0, {'blue': 10}, boost_states=['FL'])
+        assert (ranker.score(_document('Blue Knights', state_code='FL'))
+                > ranker.score(_document('Blue Knights', state_code='CA')))
+
+    def test_rarer_terms_weigh_more(self):
+        ranker = SearchRanker('blue lodge', 100, 20.0, {'blue': 50, 'lodge': 2})
+        assert ranker.score(_document('Lodge')) > ranker.score(_document('Blue'))
+
+    def test_top_is_bounded_and_ordered(self, ranker):
+        documents = [_document(value) for value in ['Bluebonnet', 'Blue', 'Blue Knights', 'True Blue Fan']]
+        top = ranker.top(documents, 2)
+        assert [document.value for _, document in top] == ['Blue', 'Blue Knights']
+        assert top[0][0] >= top[1][0]
+
+    def test_ties_keep_document_order(self, ranker):
+        documents = [_document('Blue', state_code='TX'), _document('Blue', state_code='AL')]
+        assert [d.state_code for _, d in ranker.top(documents, None)] == ['TX', 'AL']
@@ -0,0 +1,116 @@
+"""
+Unit tests for state_records.py
+Tests for the compact, read-only records state data is kept in
+"""
+
+import json
+import pytest
+from src.gui.utils.state_records import (
+    PlateTypeRecord,
+    ProcessingMetadataRecord,
+    Record,
+    StateRecord,
+    compact_state_data,
+    measure_compaction,
+    to_plain,
+)
+from src.gui.utils.state_repository import StateRepository
+
+
+@pytest.fixture
+def state_data():
+    return {
+        'name': 'Florida',
+        'abbreviation': 'FL',
+        'primary_colors': ['#FFFFFF', '#008000'],
+        'character_formatting': {'stacked_characters': True, 'slant_direction': None},
+        'custom_field': {'kept': True},
+        'plate_types': [
+            {
+                'type_name': 'Passenger',
+                'pattern': 'ABC 1234',
+                'has_stickers': True,
+                'processing_metadata': {'currently_processed': True, 'extra_rule': 'x'},
+                'plate_characteristics': {'background_color': '#FFFFFF'},
+            },
+            {'type_name': 'Motorcycle', 'pattern': 'AB 123'},
+        ],
+    }
+
+
+class TestCompactStateData:
+    """Test cases for compact_state_data()"""
+
+    def test_record_classes(self, state_data):
+        record = compact_state_data(state_data)
+        assert isinstance(record, StateRecord)
+        assert isinstance(record['plate_types'][0], PlateTypeRecord)
+        assert isinstance(record['plate_types'][0]['processing_metadata'], ProcessingMetadataRecord)
+        assert isinstance(record['character_formatting'], Record)
+
+    def test_reads_like_the_dict(self, state_data):
+        record = compact_state_data(state_data)
+        assert record == state_data
+        assert list(record) == list(state_data)
+        assert record['custom_field'] == {'kept': True}
+        assert record['plate_types'][0]['processing_metadata']['extra_rule'] == 'x'
+        assert record['character_formatting']['slant_direction'] is None
+
+    def test_missing_keys(self, state_data):
+        plate = compact_state_data(state_data)['plate_types'][1]
+        assert 'description' not in plate
+        assert plate.get('description', '') == ''
+        with pytest.raises(KeyError):
+            plate['description']
+        with pytest.raises(KeyError):
+            plate['not_a_field']
+
+    def test_read_only(self, state_data):
+        record = compact_state_data(state_data)
+        with pytest.raises(TypeError):
+            record['name'] = 'Changed'
+
+    def test_strings_are_interned(self, state_data):
+        other = json.loads(json.dumps(state_data))
+        first, second = compact_state_data(state_data), compact_state_data(other)
+        assert first['plate_types'][0]['pattern'] is second['plate_types'][0]['pattern']
+        assert first['primary_colors'][0] is second['primary_colors'][0]
+
+    def test_same_keys_share_a_shape(self, state_data):
+        record = compact_state_data(state_data)
+        other = compact_state_data(json.loads(json.dumps(state_data)))
+        assert record['character_formatting']._shape is other['character_formatting']._shape
+
+    def test_displayed_like_the_dict(self, state_data):
+        """str() and f-strings (UI labels, text exports) show the dict text"""
+        record = compact_state_data(state_data)
+        assert str(record['character_formatting']) == str(state_data['character_formatting'])
+        assert f"{record['plate_types']}" == f"{state_data['plate_types']}"
+        assert repr(record) == repr(state_data)
+
+    def test_to_plain_round_trip(self, state_data):
+        plain = to_plain(compact_state_data(state_data))
+        assert type(plain) is dict and type(plain['plate_types'][0]) is dict
+        assert json.dumps(plain) == json.dumps(state_data)
+
+
+class TestMeasureCompaction:
+    """Test the tracemalloc memory report"""
+
+    def test_records_use_less_memory(self, state_data):
+        raw = json.dumps({**state_data, 'plate_types': state_data['plate_types'] * 200}).encode('utf-8')
+        plain_bytes, compact_bytes = measure_compaction([raw])
+        assert 0 < compact_bytes < plain_bytes
+
+
+class TestRepositoryRecords:
+    """Test that the repository keeps states as records"""
+
+    def test_loaded_state_is_compact(self, sample_data_dir):
+        data = StateRepository(str(sample_data_dir), compact=True).get('CA')
+        assert isinstance(data, StateRecord)
+        with open(sample_data_dir / 'california.json', encoding='utf-8') as f:
+            assert data == json.load(f)
+
+    def test_compact_off(self, sample_data_dir):
+        assert type(StateRepository(str(sample_data_dir), compact=False).get('CA')) is dict
@@ -0,0 +1,127 @@
+"""
+Unit tests for state_repository.py
+Tests for the shared, process-wide loader of state data files
+"""
+
+import json
+import os
+import threading
+import pytest
+from src.gui.utils.json_search_engine import JSONSearchEngine
+from src.gui.utils.lazy_state_data import LazyStateData
+from src.gui.utils.state_repository import StateRepository, shared_state_repository
+
+
+@pytest.fixture
+def states_dir(tmp_path):
+    """A states directory with one mapped and one unmapped state file"""
+    path = tmp_path / 'states'
+    path.mkdir()
+    (path / 'california.json').write_text(
+        json.dumps({'name': 'California', 'abbreviation': 'CA', 'plate_types': [{'type_name': 'Passenger'}]}),
+        encoding='utf-8')
+    (path / 'atlantis.json').write_text(
+        json.dumps({'name': 'Atlantis', 'abbreviation': 'AQ', 'plate_types': ['Submarine']}),
+        encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def repository(states_dir):
+    return StateRepository(str(states_dir))
+
+
+def _touch(path):
+    """Change a file's modification time without changing its contents"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestStateRepository:
+    """Test cases for StateRepository"""
+
+    def test_parses_once(self, repository):
+        """Every reader gets the same object from a single parse"""
+        first = repository.get('CA')
+        assert first['name'] == 'California'
+        assert repository.get('CA') is first
+        assert repository.load('CA').data is first
+        assert repository.get_stats()['parse_counts'] == {'california': 1}
+
+    def test_changed_file_is_read_again(self, repository, states_dir):
+        repository.get('CA')
+        path = states_dir / 'california.json'
+        path.write_text(json.dumps({'name': 'California!'}), encoding='utf-8')
+        _touch(path)
+
+        assert repository.get('CA')['name'] == 'California!'
+        assert repository.parse_counts['california'] == 2
+
+    def test_invalidate(self, repository):
+        first = repository.get('CA')
+        repository.invalidate('CA')
+        assert repository.get('CA') is not first
+
+    def test_missing_state(self, repository):
+        assert repository.get('TX') is None
+        with pytest.raises(FileNotFoundError):
+            repository.load('TX')
+
+    def test_broken_file(self, repository, states_dir):
+        (states_dir / 'texas.json').write_text('{not json', encoding='utf-8')
+        assert repository.get('TX') is None
+        with pytest.raises(json.JSONDecodeError):
+            repository.load('TX')
+
+    def test_unmapped_state_found_by_abbreviation(self, repository, states_dir):
+        assert repository.state_file('AQ') == states_dir / 'atlantis.json'
+        assert repository.get('AQ')['plate_types'] == ['Submarine']
+        assert repository.parse_counts['atlantis'] == 1
+
+    def test_concurrent_loads_parse_once(self, repository):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(repository.get('CA'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 8 and all(data is results[0] for data in results)
+        assert repository.parse_counts['california'] == 1
+
+    def test_lazy_view_from_snapshot(self, states_dir):
+        """A state not loaded yet is read lazily from its snapshot; loaded data is shared"""
+        StateRepository(str(states_dir)).get('CA')  # parses and writes the snapshot
+
+        repository = StateRepository(str(states_dir))
+        lazy = repository.get('CA', lazy=True)
+        assert isinstance(lazy, LazyStateData)
+        assert not lazy.is_loaded('plate_types')
+        assert repository.get_stats()['json_parses'] == 0
+
+        full = repository.get('CA')
+        assert repository.get('CA', lazy=True) is full
+
+    def test_stats(self, repository):
+        repository.get('CA')
+        repository.get('CA')
+        stats = repository.get_stats()
+        assert (stats['states'], stats['hits'], stats['misses'], stats['json_parses']) == (1, 1, 1, 1)
+
+
+class TestSharedRepository:
+    """Test the process-wide repository"""
+
+    def test_one_repository_per_directory(self, states_dir):
+        assert shared_state_repository(str(states_dir)) is shared_state_repository(str(states_dir / '.'))
+        assert shared_state_repository(str(states_dir), use_snapshots=False) is not \
+            shared_state_repository(str(states_dir))
+
+    def test_engines_share_parsed_states(self, sample_data_dir):
+        """A second engine over the same data reuses the first one's parsed state"""
+        first = JSONSearchEngine(str(sample_data_dir), use_snapshots=False)
+        second = JSONSearchEngine(str(sample_data_dir), use_snapshots=False)
+        assert first.repository is second.repository
+
+        assert first.load_state_data('CA') is second.load_state_data('CA')
+        assert first.get_cache_stats()['repository']['parse_counts'] == {'california': 1}
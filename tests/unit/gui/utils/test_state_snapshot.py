@@ -0,0 +1,170 @@
+"""
+Unit tests for state_snapshot.py
+Tests for the binary snapshot cache of parsed state data
+"""
+
+import json
+import os
+import pytest
+from pathlib import Path
+from src.gui.utils.json_search_engine import JSONSearchEngine
+from src.gui.utils.search_documents import flatten_state_data
+from src.gui.utils.state_repository import StateRepository
+from src.gui.utils.state_snapshot import (
+    StateSnapshotStore, content_digest, default_snapshot_directory
+)
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    """A small state JSON file"""
+    path = tmp_path / 'states' / 'california.json'
+    path.parent.mkdir()
+    path.write_text(json.dumps({'name': 'California', 'plate_types': [{'type_name': 'Passenger'}]}),
+                    encoding='utf-8')
+    return path
+
+
+def _stamp(path: Path):
+    stat = path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _save(store: StateSnapshotStore, path: Path, with_documents: bool = True):
+    raw = path.read_bytes()
+    data = json.loads(raw)
+    documents = flatten_state_data('CA', data) if with_documents else None
+    assert store.save(path, _stamp(path), content_digest(raw), data, documents)
+    return data, documents
+
+
+class TestStateSnapshotStore:
+    """Test cases for StateSnapshotStore"""
+    
+    def test_default_directory_is_next_to_states(self, tmp_path):
+        """Snapshots live in a sibling of the states directory"""
+        assert default_snapshot_directory(str(tmp_path / 'states')) == tmp_path / 'states_snapshot'
+    
+    def test_round_trip(self, state_file, tmp_path):
+        """A saved snapshot returns the same data and documents"""
+        store = StateSnapshotStore(tmp_path / 'snapshots')
+        data, documents = _save(store, state_file)
+        
+        assert store.load(state_file, _stamp(state_file)) == (data, documents)
+        assert store.is_current(state_file, _stamp(state_file))
+    
+    def test_data_only_snapshot(self, state_file, tmp_path):
+        """Snapshots without documents return None for them"""
+        store = StateSnapshotStore(tmp_path / 'snapshots')
+        data, _ = _save(store, state_file, with_documents=False)
+        
+        assert store.load(state_file, _stamp(state_file)) == (data, None)
+        assert not store.is_current(state_file, _stamp(state_file))
+        assert store.is_current(state_file, _stamp(state_file), with_documents=False)
+    
+    def test_missing_snapshot(self, state_file, tmp_path):
+        """No snapshot means None"""
+        store = StateSnapshotStore(tmp_path / 'snapshots')
+        assert store.load(state_file, _stamp(state_file)) is None
+    
+    def test_changed_file_is_stale(self, state_file, tmp_path):
+        """Editing the state file invalidates its snapshot"""
+        store = StateSnapshotStore(tmp_path / 'snapshots')
+        _save(store, state_file)
+        state_file.write_text(json.dumps({'name': 'Edited'}), encoding='utf-8')
+        
+        assert store.load(state_file, _stamp(state_file)) is None
+    
+    def test_copied_file_with_new_mtime_is_current(self, state_file, tmp_path):
+        """A file with a new mtime but identical contents keeps its snapshot"""
+        store = StateSnapshotStore(tmp_path / 'snapshots')
+        data, documents = _save(store, state_file)
+        stat = state_file.stat()
+        os.utime(state_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        assert store.load(state_file, _stamp(state_file)) == (data, documents)
+    
+    def test_same_size_different_contents_is_stale(self, state_file, tmp_path):
+        """A same-sized edit is caught by the content digest"""
+        store = StateSnapshotStore(tmp_path / 'snapshots')
+        _save(store, state_file)
+        stat = state_file.stat()
+        state_file.write_text(state_file.read_text(encoding='utf-8').replace('Passenger', 'Passengeq'),
+                              encoding='utf-8')
+        os.utime(state_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        assert state_file.stat().st_size == stat.st_size
+        assert store.load(state_file, _stamp(state_file)) is None
+    
+    def test_corrupt_snapshot_is_ignored(self, state_file, tmp_path):
+        """An unreadable snapshot falls back to None"""
+        store = StateSnapshotStore(tmp_path / 'snapshots')
+        _save(store, state_file)
+        store.snapshot_path(state_file).write_bytes(b'not a snapshot')
+        
+        assert store.load(state_file, _stamp(state_file)) is None
+    
+    def test_disabled_store(self, state_file, tmp_path):
+        """A disabled store neither reads nor writes"""
+        store = StateSnapshotStore(tmp_path / 'snapshots', enabled=False)
+        raw = state_file.read_bytes()
+        assert not store.save(state_file, _stamp(state_file), content_digest(raw), json.loads(raw))
+        assert not (tmp_path / 'snapshots').exists()
+    
+    def test_load_lazy_defers_plate_types(self, state_file, tmp_path):
+        """load_lazy() reads plate_types from the snapshot only when asked"""
+        store = StateSnapshotStore(tmp_path / 'snapshots')
+        data, _ = _save(store, state_file)
+        lazy = store.load_lazy(state_file, _stamp(state_file))
+        
+        assert lazy['name'] == 'California'
+        assert not lazy.is_loaded('plate_types')
+        assert lazy['plate_types'] == data['plate_types']
+        assert lazy.to_dict() == data
+    
+    def test_load_lazy_after_snapshot_replaced(self, state_file, tmp_path):
+        """Deferred data falls back to the JSON when the snapshot was rewritten"""
+        store = StateSnapshotStore(tmp_path / 'snapshots')
+        data, _ = _save(store, state_file)
+        lazy = store.load_lazy(state_file, _stamp(state_file))
+        _save(store, state_file, with_documents=False)
+        
+        assert lazy['plate_types'] == data['plate_types']
+    
+    def test_clear(self, state_file, tmp_path):
+        """clear() removes all snapshot files"""
+        store = StateSnapshotStore(tmp_path / 'snapshots')
+        _save(store, state_file)
+        assert store.clear() == 1
+        assert store.load(state_file, _stamp(state_file)) is None
+
+
+class TestEngineSnapshots:
+    """Test JSONSearchEngine loading from snapshots"""
+    
+    def test_engine_writes_and_uses_snapshots(self, sample_data_dir, monkeypatch):
+        """A second engine loads states from the first one's snapshots"""
+        first = JSONSearchEngine(str(sample_data_dir))
+        expected = first.search('Passenger', state_filter='CA')
+        
+        def no_json(raw):
+            raise AssertionError('state JSON parsed despite a current snapshot')
+        
+        monkeypatch.setattr('src.gui.utils.json_search_engine.json.loads', no_json)
+        # Its own repository, so the state is not simply shared with the first engine
+        second = JSONSearchEngine(str(sample_data_dir), repository=StateRepository(str(sample_data_dir)))
+        assert second.search('Passenger', state_filter='CA') == expected
+    
+    def test_build_snapshots(self, sample_data_dir):
+        """build_snapshots() writes each missing snapshot once"""
+        engine = JSONSearchEngine(str(sample_data_dir))
+        built = engine.build_snapshots()
+        
+        assert 'CA' in built
+        assert engine.build_snapshots() == []
+    
+    def test_snapshots_disabled(self, sample_data_dir):
+        """use_snapshots=False leaves no snapshot files behind"""
+        engine = JSONSearchEngine(str(sample_data_dir), use_snapshots=False)
+        engine.load_state_data('CA')
+        assert not default_snapshot_directory(str(sample_data_dir)).exists()
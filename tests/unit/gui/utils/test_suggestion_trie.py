@@ -0,0 +1,91 @@
+"""
+Unit tests for suggestion_trie.py
+Tests for prefix completion over field values
+"""
+
+import pytest
+from src.gui.utils.suggestion_trie import SuggestionTrie, completion_keys, count_values
+
+
+VALUES = {
+    'Purple Heart': 5,
+    'Purple Martin': 1,
+    'Passenger': 40,
+    'Pass Through': 2,
+    'Heartland': 3,
+    'Veteran': 12,
+    'Veterans of Foreign Wars': 4,
+}
+
+
+class TestCompletionKeys:
+    """Test cases for completion_keys()"""
+
+    def test_word_starts(self):
+        assert completion_keys('Purple Heart') == ['purple heart', 'heart']
+
+    def test_single_word(self):
+        assert completion_keys('Veteran') == ['veteran']
+
+    def test_punctuation(self):
+        assert completion_keys('Texas A&M') == ['texas a&m', 'a&m', 'm']
+
+
+class TestSuggestionTrie:
+    """Test cases for SuggestionTrie.complete()"""
+
+    @pytest.fixture
+    def trie(self):
+        return SuggestionTrie(VALUES)
+
+    def test_most_frequent_first(self, trie):
+        assert trie.complete('p') == ['Passenger', 'Purple Heart', 'Pass Through', 'Purple Martin']
+
+    def test_prefix_inside_an_edge(self, trie):
+        assert trie.complete('purp') == ['Purple Heart', 'Purple Martin']
+        assert trie.complete('pass') == ['Passenger', 'Pass Through']
+        assert trie.complete('passe') == ['Passenger']
+
+    def test_word_start_matches(self, trie):
+        assert trie.complete('heart') == ['Purple Heart', 'Heartland']
+        assert trie.complete('foreign') == ['Veterans of Foreign Wars']
+
+    def test_value_reported_once(self, trie):
+        """A value whose words share a prefix is still reported once"""
+        trie = SuggestionTrie({'Pass Pass': 1, 'Passage': 2})
+        assert trie.complete('pass') == ['Passage', 'Pass Pass']
+
+    def test_case_insensitive(self, trie):
+        assert trie.complete('VETERAN') == ['Veteran', 'Veterans of Foreign Wars']
+
+    def test_limit(self, trie):
+        assert trie.complete('p', limit=2) == ['Passenger', 'Purple Heart']
+
+    def test_no_match(self, trie):
+        assert trie.complete('x') == []
+        assert trie.complete('purplex') == []
+        assert trie.complete('') == []
+
+    def test_empty(self):
+        trie = SuggestionTrie({})
+        assert len(trie) == 0
+        assert trie.complete('a') == []
+
+    def test_matches_brute_force(self, trie):
+        """Every prefix of every key completes to the brute-force answer"""
+        def expected(prefix):
+            matches = [value for value in VALUES
+                       if any(key.startswith(prefix) for key in completion_keys(value))]
+            return sorted(matches, key=lambda value: (-VALUES[value], len(value), value.lower()))[:10]
+
+        prefixes = {key[:length] for value in VALUES for key in completion_keys(value)
+                    for length in range(1, len(key) + 1)}
+        for prefix in prefixes:
+            assert trie.complete(prefix) == expected(prefix), prefix
+
+
+class TestCountValues:
+    """Test cases for count_values()"""
+
+    def test_counts_case_insensitively(self):
+        assert count_values(['Veteran', 'VETERAN', 'Passenger', 'veteran']) == {'Veteran': 3, 'Passenger': 1}
@@ -13,8 +13,9 @@ pytest.importorskip("PySide6")
 
 from PySide6.QtCore import QCoreApplication
 from src.ui.controllers.search_controller import (
-    SearchController, SearchResult, CategorizedResults, MIN_SEARCH_CHARS
+    SearchController, SearchResult, CategorizedResults, MIN_SEARCH_CHARS, SUGGESTION_LIMIT, IDENTIFY_CATEGORY
 )
+from src.gui.utils.plate_identifier import Identification, PlateCandidate
 
 
 @pytest.fixture
@@ -121,6 +122,15 @@ class TestSearchControllerInit:
     def test_min_search_chars(self):
         """Test minimum search characters constant."""
         assert MIN_SEARCH_CHARS == 2
+    
+    def test_search_backend(self, qapp):
+        """Test the search backend is chosen by the controller's configuration."""
+        assert SearchController().engine.search_backend == 'memory'
+        assert SearchController(search_backend='sqlite').engine.search_backend == 'sqlite'
+    
+    def test_unknown_search_backend_falls_back(self, qapp):
+        """Test an unknown search_backend setting uses the in-memory index instead of failing."""
+        assert SearchController(search_backend='elastic').engine.search_backend == 'memory'
 
 
 class TestSearchExecution:
@@ -172,6 +182,266 @@ class TestSearchSignals:
         search_controller.clear_search()
         
         callback.assert_called()
+    
+    def test_warm_up_finished_when_nothing_to_load(self, search_controller):
+        """Test warm_up_finished is emitted when all states are already loaded."""
+        callback = Mock()
+        search_controller.warm_up_finished.connect(callback)
+        search_controller.engine.warm_up = Mock(return_value=[])
+        
+        search_controller.start_warm_up()
+        
+        callback.assert_called_once()
+    
+    def test_warm_up_finished_after_cancelled_loads(self, search_controller):
+        """Test warm_up_finished does not wait for loads that will never be counted."""
+        callback = Mock()
+        search_controller.warm_up_finished.connect(callback)
+        search_controller.engine.warm_up = Mock(return_value=[Mock()])
+        
+        search_controller.start_warm_up()
+        callback.assert_not_called()
+        search_controller.engine.warm_up.call_args.kwargs['finished_callback']()
+        
+        callback.assert_called_once()
+
+
+class TestSearchSuggestions:
+    """Test autocomplete suggestions."""
+    
+    def test_suggestions_from_engine(self, search_controller):
+        """Test suggestions are taken from the engine for the category."""
+        search_controller.engine.get_suggestions = Mock(return_value=['Veteran'])
+        
+        assert search_controller.get_suggestions('vet', 'type') == ['Veteran']
+        search_controller.engine.get_suggestions.assert_called_once_with(
+            'vet', 'type', SUGGESTION_LIMIT, wait=False, ready_callback=search_controller.suggestions_ready.emit)
+    
+    def test_suggestions_ready_when_rebuilt(self, search_controller):
+        """Test suggestions_ready is emitted once the engine has rebuilt the completions."""
+        callback = Mock()
+        search_controller.suggestions_ready.connect(callback)
+        search_controller.engine.get_suggestions = Mock(return_value=[])
+        
+        search_controller.get_suggestions('vet')
+        search_controller.engine.get_suggestions.call_args.kwargs['ready_callback']()
+        
+        callback.assert_called_once()
+
+
+class TestPlateIdentification:
+    """Test plate identification results."""
+    
+    def _wait_for_search(self, controller, timeout=30.0):
+        import time
+        deadline = time.monotonic() + timeout
+        while controller.is_searching and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+    
+    def test_identify_plate_results(self, qapp):
+        """Test candidates become plate type results with their score as the value."""
+        controller = SearchController(threaded=False)
+        plate_type = {'type_name': 'Passenger'}
+        controller.engine.identify_plate = Mock(return_value=Identification(
+            'ABC1234', [PlateCandidate('GA', 'Passenger', 0.77, 0, plate_type)], 3))
+        completed = Mock()
+        controller.identify_completed.connect(completed)
+        
+        controller.identify_plate('abc 1234')
+        
+        completed.assert_called_once()
+        results = completed.call_args[0][0]
+        assert results.query == 'ABC1234'
+        assert results.category == IDENTIFY_CATEGORY
+        assert results.total_matches == 3
+        assert [(r.state_code, r.plate_type, r.value) for r in results.plate_type_results] == \
+            [('GA', 'Passenger', '0.77')]
+        assert controller.last_results is results
+    
+    def test_identify_plate_runs_on_worker(self, search_controller):
+        """identify_plate() returns at once; the results arrive through identify_completed."""
+        completed = Mock()
+        search_controller.identify_completed.connect(completed)
+        
+        search_controller.identify_plate('ABC1234')
+        assert search_controller.is_searching
+        self._wait_for_search(search_controller)
+        
+        completed.assert_called_once()
+        assert completed.call_args[0][0].query == 'ABC1234'
+    
+    def test_search_supersedes_identification(self, search_controller):
+        """A search started meanwhile drops the identification's results."""
+        identified = Mock()
+        search_controller.identify_completed.connect(identified)
+        
+        search_controller.identify_plate('ABC1234')
+        search_controller.search("florida", immediate=True)
+        self._wait_for_search(search_controller)
+        
+        identified.assert_not_called()
+        assert search_controller.last_results.query == "florida"
+
+
+class TestStateReload:
+    """Test changed states reloaded off the GUI thread."""
+    
+    def test_reload_state_signal(self, qapp):
+        """state_reloaded reports whether the state was re-read."""
+        controller = SearchController(threaded=False)
+        controller.engine.reload_state = Mock(return_value=True)
+        reloaded = Mock()
+        controller.state_reloaded.connect(reloaded)
+        
+        controller.reload_state('CA')
+        
+        controller.engine.reload_state.assert_called_once_with('CA')
+        reloaded.assert_called_once_with('CA', True)
+    
+    def test_reload_runs_on_worker(self, search_controller):
+        """reload_state() returns at once and re-reads the state on the search worker."""
+        import threading
+        import time
+        threads = []
+        search_controller.engine.reload_state = Mock(
+            side_effect=lambda state_code: threads.append(threading.current_thread()) or False)
+        reloaded = Mock()
+        search_controller.state_reloaded.connect(reloaded)
+        
+        search_controller.reload_state('CA')
+        deadline = time.monotonic() + 30.0
+        while not reloaded.called and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+        
+        reloaded.assert_called_once_with('CA', False)
+        assert threads and threads[0] is not threading.main_thread()
+
+
+class TestSearchStreaming:
+    """Test results streamed in state by state."""
+    
+    def _wait_for_search(self, controller, timeout=30.0):
+        import time
+        deadline = time.monotonic() + timeout
+        while controller.is_searching and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+    
+    def test_partial_results_before_completed(self, search_controller):
+        """Partial results are emitted per state, then the ranked results."""
+        events = []
+        search_controller.search_partial.connect(lambda results: events.append('partial'))
+        search_controller.search_completed.connect(lambda results: events.append('completed'))
+        
+        search_controller.search("plate", immediate=True)
+        assert search_controller.is_searching  # runs on the search worker
+        self._wait_for_search(search_controller)
+        
+        assert events[-1] == 'completed'
+        assert events.count('completed') == 1
+    
+    def test_new_search_stops_stream(self, search_controller):
+        """A new query abandons the search still streaming in."""
+        completed = Mock()
+        search_controller.search_completed.connect(completed)
+        
+        search_controller.search("plate", immediate=True)
+        search_controller.search("florida", immediate=True)
+        self._wait_for_search(search_controller)
+        
+        completed.assert_called_once()
+        assert completed.call_args[0][0].query == "florida"
+    
+    def test_without_streaming(self, qapp):
+        """stream_results=False, threaded=False completes before search() returns."""
+        controller = SearchController(stream_results=False, threaded=False)
+        completed = Mock()
+        controller.search_completed.connect(completed)
+        
+        controller.search("plate", immediate=True)
+        
+        completed.assert_called_once()
+        assert not controller.is_searching
+    
+    def test_streamed_documents_are_ranked(self, qapp):
+        """The streamed search is ranked from its documents, not searched again."""
+        controller = SearchController(threaded=False)
+        controller.engine.search_ranked = Mock(side_effect=AssertionError("searched again"))
+        completed = Mock()
+        controller.search_completed.connect(completed)
+        
+        controller.search("plate", immediate=True)
+        
+        completed.assert_called_once()
+        assert completed.call_args[0][0].total_matches > 0
+    
+    def test_extended_query_refines_previous_candidates(self, qapp):
+        """Typing onto the last query filters its matches without another index lookup."""
+        controller = SearchController(threaded=False)
+        for state_code in controller.engine.get_all_state_codes():
+            controller.engine.load_state_data(state_code)
+        lookup = Mock(wraps=controller.engine._lookup_documents)
+        controller.engine._lookup_documents = lookup
+        completed = Mock()
+        controller.search_completed.connect(completed)
+        
+        controller.search("bre", immediate=True)
+        controller.search("brea", immediate=True)
+        
+        lookup.assert_called_once()
+        assert lookup.call_args[0][0] == "bre"
+        assert completed.call_args[0][0].query == "brea"
+
+
+class TestSearchWorker:
+    """Test searches run on the worker thread."""
+    
+    def _wait_for_search(self, controller, timeout=30.0):
+        import time
+        deadline = time.monotonic() + timeout
+        while controller.is_searching and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+    
+    def test_search_returns_before_completing(self, qapp):
+        """search() returns while the worker searches; results arrive on the event loop."""
+        controller = SearchController(stream_results=False)
+        completed = Mock()
+        controller.search_completed.connect(completed)
+        
+        controller.search("plate", immediate=True)
+        assert controller.is_searching
+        self._wait_for_search(controller)
+        
+        completed.assert_called_once()
+        assert completed.call_args[0][0].query == "plate"
+    
+    def test_superseded_results_dropped(self, search_controller):
+        """Results of an older search id are not emitted."""
+        completed = Mock()
+        partial = Mock()
+        search_controller.search_completed.connect(completed)
+        search_controller.search_partial.connect(partial)
+        
+        stale_id = search_controller._search_id - 1
+        search_controller._on_batch_found(stale_id, [{'state': 'FL', 'field': 'type_name', 'value': 'x'}])
+        search_controller._on_ranked_found(stale_id, Mock(results=[], total_count=0))
+        
+        partial.assert_not_called()
+        completed.assert_not_called()
+    
+    def test_clear_cancels_running_search(self, search_controller):
+        """Clearing the search cancels the worker's search."""
+        completed = Mock()
+        search_controller.search_completed.connect(completed)
+        
+        search_controller.search("plate", immediate=True)
+        cancelled = search_controller._cancelled
+        search_controller.clear_search()
+        search_controller._thread_pool.waitForDone()
+        QCoreApplication.processEvents()
+        
+        assert cancelled.is_set()
+        assert not search_controller.is_searching
+        completed.assert_not_called()
 
 
 class TestCategoryMappings:
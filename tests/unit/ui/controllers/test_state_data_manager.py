@@ -7,6 +7,7 @@ Tests state data loading and caching.
 import pytest
 import json
 import tempfile
+from collections.abc import Mapping
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -15,6 +16,7 @@ pytest.importorskip("PySide6")
 
 from PySide6.QtCore import QCoreApplication
 from src.ui.controllers.state_data_manager import StateDataManager
+from src.gui.utils.state_repository import StateRepository
 
 
 @pytest.fixture
@@ -140,6 +142,25 @@ class TestCaching:
         data2 = state_data_manager.get_state_data("FL")
         
         assert data1 is data2  # Same object (from cache)
+    
+    def test_snapshot_shared_between_managers(self, qapp, temp_state_dir):
+        """Test that a second manager loads from the snapshot written by the first."""
+        first = StateDataManager(data_dir=str(temp_state_dir))
+        data = first.get_state_data("FL")
+        assert first.snapshots.snapshot_path(temp_state_dir / "florida.json").exists()
+        
+        # Its own repository, so the state is not simply shared with the first manager
+        second = StateDataManager(data_dir=str(temp_state_dir), repository=StateRepository(str(temp_state_dir)))
+        assert second.get_state_data("FL") == data
+    
+    def test_snapshot_defers_plate_types(self, qapp, temp_state_dir):
+        """Test that character rules load without reading the plate list."""
+        StateDataManager(data_dir=str(temp_state_dir)).get_state_data("FL")
+        
+        manager = StateDataManager(data_dir=str(temp_state_dir), repository=StateRepository(str(temp_state_dir)))
+        manager.get_character_rules("FL")
+        assert not manager.get_state_data("FL").is_loaded("plate_types")
+        assert manager.get_plate_types("FL")
 
 
 class TestStateInfoSummary:
@@ -217,4 +238,39 @@ class TestSignals:
         callback.assert_called_once()
         args = callback.call_args[0]
         assert args[0] == "FL"  # state_code
-        assert isinstance(args[1], dict)  # data
+        assert isinstance(args[1], Mapping)  # data
+
+
+class TestHotReload:
+    """Test detection of state files edited on disk."""
+    
+    def test_changed_file_emits_state_changed(self, state_data_manager, temp_state_dir):
+        """Test an edited file drops its cached data and emits state_changed."""
+        callback = Mock()
+        state_data_manager.state_changed.connect(callback)
+        state_data_manager.watch_for_changes()
+        assert state_data_manager.get_state_data("FL")['slogan'] == "Sunshine State"
+        
+        florida_file = temp_state_dir / "florida.json"
+        data = json.loads(florida_file.read_text())
+        data['slogan'] = "The Sunshine State"
+        florida_file.write_text(json.dumps(data))
+        
+        assert state_data_manager.check_for_changes() == ["FL"]
+        callback.assert_called_once_with("FL")
+        assert state_data_manager.get_state_data("FL")['slogan'] == "The Sunshine State"
+    
+    def test_unchanged_files(self, state_data_manager):
+        """Test nothing is reported when no file changed."""
+        state_data_manager.watch_for_changes()
+        state_data_manager.get_state_data("CA")
+        
+        assert state_data_manager.check_for_changes() == []
+        assert "CA" in state_data_manager._cache
+    
+    def test_watches_state_files(self, state_data_manager, temp_state_dir):
+        """Test the directory and existing state files are watched."""
+        state_data_manager.watch_for_changes()
+        
+        assert str(temp_state_dir / "florida.json") in state_data_manager._watcher.files()
+        assert str(temp_state_dir) in state_data_manager._watcher.directories()
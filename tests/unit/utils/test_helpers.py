@@ -13,7 +13,11 @@ from src.utils.helpers import (
     get_ambiguous_character_pairs,
     generate_character_alternatives,
     expand_plate_with_alternatives,
+    iter_plate_alternatives,
     validate_plate_pattern,
+    compile_plate_pattern,
+    plate_shape,
+    PatternShapeIndex,
     score_plate_match,
     format_color_display,
     get_image_path,
@@ -223,6 +227,65 @@ class TestExpandPlateWithAlternatives:
         variations = expand_plate_with_alternatives('A0C')
         assert 'A0C' in variations
         assert 'AOC' in variations
+    
+    def test_no_combination_cap(self):
+        """Test every variation is returned when no maximum is given"""
+        variations = expand_plate_with_alternatives('0I1L8B5S')
+        assert len(variations) == len(set(variations)) == 2 * 3 ** 3 * 2 ** 4
+    
+    def test_max_combinations_keeps_most_likely(self):
+        """Test the read and its single swaps come before double swaps"""
+        assert expand_plate_with_alternatives('0I', max_combinations=4) == ['0I', '01', '0L', 'OI']
+
+
+class TestIterPlateAlternatives:
+    """Test cases for iter_plate_alternatives()"""
+    
+    def test_lazy(self):
+        """Test variations are generated on demand"""
+        alternatives = iter_plate_alternatives('0I1L8B5S2Z6G')
+        assert next(alternatives) == '0I1L8B5S2Z6G'
+        assert sum(1 for _ in zip(range(5), alternatives)) == 5
+    
+    def test_fewest_swaps_first(self):
+        """Test variations are ordered by the number of swapped characters"""
+        plate = '8O5I'
+        swaps = [sum(a != b for a, b in zip(plate, variation))
+                 for variation in iter_plate_alternatives(plate)]
+        assert swaps == sorted(swaps)
+    
+    def test_pruned_to_patterns(self):
+        """Test only variations matching a pattern are generated"""
+        variations = list(iter_plate_alternatives('8O5I23', patterns=['ABC123']))
+        assert variations == ['BOS123']
+    
+    def test_pattern_index(self):
+        """Test a PatternShapeIndex can be passed as the patterns"""
+        index = PatternShapeIndex(['ABC123', '123ABC'])
+        assert list(iter_plate_alternatives('1Z3AB0', patterns=index)) == ['123ABO']
+    
+    def test_literal_prefix_pattern(self):
+        """Test literal prefixes must be matched exactly"""
+        assert list(iter_plate_alternatives('U61234', patterns=['UGXXXX']))[0] == 'UG1234'
+        assert list(iter_plate_alternatives('U61234', patterns=['UG1234'])) == ['UG1234']
+    
+    def test_no_matching_variation(self):
+        """Test a read no swap can fit to a pattern"""
+        assert list(iter_plate_alternatives('ACF', patterns=['123'])) == []
+    
+    def test_state_without_letter_o(self):
+        """Test no letter O is generated (or kept) where the state has none"""
+        variations = list(iter_plate_alternatives('O0', {'allows_letter_o': False}))
+        assert variations == ['00']
+    
+    def test_state_without_zero_for_o(self):
+        """Test O is not swapped for zero where the state does not use it"""
+        assert list(iter_plate_alternatives('O', {'uses_zero_for_o': False})) == ['O']
+        assert list(iter_plate_alternatives('O', {'allows_letter_o': False, 'uses_zero_for_o': False})) == []
+    
+    def test_lowercase_and_separators(self):
+        """Test reads are upper-cased and separators kept"""
+        assert list(iter_plate_alternatives('a-c')) == ['A-C']
 
 
 # ============================================================================
@@ -294,6 +357,61 @@ class TestValidatePlatePattern:
         assert validate_plate_pattern('F1234', 'T1234') is False  # Different literal letter
 
 
+class TestCompilePlatePattern:
+    """Test cases for compile_plate_pattern() and plate_shape()"""
+    
+    def test_shape(self):
+        """Test patterns reduce to letter/digit shapes"""
+        compiled = compile_plate_pattern('abc-123')
+        assert (compiled.pattern, compiled.prefix, compiled.shape) == ('ABC-123', '', 'LLL-DDD')
+        assert compiled.shapes == {'LLL-DDD'}
+    
+    def test_literal_prefixes(self):
+        """Test literal prefixes are kept out of the shape"""
+        assert compile_plate_pattern('DV1234')[1:3] == ('DV', 'DDDD')
+        assert compile_plate_pattern('T12A4')[1:3] == ('T', 'DDAD')
+        assert compile_plate_pattern('UG').regex is None
+    
+    def test_wildcard_shapes(self):
+        """Test X expands to letter and digit shapes"""
+        assert compile_plate_pattern('AXX').shapes == {'LLL', 'LLD', 'LDL', 'LDD'}
+    
+    def test_uncompiled_patterns(self):
+        """Test patterns left to the character-by-character check"""
+        assert compile_plate_pattern('') is None
+        assert compile_plate_pattern('AB 123') is None
+        assert compile_plate_pattern('ÄB123') is None
+    
+    def test_plate_shape(self):
+        """Test plates reduce to shapes"""
+        assert plate_shape('ABC-123') == 'LLL-DDD'
+        assert plate_shape('1P/D2345') == 'DL/LDDDD'
+    
+    def test_fallback_semantics(self):
+        """Test patterns and plates the regex does not handle"""
+        assert validate_plate_pattern('AB 123', 'AB 123') is True
+        assert validate_plate_pattern('ÄBC', 'ABC') is True
+        assert validate_plate_pattern('UG', 'UG') is False
+
+
+class TestPatternShapeIndex:
+    """Test cases for PatternShapeIndex"""
+    
+    PATTERNS = ['ABC123', 'ABC-123', 'UGXXXX', 'GT1234', 'T1234', 'F1234', 'AB 123', '1ABC123']
+    
+    def test_matches_validate_plate_pattern(self):
+        """Test the index finds exactly the patterns validate_plate_pattern() accepts"""
+        index = PatternShapeIndex(self.PATTERNS)
+        for plate in ['XYZ789', 'XYZ-789', 'UG12AB', 'UGAB12', 'GT5678', 'T5678', 'F0000', 'AB 123',
+                      '7ABC123', 'abc123', '', 'ÄBC123', '!!']:
+            expected = [pattern for pattern in self.PATTERNS if validate_plate_pattern(plate, pattern)]
+            assert index.matching(plate) == expected, plate
+    
+    def test_duplicate_patterns(self):
+        """Test duplicate patterns are indexed once"""
+        assert PatternShapeIndex(['ABC123', 'ABC123']).matching('XYZ789') == ['ABC123']
+
+
 # ============================================================================
 # SCORE PLATE MATCH TESTS
 # ============================================================================